@@ -0,0 +1,36 @@
+"""fs analizer'benchmarks
+
+This package contains some benchmarks for the fs_analyzer app, each one runnable 
+as a script, e.g.:
+
+    python -m fs_analyzer.benchmarks.bench_traversal --files 100000
+
+
+In particular, 
+
+Modules:
+
+* bench_batches.py: comparing the peak memory of collecting the details of many files as
+    per-file tuples against collecting them as columnar batches.
+* bench_categorization.py: comparing the throughput of the serial classification of files by
+    signature against the parallel one, and the classification by extension with and without a cache.
+* bench_extension_categorization.py: comparing the cost per file of the classification of files
+    by extension through mimetypes against the one through a precompiled table, and the time of
+    building the table against the one of loading it from a cache file.
+* bench_header_categorization.py: comparing the throughput of the classification of files by
+    signature through filetype against the one through a precompiled dispatch table.
+* bench_output.py: comparing the throughput of printing the outcomes of a command a row at a
+    time against writing them through the buffered output writers, in each format.
+* bench_permissions.py: comparing the throughput of the per-file evaluation of permissions
+    against the bulk one, through a single mask test per file.
+* bench_scan_index.py: comparing the times of cold and warm scans relying on a scan index.
+* bench_startup.py: measuring the start time of the CLI for each of its commands, through the
+    import times reported by the interpreter.
+* bench_traversal.py: comparing the scandir-based traversal engine against the
+    former os.walk + os.stat based generators.
+* utils.py: containing some utils for benchmarking, like the generation of a 
+    synthetic directory tree.
+
+It only employs the Python standard library.
+
+"""
@@ -0,0 +1,56 @@
+"""Compares the peak resident set size (RSS) of collecting the details (path, size and 
+category) of all the files of a synthetic tree as per-file tuples, as yield_files_analyses
+returns them, against collecting them as columnar batches, as yield_files_batches returns
+them (which hold the modes and inodes of the files too).
+Each mode is measured in a fresh interpreter, so that peaks do not leak from one into another;
+the baseline is the peak RSS of walking the tree without collecting anything.
+"""
+import argparse
+import resource
+import subprocess
+import sys
+
+from fs_analyzer.benchmarks.utils import create_synthetic_tree, print_row, synthetic_tree_directory
+from fs_analyzer.model.file_categorization_strategy import FileCategorizerByExtension
+from fs_analyzer.model.file_listing_generators import yield_files_analyses, yield_files_batches
+
+
+MODES = {
+    "baseline (nothing collected)": lambda root_path: sum(1 for _ in yield_files_analyses(root_path, FileCategorizerByExtension())),
+    "per-file tuples": lambda root_path: list(yield_files_analyses(root_path, FileCategorizerByExtension())),
+    "columnar batches": lambda root_path: list(yield_files_batches(root_path, FileCategorizerByExtension())),
+}
+
+
+def peak_rss_in_kilobytes(mode: str, root_path: str) -> int:
+    """Runs the provided mode in a fresh interpreter, returning its peak RSS."""
+    completed = subprocess.run([sys.executable, "-m", __spec__.name, "--measure", mode, root_path],
+                               check=True, capture_output=True, text=True)
+    return int(completed.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--measure", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("root_path", nargs="?", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure is not None:
+        collected = MODES[args.measure](args.root_path)
+        # ru_maxrss is in kilobytes on Linux
+        print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+        del collected
+        return
+    with synthetic_tree_directory() as root_path:
+        create_synthetic_tree(root_path, args.files)
+        print_row("mode", "peak RSS (MiB)", "over baseline (MiB)")
+        baseline = None
+        for mode in MODES:
+            peak_rss = peak_rss_in_kilobytes(mode, root_path)
+            baseline = peak_rss if baseline is None else baseline
+            print_row(mode, f"{peak_rss / 1024:.1f}", f"{(peak_rss - baseline) / 1024:.1f}")
+
+
+if __name__ == "__main__":
+    main()
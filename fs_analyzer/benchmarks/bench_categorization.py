@@ -0,0 +1,37 @@
+"""Compares the throughput, in files/s, of the serial classification of files by signature
+against the parallel one, through both a process pool and a thread pool, as well as that of the
+classification by extension, with and without an LRU cache of the categories.
+"""
+import argparse
+
+from fs_analyzer.benchmarks.utils import best_time_of, create_synthetic_tree, print_row, synthetic_tree_directory
+from fs_analyzer.model.caching_file_categorization import LruFileCategorizer
+from fs_analyzer.model.file_categorization_strategy import FileCategorizerByExtension, FileCategorizerBySignature
+from fs_analyzer.model.file_listing_generators import yield_file_categories
+from fs_analyzer.model.parallel_file_categorization import ParallelFileCategorizer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=50_000)
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    strategies = [("serial", FileCategorizerBySignature()),
+                  (f"{args.workers} processes", ParallelFileCategorizer(FileCategorizerBySignature(), args.workers)),
+                  (f"{args.workers} threads", ParallelFileCategorizer(FileCategorizerBySignature(), args.workers,
+                                                                      use_processes=False)),
+                  ("extension", FileCategorizerByExtension()),
+                  ("extension, LRU cached", LruFileCategorizer(FileCategorizerByExtension()))]
+    with synthetic_tree_directory() as root_path:
+        create_synthetic_tree(root_path, args.files)
+        print_row("categorization", "best time (s)", "files/s")
+        for name, strategy in strategies:
+            elapsed = best_time_of(lambda: sum(1 for _ in yield_file_categories(root_path, strategy)),
+                                   args.repetitions)
+            print_row(name, f"{elapsed:.3f}", f"{args.files / elapsed:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Compares the time of building an extension table from the mime types database against the
+one of loading it from a cache file, as well as the per-file cost, in ns/file, of the
+classification of files by extension through mimetypes.guess_type against the one through the
+table, on paths only (so that no time is spent walking a tree).
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from fs_analyzer.benchmarks.utils import EXTENSIONS, best_time_of, print_row
+from fs_analyzer.model.extension_table_categorization import ExtensionTable, FileCategorizerByExtensionTable
+from fs_analyzer.model.file_categorization_strategy import FileCategorizerByExtension
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=500_000)
+    parser.add_argument("--repetitions", type=int, default=3)
+    args = parser.parse_args()
+
+    # the table is built first, since the database is only loaded once per process
+    print_row("extension table", "time (ms)")
+    with tempfile.TemporaryDirectory(prefix="fs_analyzer_bench_") as cache_directory:
+        cache_path = os.path.join(cache_directory, "extensions.json")
+        for name in ["built (cache miss)", "loaded (cache hit)"]:
+            start = time.perf_counter()
+            ExtensionTable.from_cache(cache_path)
+            print_row(name, f"{(time.perf_counter() - start) * 1e3:.2f}")
+
+    print()
+    extensions = [*EXTENSIONS, ".JPG", ".tar.gz", ".html"]
+    files_paths = [f"/home/user/projects/dir{i % 1000}/file{i}{extensions[i % len(extensions)]}"
+                   for i in range(args.files)]
+    strategies = [("extension (mimetypes)", FileCategorizerByExtension()),
+                  ("extension (table)", FileCategorizerByExtensionTable())]
+    print_row("categorization", "best time (s)", "ns/file")
+    for name, strategy in strategies:
+        categorize_file = strategy.categorize_file
+        strategy.categorize_file(files_paths[0])
+        elapsed = best_time_of(lambda: [categorize_file(file_path) for file_path in files_paths], args.repetitions)
+        print_row(name, f"{elapsed:.3f}", f"{elapsed / args.files * 1e9:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Compares the throughput, in files/s, of the classification of files by signature through
+filetype against the one reading a single header per file and matching it through a
+precompiled dispatch table, on files with the headers of some common types.
+"""
+import argparse
+import gzip
+import os
+import random
+
+from fs_analyzer.benchmarks.utils import best_time_of, print_row, synthetic_tree_directory
+from fs_analyzer.model.file_categorization_strategy import FileCategorizerBySignature
+from fs_analyzer.model.file_listing_generators import yield_file_categories
+from fs_analyzer.model.header_file_categorization import FileCategorizerByHeader
+
+
+HEADERS = [b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR" + bytes(1024),
+           b"\xff\xd8\xff\xe0\x00\x10JFIF" + bytes(1024),
+           b"%PDF-1.7\n" + bytes(1024),
+           b"\x00\x00\x00\x18ftypisom\x00\x00\x02\x00isomiso2" + bytes(1024),
+           gzip.compress(bytes(1024)),
+           b"plain text, not recognized by any signature\n" * 32,
+           random.Random(0).randbytes(1024)]
+
+
+def create_tree_of_typed_files(root_path: str, files_count: int, files_per_directory: int = 100) -> str:
+    """Creates, under root_path, files_count files with the headers in HEADERS, spread over 
+    directories holding files_per_directory files each.
+    """
+    for i in range(files_count):
+        directory_path = os.path.join(root_path, f"dir{i // files_per_directory}")
+        os.makedirs(directory_path, exist_ok=True)
+        with open(os.path.join(directory_path, f"file{i}"), "wb") as f:
+            f.write(HEADERS[i % len(HEADERS)])
+    return root_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=50_000)
+    parser.add_argument("--repetitions", type=int, default=3)
+    args = parser.parse_args()
+
+    strategies = [("signature (filetype)", FileCategorizerBySignature()),
+                  ("header (dispatch table)", FileCategorizerByHeader())]
+    with synthetic_tree_directory() as root_path:
+        create_tree_of_typed_files(root_path, args.files)
+        print_row("categorization", "best time (s)", "files/s")
+        for name, strategy in strategies:
+            elapsed = best_time_of(lambda: sum(1 for _ in yield_file_categories(root_path, strategy)),
+                                   args.repetitions)
+            print_row(name, f"{elapsed:.3f}", f"{args.files / elapsed:.0f}")
+
+
+if __name__ == "__main__":
+    main()
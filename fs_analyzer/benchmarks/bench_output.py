@@ -0,0 +1,60 @@
+"""Compares the throughput, in rows/s, of printing the outcomes of a command a row at a time
+(as the CLI formerly did) against writing them through the buffered output writers, in each
+of their formats, both to a file (or /dev/null) and to an in-memory stream.
+"""
+import argparse
+import contextlib
+import io
+import os
+
+from fs_analyzer.benchmarks.utils import best_time_of, print_row
+from fs_analyzer.model.file_category import FileCategory
+from fs_analyzer.view.output_writers import OutputFormat, create_output_writer
+
+
+def print_rows(rows, stream):
+    with contextlib.redirect_stdout(io.TextIOWrapper(stream, encoding="utf-8", line_buffering=True,
+                                                     write_through=True)) as text_stream:
+        for (file_path, file_category) in rows:
+            print(file_path + "\t| " + str(file_category.name))
+        text_stream.detach()
+
+
+def write_rows(output_format, rows, stream, batch_size):
+    writer = create_output_writer(output_format, stream)
+    writer.write_header(("filepath", "category"))
+    for start in range(0, len(rows), batch_size):
+        writer.write_rows((file_path, file_category.name) for (file_path, file_category) in rows[start:start + batch_size])
+    writer.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--output", default=os.devnull, 
+                        help="the file the rows are written to (e.g., a file on disk, or a terminal)")
+    parser.add_argument("--repetitions", type=int, default=3)
+    args = parser.parse_args()
+
+    categories = [FileCategory("text/plain"), FileCategory("image/png"), FileCategory("text/x-python")]
+    rows = [(f"/home/user/projects/dir{i % 1000}/file{i}.txt", categories[i % len(categories)]) 
+            for i in range(args.rows)]
+    print_row("writer", "stream", "best time (s)", "rows/s")
+    for stream_name in [args.output, "memory"]:
+        def stream():
+            return io.BytesIO() if stream_name == "memory" else open(stream_name, "wb", buffering=0)
+        def timed(write):
+            def run():
+                with contextlib.closing(stream()) as output_stream:
+                    write(output_stream)
+            return best_time_of(run, args.repetitions)
+        elapsed = timed(lambda output_stream: print_rows(rows, output_stream))
+        print_row("print (line-buffered)", stream_name, f"{elapsed:.3f}", f"{args.rows / elapsed:.0f}")
+        for output_format in OutputFormat:
+            elapsed = timed(lambda output_stream: write_rows(output_format, rows, output_stream, args.batch_size))
+            print_row(f"{output_format.value} writer", stream_name, f"{elapsed:.3f}", f"{args.rows / elapsed:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Compares the throughput, in files/s, of the per-file evaluation of permissions (i.e.
+report_unusual_permissions, allocating a set per file) against the bulk one (i.e. 
+report_unusual_modes, testing a single mask per file and materializing the permissions only
+for the files having unusual ones), both on in-memory modes, mostly usual, and through
+yield_unusual_permissions on a synthetic tree.
+"""
+import argparse
+import os
+import random
+
+from fs_analyzer.benchmarks.utils import best_time_of, create_synthetic_tree, print_row, synthetic_tree_directory
+from fs_analyzer.model.file_listing_generators import yield_unusual_permissions
+from fs_analyzer.model.file_permission_reporting_strategy import LooserPermissionsReporting, StricterPermissionsReporting
+
+
+class PerFileLooserPermissionsReporting(LooserPermissionsReporting):
+    """The looser strategy, forced to the per-file evaluation."""
+    unusual_mode_bits = None
+
+
+def per_file_evaluation(strategy, stats):
+    return sum(1 for stat in stats if strategy.report_unusual_permissions(stat))
+
+
+def bulk_evaluation(strategy, modes):
+    return sum(1 for unusual_mode_mask in strategy.report_unusual_modes(modes) 
+               if unusual_mode_mask and strategy.permissions_of(unusual_mode_mask))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=50_000)
+    parser.add_argument("--modes", type=int, default=1_000_000)
+    parser.add_argument("--unusual-ratio", type=float, default=0.01)
+    parser.add_argument("--repetitions", type=int, default=3)
+    args = parser.parse_args()
+
+    modes = [0o100775 if random.random() < args.unusual_ratio else 0o100644 for _ in range(args.modes)]
+    stats = [os.stat_result((mode,) + (0,) * 9) for mode in modes]
+    print_row("evaluation", "best time (s)", "files/s")
+    for strategy in [StricterPermissionsReporting(), LooserPermissionsReporting()]:
+        for name, evaluation, files in [("per-file", per_file_evaluation, stats), ("bulk", bulk_evaluation, modes)]:
+            elapsed = best_time_of(lambda: evaluation(strategy, files), args.repetitions)
+            print_row(f"{type(strategy).__name__}, {name}", f"{elapsed:.3f}", f"{args.modes / elapsed:.0f}")
+    with synthetic_tree_directory() as root_path:
+        create_synthetic_tree(root_path, args.files)
+        for name, strategy in [("yield_unusual_permissions, per-file", PerFileLooserPermissionsReporting()),
+                               ("yield_unusual_permissions, bulk", LooserPermissionsReporting())]:
+            elapsed = best_time_of(lambda: sum(1 for _ in yield_unusual_permissions(root_path, strategy)),
+                                   args.repetitions)
+            print_row(name, f"{elapsed:.3f}", f"{args.files / elapsed:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Compares the time of a cold scan (i.e. with an empty index) of a directory tree, 
+classifying files by signature, against the time of a warm one (i.e. with the index 
+filled by the cold scan), as well as against a scan not relying on any index at all.
+"""
+import argparse
+import os
+import time
+
+from fs_analyzer.benchmarks.utils import create_synthetic_tree, print_row, synthetic_tree_directory
+from fs_analyzer.model.directory_traversal import TraversalOptions
+from fs_analyzer.model.file_categorization_strategy import FileCategorizerBySignature
+from fs_analyzer.model.file_listing_generators import yield_categories_sizes
+from fs_analyzer.model.scan_index import IndexedFileCategorizer, ScanIndex
+
+
+def timed_scan(directory_path: str, scan_index: ScanIndex = None) -> float:
+    strategy = FileCategorizerBySignature()
+    if scan_index is not None:
+        strategy = IndexedFileCategorizer(strategy, scan_index)
+    start = time.perf_counter()
+    for _ in yield_categories_sizes(directory_path, strategy, 
+                                    traversal_options=TraversalOptions(scan_index=scan_index)):
+        pass
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with synthetic_tree_directory() as root_path:
+        tree_path = create_synthetic_tree(os.path.join(root_path, "tree"), args.files)
+        # directories modified too recently are not recorded by the index
+        for (directory_path, _, _) in os.walk(tree_path):
+            os.utime(directory_path, (0, 0))
+        print_row("scan", "time (s)")
+        print_row("without index", f"{timed_scan(tree_path):.3f}")
+        with ScanIndex(os.path.join(root_path, "index.db")) as scan_index:
+            print_row("cold", f"{timed_scan(tree_path, scan_index):.3f}")
+            print_row("warm", f"{timed_scan(tree_path, scan_index):.3f}")
+
+
+if __name__ == "__main__":
+    main()
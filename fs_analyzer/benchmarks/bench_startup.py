@@ -0,0 +1,69 @@
+"""Measures the start time of the CLI for each of its commands (run on an empty directory, so
+that the time is spent importing and configuring rather than analyzing), through the import
+times reported by the interpreter (-X importtime), also listing the slowest imports and whether
+the heavy dependencies of the strategies a command does not use (e.g., NumPy) are imported.
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+
+from fs_analyzer.benchmarks.utils import print_row
+
+
+# the dependencies only some commands (or options) need
+HEAVY_MODULES = ("numpy", "asyncio", "filetype", "multiprocessing", "ctypes", "tomllib")
+
+
+def commands_of(directory_path):
+    return {"help": ["--help"],
+            "bigfiles": ["bigfiles", directory_path, "0"],
+            "catsizes": ["catsizes", directory_path],
+            "categorize": ["categorize", directory_path],
+            "fileperms": ["fileperms", directory_path],
+            "report": ["report", directory_path]}
+
+
+def run_cli(arguments):
+    """Runs the CLI with the provided arguments, returning its wall time, in seconds, and the
+    cumulative import times, in microseconds, of the modules it imported.
+    """
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-m", "fs_analyzer.main", *arguments],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    import_times = {}
+    for line in completed.stderr.splitlines():
+        if line.startswith("import time:"):
+            (_, cumulative_time, module) = line[len("import time:"):].split("|")
+            if cumulative_time.strip().isdigit():
+                import_times[module.strip()] = int(cumulative_time)
+    return (elapsed, import_times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="the number of the slowest imports listed")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="fs_analyzer_bench_") as directory_path:
+        print_row("command", "best time (s)", "import time (s)", "heavy modules imported")
+        slowest_import_times = {}
+        for (command, arguments) in commands_of(directory_path).items():
+            runs = [run_cli(arguments) for _ in range(args.repetitions)]
+            (elapsed, import_times) = min(runs, key=lambda run: run[0])
+            heavy_modules = [module for module in HEAVY_MODULES if module in import_times]
+            print_row(command, f"{elapsed:.3f}", f"{import_times.get('fs_analyzer.view.cli_view', 0) / 1e6:.3f}",
+                      ",".join(heavy_modules) or "-")
+            if command == "bigfiles":
+                slowest_import_times = import_times
+    print()
+    print_row("module (bigfiles)", "cumulative import time (s)")
+    for module in sorted(slowest_import_times, key=slowest_import_times.get, reverse=True)[:args.top]:
+        print_row(module, f"{slowest_import_times[module] / 1e6:.3f}")
+
+
+if __name__ == "__main__":
+    main()
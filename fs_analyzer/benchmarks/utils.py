@@ -0,0 +1,45 @@
+import os
+import tempfile
+import time
+from typing import Callable
+
+
+EXTENSIONS = [".txt", ".py", ".jpg", ".json", ".csv", ".bin", ""]
+
+
+def create_synthetic_tree(root_path: str, files_count: int, files_per_directory: int = 100,
+                          subdirectories_per_directory: int = 4) -> str:
+    """Creates, under root_path, a directory tree containing files_count small files, 
+    spread over directories holding files_per_directory files each.
+    """
+    pending_directories = [root_path]
+    created_files = 0
+    while created_files < files_count:
+        directory_path = pending_directories.pop(0)
+        os.makedirs(directory_path, exist_ok=True)
+        for i in range(min(files_per_directory, files_count - created_files)):
+            extension = EXTENSIONS[i % len(EXTENSIONS)]
+            with open(os.path.join(directory_path, f"file{i}{extension}"), "w") as f:
+                f.write("x" * (i % 64))
+            created_files += 1
+        pending_directories.extend(os.path.join(directory_path, f"dir{j}")
+                                   for j in range(subdirectories_per_directory))
+    return root_path
+
+
+def synthetic_tree_directory() -> tempfile.TemporaryDirectory:
+    return tempfile.TemporaryDirectory(prefix="fs_analyzer_bench_")
+
+
+def best_time_of(function: Callable[[], object], repetitions: int = 3) -> float:
+    """Returns the best wall time, in seconds, among the given repetitions of function."""
+    best = float("inf")
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def print_row(*columns) -> None:
+    print("\t| ".join(str(column) for column in columns))
@@ -19,6 +19,7 @@ and the commands are:
     * categorize  Classify files into mime/types (e.g., image/jpeg).
     * catsizes    Display the total size per category of files.
     * fileperms   List files with unusual permission settings.
+    * report      Perform many analyses in a single traversal.
     
 This file can also be imported as a module and contains the function:
 
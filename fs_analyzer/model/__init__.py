@@ -8,17 +8,51 @@ outside of the scope of the fs_analyzer command line application.
 In particular,
 
 Modules:
+* async_file_listing_generators.py: containing the asynchronous counterparts of the 
+    generators in file_listing_generators.py, advancing them in an executor so that
+    they can be consumed through "async for" without blocking the event loop.
+* caching_file_categorization.py: containing the abstract strategy decorating any other
+    file categorization strategy with a cache of the categories it computed, and its 
+    bounded, in-memory LRU implementation.
+* directory_watcher.py: containing the watch of a directory tree through Linux inotify (accessed
+    through ctypes), returning the changes of its files after an initial scan, by analyzing 
+    only the affected ones again.
+* directory_traversal.py: containing the single-pass, os.scandir-based traversal engine
+    shared by all the generators, yielding lightweight file entries with a cached stat.
+* extension_table_categorization.py: containing a strategy classifying files by extension 
+    like mimetypes does, but looking up their final extension in a table precompiled once 
+    per process (and optionally cached to a file).
 * file_categorization_strategy.py: containing some interchangeable strategies for 
     classifying files, modeled through the so-called "Strategy" Object-Oriented
     (OO) design pattern.
 * file_category.py: containing the definition of the class representing the abstraction
     of file category.
+* files_batch.py: containing the columnar, compact representation of batches of files, 
+    along with the table interning their categories.
 * file_listing_generators.py: containing many reusable generators of
     information like size, category and permissions regarding the files of a 
     specified directory tree, suitable for exploring large directories.
 * file_permission_reporting_strategy.py: containing some interchangeable strategies for 
     identifying files with unusual permission settings, modeled through the so-called 
     "Strategy" OO design pattern.
+* header_file_categorization.py: containing a strategy classifying files by signature 
+    like filetype does, but reading a single header per file and matching it through a 
+    precompiled dispatch table.
+* parallel_file_categorization.py: containing a strategy decorating any other file 
+    categorization strategy to classify files in parallel, through a pool of processes or threads.
+* permission_policy.py: containing a strategy for identifying files with unusual permission
+    settings according to declarative rules, loaded from a TOML or JSON file.
+* scan_table.py: containing a NumPy-backed table of the files of a scan, answering
+    queries like multi-threshold counts, percentiles and histograms of sizes through 
+    vectorized operations (it requires NumPy, an optional dependency).
+* scan_checkpoint.py: containing the checkpoints of the progress of scans (i.e. their
+    frontier and partial aggregates), atomically saved to a file so that interrupted scans
+    can be resumed.
+* scan_snapshot.py: containing the compressed, column-oriented snapshots of scans, written in 
+    a streaming fashion while walking the tree sorted by path, and the merge-join of two of
+    them listing the files which changed in between.
+* scan_index.py: containing a persistent, SQLite-backed index of past scans, allowing 
+    subsequent scans to skip unchanged directories and files.
 * file_permissions.py: containing the definition of the class representing the abstraction 
     of file permission.
 
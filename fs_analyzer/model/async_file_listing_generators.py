@@ -0,0 +1,253 @@
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, AsyncGenerator, Callable, Dict, Iterable, List, Set
+import asyncio
+import inspect
+import os
+import threading
+
+from fs_analyzer.model.file_listing_generators import *
+
+
+# the number of items produced at once by a synchronous generator in the executor
+_BATCH_SIZE = 256
+# like the default executor of asyncio, but shared by all the event loops
+_DEFAULT_EXECUTOR_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+_default_executor = None
+_default_executor_lock = threading.Lock()
+
+
+def _get_default_executor() -> Executor:
+    global _default_executor
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = ThreadPoolExecutor(max_workers=_DEFAULT_EXECUTOR_WORKERS,
+                                                   thread_name_prefix="fs_analyzer_async")
+        return _default_executor
+
+
+class _CallbackInvocation:
+    """The invocation of a callback by a synchronous generator, to be replayed in the event loop."""
+    __slots__ = ("callback", "args")
+
+    def __init__(self, callback: Callable, args: tuple) -> None:
+        self.callback = callback
+        self.args = args
+
+
+async def iterate_in_executor(generator_function: Callable[..., Iterable],
+                              *args,
+                              executor: Executor = None,
+                              batch_size: int = _BATCH_SIZE,
+                              callbacks: Dict[str, Callable] = None,
+                              **kwargs) -> AsyncGenerator[Any, None]:
+    """Generate asynchronously the items of the synchronous generator returned by calling
+    generator_function with the provided arguments, by advancing it in an executor, one batch
+    of items at a time, so that the blocking calls it makes (e.g., scandir, stat or file reads)
+    never block the event loop.
+    The callbacks it is provided with (e.g., on_error) are invoked in the event loop too,
+    in the same order as the items, and awaited if they are coroutine functions.
+
+    Note that:
+    - the concurrency is bounded by the executor: each generator occupies at most one
+        of its workers at a time.
+    - if the consumer stops iterating (e.g., it is cancelled), the synchronous generator
+        is closed as soon as the batch being produced, if any, is completed.
+
+    Args:
+        generator_function (Callable[..., Iterable]): the function returning the synchronous
+            generator (e.g., yield_files_sizes).
+        executor (Executor, optional): the executor advancing the generator.
+            Defaults to None (i.e. a thread pool shared by all the calls).
+        batch_size (int, optional): the max number of items produced at once.
+            Defaults to 256.
+        callbacks (Dict[str, Callable], optional): the callbacks to provide generator_function
+            with, by keyword (the None ones are ignored).
+            Defaults to None.
+
+    Yields:
+        AsyncGenerator[Any, None]: the asynchronous generator of the items.
+    """
+    executor = executor if executor is not None else _get_default_executor()
+    batch: List[Any] = []
+
+    def invocations_of(callback: Callable) -> Callable:
+        return lambda *callback_args: batch.append(_CallbackInvocation(callback, callback_args))
+
+    kwargs.update({name: invocations_of(callback) for (name, callback) in (callbacks or {}).items()
+                   if callback is not None})
+    generator = None
+
+    def produce_batch() -> tuple[List[Any], bool]:
+        nonlocal batch, generator
+        batch = []
+        if generator is None:
+            generator = iter(generator_function(*args, **kwargs))
+        items_count = 0
+        for item in islice(generator, batch_size):
+            batch.append(item)
+            items_count += 1
+        return (batch, items_count < batch_size)
+
+    pending_batch: Future = None
+    completed = False
+    try:
+        while not completed:
+            pending_batch = executor.submit(produce_batch)
+            produced_batch, completed = await asyncio.wrap_future(pending_batch)
+            pending_batch = None
+            for item in produced_batch:
+                if isinstance(item, _CallbackInvocation):
+                    if inspect.isawaitable(result := item.callback(*item.args)):
+                        await result
+                else:
+                    yield item
+    finally:
+        def close_generator(_ = None) -> None:
+            if generator is not None:
+                generator.close()
+        if pending_batch is not None:
+            pending_batch.add_done_callback(close_generator)
+        elif generator is not None and not completed:
+            # closing may block (e.g., stopping a parallel traversal)
+            executor.submit(close_generator)
+
+
+def async_yield_files_sizes(directory_path: str,
+                            on_error = None,
+                            traversal_options: TraversalOptions = TraversalOptions(),
+                            executor: Executor = None) -> AsyncGenerator[tuple[str, int], None]:
+    """The asynchronous counterpart of yield_files_sizes (see iterate_in_executor),
+    whose on_error may be a coroutine function.
+    """
+    return iterate_in_executor(yield_files_sizes, directory_path,
+                               traversal_options=traversal_options,
+                               executor=executor, callbacks={"on_error": on_error})
+
+
+def async_yield_file_categories(directory_path: str,
+                                file_categorization_strategy: FileCategorizationStrategy = FileCategorizerByExtension(),
+                                on_error = None,
+                                traversal_options: TraversalOptions = TraversalOptions(),
+                                executor: Executor = None) -> AsyncGenerator[tuple[str, FileCategory], None]:
+    """The asynchronous counterpart of yield_file_categories (see iterate_in_executor),
+    whose on_error may be a coroutine function.
+    """
+    return iterate_in_executor(yield_file_categories, directory_path, file_categorization_strategy,
+                               traversal_options=traversal_options,
+                               executor=executor, callbacks={"on_error": on_error})
+
+
+def async_yield_files_larger_than(directory_path: str,
+                                  threshold_in_bytes: int,
+                                  on_error = None,
+                                  traversal_options: TraversalOptions = TraversalOptions(),
+                                  executor: Executor = None) -> AsyncGenerator[tuple[str, int], None]:
+    """The asynchronous counterpart of yield_files_larger_than (see iterate_in_executor),
+    whose on_error may be a coroutine function.
+    """
+    return iterate_in_executor(yield_files_larger_than, directory_path, threshold_in_bytes,
+                               traversal_options=traversal_options,
+                               executor=executor, callbacks={"on_error": on_error})
+
+
+def async_yield_largest_files(directory_path: str,
+                              files_count: int,
+                              threshold_in_bytes: int = -1,
+                              on_new_leader = None,
+                              on_error = None,
+                              traversal_options: TraversalOptions = TraversalOptions(),
+                              executor: Executor = None) -> AsyncGenerator[tuple[str, int], None]:
+    """The asynchronous counterpart of yield_largest_files (see iterate_in_executor),
+    whose on_new_leader and on_error may be coroutine functions.
+    """
+    return iterate_in_executor(yield_largest_files, directory_path, files_count, threshold_in_bytes,
+                               traversal_options=traversal_options,
+                               executor=executor,
+                               callbacks={"on_new_leader": on_new_leader, "on_error": on_error})
+
+
+def async_yield_unusual_permissions(directory_path: str,
+                                    permission_reporting_strategy: FilePermissionsReportingStrategy = LooserPermissionsReporting(),
+                                    on_error = None,
+                                    traversal_options: TraversalOptions = TraversalOptions(),
+                                    executor: Executor = None) -> AsyncGenerator[tuple[str, Set[FilePermission]], None]:
+    """The asynchronous counterpart of yield_unusual_permissions (see iterate_in_executor),
+    whose on_error may be a coroutine function.
+    """
+    return iterate_in_executor(yield_unusual_permissions, directory_path, permission_reporting_strategy,
+                               traversal_options=traversal_options,
+                               executor=executor, callbacks={"on_error": on_error})
+
+
+def async_yield_categories_sizes(directory_path: str,
+                                 file_categorization_strategy: FileCategorizationStrategy = FileCategorizerByExtension(),
+                                 on_error = None,
+                                 traversal_options: TraversalOptions = TraversalOptions(),
+                                 executor: Executor = None) -> AsyncGenerator[tuple[FileCategory, int], None]:
+    """The asynchronous counterpart of yield_categories_sizes (see iterate_in_executor),
+    whose on_error may be a coroutine function.
+    """
+    return iterate_in_executor(yield_categories_sizes, directory_path, file_categorization_strategy,
+                               traversal_options=traversal_options,
+                               executor=executor, callbacks={"on_error": on_error})
+
+
+def async_yield_categories_sizes_snapshots(directory_path: str,
+                                           file_categorization_strategy: FileCategorizationStrategy = FileCategorizerByExtension(),
+                                           files_interval: int = None,
+                                           seconds_interval: float = None,
+                                           on_error = None,
+                                           traversal_options: TraversalOptions = TraversalOptions(),
+                                           executor: Executor = None) -> AsyncGenerator[tuple[Dict[FileCategory, int], int, bool], None]:
+    """The asynchronous counterpart of yield_categories_sizes_snapshots (see iterate_in_executor),
+    whose on_error may be a coroutine function. Snapshots are produced one at a time, so that
+    they are delivered as soon as they are taken.
+    """
+    return iterate_in_executor(yield_categories_sizes_snapshots, directory_path, file_categorization_strategy,
+                               files_interval, seconds_interval,
+                               traversal_options=traversal_options,
+                               executor=executor, batch_size=1, callbacks={"on_error": on_error})
+
+
+def async_yield_files_analyses(directory_path: str,
+                               file_categorization_strategy: FileCategorizationStrategy = None,
+                               permission_reporting_strategy: FilePermissionsReportingStrategy = None,
+                               with_size: bool = True,
+                               on_error = None,
+                               traversal_options: TraversalOptions = TraversalOptions(),
+                               executor: Executor = None) -> AsyncGenerator[tuple[str, int, FileCategory, Set[FilePermission]], None]:
+    """The asynchronous counterpart of yield_files_analyses (see iterate_in_executor),
+    whose on_error may be a coroutine function.
+    """
+    return iterate_in_executor(yield_files_analyses, directory_path, file_categorization_strategy,
+                               permission_reporting_strategy, with_size,
+                               traversal_options=traversal_options,
+                               executor=executor, callbacks={"on_error": on_error})
+
+
+def async_yield_files_batches(directory_path: str,
+                              file_categorization_strategy: FileCategorizationStrategy = None,
+                              batch_size: int = 65536,
+                              on_error = None,
+                              traversal_options: TraversalOptions = TraversalOptions(),
+                              executor: Executor = None) -> AsyncGenerator[FilesBatch, None]:
+    """The asynchronous counterpart of yield_files_batches (see iterate_in_executor),
+    whose on_error may be a coroutine function. Batches are produced one at a time.
+    """
+    return iterate_in_executor(yield_files_batches, directory_path, file_categorization_strategy, batch_size,
+                               traversal_options=traversal_options,
+                               executor=executor, batch_size=1, callbacks={"on_error": on_error})
+
+
+def async_yield_directories_sizes(directory_path: str,
+                                  max_depth: int = None,
+                                  on_error = None,
+                                  traversal_options: TraversalOptions = TraversalOptions(),
+                                  executor: Executor = None) -> AsyncGenerator[tuple[str, int, int], None]:
+    """The asynchronous counterpart of yield_directories_sizes (see iterate_in_executor),
+    whose on_error may be a coroutine function.
+    """
+    return iterate_in_executor(yield_directories_sizes, directory_path, max_depth,
+                               traversal_options=traversal_options,
+                               executor=executor, callbacks={"on_error": on_error})
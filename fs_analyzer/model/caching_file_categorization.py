@@ -0,0 +1,178 @@
+from abc import abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Generator, Hashable, Iterable, List, Optional
+
+from fs_analyzer.model.directory_traversal import FileEntry
+from fs_analyzer.model.file_categorization_strategy import FileCategorizationStrategy
+from fs_analyzer.model.file_category import FileCategory
+from fs_analyzer.model.func_utils import call_if_not_none_with_param as call_if_not_none
+
+
+class CachingFileCategorizer(FileCategorizationStrategy):
+    """An abstract implementation of FileCategorizationStrategy decorating another strategy
+    (through the structural "Decorator" OO pattern) with a cache of the categories it computed, 
+    so that files are classified by the decorated strategy only on cache misses. 
+    The cache itself (i.e. how categories are looked up and stored) is up to the concrete
+    implementations.
+    Missed files are classified in batches, so that decorated strategies classifying files 
+    in parallel (e.g., ParallelFileCategorizer) are kept busy, while hits are returned right away.
+    Within a batch, only one file per cache key (see FileCategorizationStrategy.cache_key) is
+    classified, its category being shared with the others (if it cannot be classified, the
+    next file sharing its key is, and so on).
+
+    Args:
+        file_categorization_strategy (FileCategorizationStrategy): the decorated strategy.
+        misses_batch_size (int, optional): the number of missed files sent at once to the 
+            decorated strategy.
+            Defaults to 4096.
+    """
+    def __init__(self,
+                 file_categorization_strategy: FileCategorizationStrategy,
+                 misses_batch_size: int = 4096):
+        self._file_categorization_strategy = file_categorization_strategy
+        self._misses_batch_size = misses_batch_size
+
+    @abstractmethod
+    def _cached_category(self, file_entry: FileEntry) -> Optional[FileCategory]:
+        """Looks up the category of the file of the provided entry in the cache.
+
+        Raises:
+            OSError: if the file cannot be inspected to look it up (e.g., it cannot be stat-ed).
+
+        Returns:
+            Optional[FileCategory]: the cached category of the file, or None on cache miss.
+        """
+        pass
+
+    @abstractmethod
+    def _cache_category(self, file_entry: FileEntry, file_category: FileCategory) -> None:
+        """Stores the category computed for the file of the provided entry in the cache.
+        """
+        pass
+
+    @property
+    def identifier(self) -> str:
+        return self._file_categorization_strategy.identifier
+
+    def cache_key(self, file_entry: FileEntry) -> Hashable:
+        return self._file_categorization_strategy.cache_key(file_entry)
+
+    def categorize_file(self, file_path: str) -> FileCategory:
+        file_entry = FileEntry(file_path)
+        category = self._cached_category(file_entry)
+        if category is None:
+            category = self._file_categorization_strategy.categorize_file(file_path)
+            self._cache_category(file_entry, category)
+        return category
+
+    def categorize_files(self,
+                         file_entries: Iterable[FileEntry],
+                         on_error = None) -> Generator[tuple[FileEntry, FileCategory], None, None]:
+        misses: Dict[Hashable, List[FileEntry]] = {}
+        misses_count = 0
+        for file_entry in file_entries:
+            try:
+                category = self._cached_category(file_entry)
+                if category is None:
+                    key = self.cache_key(file_entry)
+            except OSError as e:
+                call_if_not_none(on_error, e)
+                continue
+            if category is not None:
+                yield (file_entry, category)
+            else:
+                misses.setdefault(key, []).append(file_entry)
+                misses_count += 1
+                if misses_count >= self._misses_batch_size:
+                    yield from self._categorize_misses(misses, on_error)
+                    misses = {}
+                    misses_count = 0
+        if misses:
+            yield from self._categorize_misses(misses, on_error)
+
+    def _categorize_misses(self, 
+                           misses: Dict[Hashable, List[FileEntry]], 
+                           on_error) -> Generator[tuple[FileEntry, FileCategory], None, None]:
+        while misses:
+            # the files sharing the key of a classified one are identified by the latter's id
+            missed_files = {id(file_entries[0]): file_entries for file_entries in misses.values()}
+            classified_files = self._file_categorization_strategy.categorize_files(
+                [file_entries[0] for file_entries in misses.values()], on_error)
+            for (file_entry, category) in classified_files:
+                for missed_file_entry in missed_files.pop(id(file_entry)):
+                    self._cache_category(missed_file_entry, category)
+                    yield (missed_file_entry, category)
+            # the files which could not be classified (already passed to on_error) may be
+            # specific to the file, so the others sharing their key are tried in the next round
+            misses = {key: file_entries[1:] for (key, file_entries) in misses.items()
+                      if id(file_entries[0]) in missed_files and len(file_entries) > 1}
+
+
+@dataclass(frozen=True)
+class CacheStatistics:
+    """Represents the statistics of a cache, for diagnostics. Instances of this class 
+    cannot be edited at runtime.
+
+    Args:
+        hits (int): the number of lookups which found the looked up item.
+        misses (int): the number of lookups which did not find the looked up item.
+        evictions (int): the number of items evicted to make room for new ones.
+        size (int): the number of items currently cached.
+    """
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+
+class LruFileCategorizer(CachingFileCategorizer):
+    """A concrete implementation of CachingFileCategorizer whose cache is an in-memory, bounded,
+    Least Recently Used (LRU) one, keyed by the cache key of the decorated strategy (see
+    FileCategorizationStrategy.cache_key): for instance, FileCategorizerByExtension is memoized
+    per extension, while FileCategorizerBySignature per (device, inode, modification time),
+    so that hard links to the same file are classified only once.
+    Its statistics count as misses the categories computed by the decorated strategy, and as hits
+    those reused, either from the cache or from files of the same batch sharing the same key.
+
+    Args:
+        file_categorization_strategy (FileCategorizationStrategy): the decorated strategy.
+        max_size (int, optional): the max number of categories cached.
+            Defaults to 65536.
+    """
+    def __init__(self,
+                 file_categorization_strategy: FileCategorizationStrategy,
+                 max_size: int = 65536):
+        super().__init__(file_categorization_strategy)
+        self._max_size = max_size
+        self._categories: OrderedDict[Hashable, FileCategory] = OrderedDict()
+        self._hits = self._misses = self._evictions = 0
+
+    @property
+    def cache_statistics(self) -> CacheStatistics:
+        """The statistics of the cache, for diagnostics."""
+        return CacheStatistics(self._hits, self._misses, self._evictions, len(self._categories))
+
+    def _cached_category(self, file_entry: FileEntry) -> Optional[FileCategory]:
+        key = self.cache_key(file_entry)
+        category = self._categories.get(key)
+        if category is not None:
+            self._hits += 1
+            self._categories.move_to_end(key)
+        return category
+
+    def _cache_category(self, file_entry: FileEntry, file_category: FileCategory) -> None:
+        try:
+            key = self.cache_key(file_entry)
+        except OSError:
+            return
+        if key in self._categories:
+            # shared by a file of the same batch
+            self._hits += 1
+            self._categories.move_to_end(key)
+            return
+        self._misses += 1
+        self._categories[key] = file_category
+        if len(self._categories) > self._max_size:
+            self._categories.popitem(last=False)
+            self._evictions += 1
@@ -0,0 +1,602 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Generator, Iterable, List, Optional, Set, Tuple
+import os
+import queue
+import re
+import threading
+
+from fs_analyzer.model.func_utils import call_if_not_none_with_param as call_if_not_none
+
+if TYPE_CHECKING:
+    from fs_analyzer.model.scan_index import ScanIndex
+
+
+class PathFilter:
+    """Represents the include and exclude glob patterns of a directory tree traversal, compiled
+    once into a single combined regular expression each. Excluded directories are pruned, 
+    i.e. they are not even listed, while include patterns only select the files (directories
+    are always visited, unless excluded).
+    Like in .gitignore files, patterns without a slash (e.g., '.git', 'node_modules' or '*.tmp')
+    match the name of a file or directory, while those with a slash (e.g., 'build/cache') match 
+    the trailing components of its path. '*' and '?' do not match slashes, '**' does (and
+    '**/' matches zero or more directories), and '[...]' matches a character class ('[!...]'
+    its complement). Paths are matched relative to the root of the traversal (see relative_to),
+    so that patterns never match the directories above it.
+
+    Args:
+        excludes (Iterable[str], optional): the patterns of the files and directories to skip.
+            Defaults to ().
+        includes (Iterable[str], optional): the patterns of the files to select.
+            Defaults to () (i.e. all the files not excluded).
+    """
+    __slots__ = ("excludes", "includes", "_excluded", "_included", "_root_length")
+
+    def __init__(self, excludes: Iterable[str] = (), includes: Iterable[str] = ()) -> None:
+        self.excludes = tuple(excludes)
+        self.includes = tuple(includes)
+        self._excluded = _compile_patterns(self.excludes)
+        self._included = _compile_patterns(self.includes)
+        self._root_length = 0
+
+    @classmethod
+    def from_file(cls, patterns_path: str, includes: Iterable[str] = ()) -> "PathFilter":
+        """Creates a filter excluding the patterns listed in the provided file, one per line
+        (blank lines and lines starting with '#' are ignored).
+
+        Raises:
+            OSError: if the file cannot be read.
+        """
+        with open(patterns_path) as patterns_file:
+            excludes = [line.strip() for line in patterns_file]
+        return cls([pattern for pattern in excludes if pattern and not pattern.startswith("#")], includes)
+
+    def relative_to(self, root_path: str) -> "PathFilter":
+        """Returns a copy of the filter matching the paths of the files and directories under
+        the provided root (i.e. that of a traversal) relative to it, e.g. 'src/*' excludes
+        'root/src/a' but no file under 'src/root'.
+        """
+        path_filter = PathFilter.__new__(PathFilter)
+        for name in PathFilter.__slots__:
+            setattr(path_filter, name, getattr(self, name))
+        path_filter._root_length = len(os.path.join(root_path, ""))
+        return path_filter
+
+    def is_excluded(self, path: str) -> bool:
+        """Returns whether the provided file or directory is excluded."""
+        return self._excluded is not None and self._excluded(path, self._root_length) is not None
+
+    def is_selected_file(self, path: str) -> bool:
+        """Returns whether the provided file is neither excluded nor left out by the includes."""
+        return (not self.is_excluded(path)) and (self._included is None or self._included(path, self._root_length) is not None)
+
+    def __repr__(self) -> str:
+        return f"PathFilter(excludes={self.excludes!r}, includes={self.includes!r})"
+
+
+def _compile_patterns(patterns: Tuple[str, ...]):
+    """Compiles the provided glob patterns into the match method of a single regular expression,
+    matching the paths whose trailing components match any of them (None if no patterns). The
+    match method takes the position the (relative) path starts at too.
+    """
+    if not patterns:
+        return None
+    alternatives = "|".join(_translate_pattern(pattern.strip("/")) for pattern in patterns)
+    return re.compile(f"(?s:(?:.*/)?(?:{alternatives}))\\Z").match
+
+
+def _translate_pattern(pattern: str) -> str:
+    translated = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            # like in .gitignore, 'a/**/b' matches 'a/b' too
+            translated.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            translated.append(".*")
+            i += 2
+            continue
+        character = pattern[i]
+        i += 1
+        if character == "*":
+            translated.append("[^/]*")
+        elif character == "?":
+            translated.append("[^/]")
+        elif character == "[" and (end := pattern.find("]", i + 1)) != -1:
+            character_class = pattern[i:end]
+            if character_class.startswith("!"):
+                character_class = "^" + character_class[1:]
+            translated.append("[" + character_class.replace("\\", "\\\\") + "]")
+            i = end + 1
+        else:
+            translated.append(re.escape(character))
+    return "".join(translated)
+
+
+@dataclass(frozen=True)
+class TraversalOptions:
+    """Represents the settings of a directory tree traversal. Instances of this class 
+    cannot be edited at runtime.
+    
+    Args:
+        workers (int): the number of threads listing directories (and stat-ing their files)
+            concurrently. With more than one worker, subdirectories are distributed to a 
+            thread pool, which pays off on high-latency file systems (e.g., NFS) since 
+            blocking syscalls release the GIL.
+            Defaults to 1 (i.e. sequential traversal).
+        scan_index (ScanIndex, optional): the index of past traversals, used to avoid listing
+            again the directories which did not change since then, and to record the listings
+            of those which did.
+            Defaults to None.
+        path_filter (PathFilter, optional): the include and exclude patterns of the traversal.
+            Defaults to None (i.e. all the files are visited).
+        one_file_system (bool): whether to stay on the file system of the root, i.e. not to
+            descend into the directories on other devices (e.g., mount points like /proc).
+            Defaults to False.
+        hard_links_once (bool): whether to return only once the files with many hard links
+            (i.e. the first path met of each inode), so that their sizes are counted once.
+            Defaults to False.
+    """
+    workers: int = 1
+    scan_index: "ScanIndex" = None
+    path_filter: PathFilter = None
+    one_file_system: bool = False
+    hard_links_once: bool = False
+
+    def start_traversal(self, directory_path: str) -> Tuple[Optional[PathFilter], Optional[int], Optional["HardLinks"]]:
+        """Returns the state of a new traversal of the provided tree, to be passed to 
+        yield_directory_file_entries: the path filter matching the paths relative to its root,
+        if any, the device of its root, if the traversal must stay on its file system, and a 
+        new record of the hard links met, if they must be returned once.
+
+        Raises:
+            OSError: if the root of the tree cannot be stat-ed.
+        """
+        path_filter = self.path_filter.relative_to(directory_path) if self.path_filter is not None else None
+        root_device = os.stat(directory_path).st_dev if self.one_file_system else None
+        return (path_filter, root_device, HardLinks() if self.hard_links_once else None)
+
+
+class HardLinks:
+    """Represents the inodes with many hard links met during a traversal, so that each of them
+    is returned only once. The inode of a file is known from the directory listing itself, 
+    so that the files whose inode was already met are skipped without being stat-ed, while
+    the others are stat-ed once (as consumers do anyway) to know their number of links.
+    Only the inodes with many links are recorded, as integers grouped by device, so that 
+    the memory used depends on the hard-linked files rather than on the size of the tree.
+    Instances of this class can be shared by the threads of a parallel traversal.
+    """
+    __slots__ = ("_inodes_by_device", "_lock")
+
+    def __init__(self, inodes_by_device: Dict[int, Iterable[int]] = None) -> None:
+        self._inodes_by_device: Dict[int, Set[int]] = {device: set(inodes)
+                                                        for (device, inodes) in (inodes_by_device or {}).items()}
+        self._lock = threading.Lock()
+
+    def inodes_by_device(self) -> Dict[int, Tuple[int, ...]]:
+        """Returns the inodes with many links met so far, by device (e.g., to save them along 
+        with the checkpoint of a scan, so that they are known when it is resumed).
+        """
+        with self._lock:
+            return {device: tuple(inodes) for (device, inodes) in self._inodes_by_device.items()}
+
+    def is_first_link(self, device: int, entry: "FileEntry") -> bool:
+        """Returns whether the provided file, residing on the provided device, is the first
+        path met of its inode (files which cannot be stat-ed are deemed so, their error
+        being reported to the consumer stat-ing them).
+        """
+        try:
+            inode = entry.inode()
+            if inode in self._inodes_by_device.get(device, ()):
+                return False
+            if entry.stat().st_nlink <= 1:
+                return True
+        except OSError:
+            return True
+        with self._lock:
+            inodes = self._inodes_by_device.setdefault(device, set())
+            if inode in inodes:
+                return False
+            inodes.add(inode)
+        return True
+
+    def __len__(self) -> int:
+        return sum(len(inodes) for inodes in self._inodes_by_device.values())
+
+
+class FileEntry:
+    """Represents a file discovered during the traversal of a directory tree. It is a
+    lightweight record wrapping the os.DirEntry returned by os.scandir, so that the file
+    type is obtained from the directory listing itself (i.e. the d_type field, without any
+    syscall) and the file stat is computed at most once, lazily, and then cached.
+
+    Args:
+        path (str): the path of the file.
+        depth (int, optional): the depth of the file with respect to the root of the
+            traversed tree (files directly inside the root have depth 0).
+            Defaults to 0.
+        dir_entry (os.DirEntry, optional): the directory entry the file was discovered by.
+            Defaults to None.
+        stat (os.stat_result, optional): the already known stat of the file.
+            Defaults to None.
+    """
+    __slots__ = ("path", "depth", "_dir_entry", "_stat")
+
+    def __init__(self,
+                 path: str,
+                 depth: int = 0,
+                 dir_entry: os.DirEntry = None,
+                 stat: os.stat_result = None) -> None:
+        self.path = path
+        self.depth = depth
+        self._dir_entry = dir_entry
+        self._stat = stat
+
+    @property
+    def name(self) -> str:
+        """The base name of the file."""
+        return self._dir_entry.name if self._dir_entry is not None else os.path.basename(self.path)
+
+    def inode(self) -> int:
+        """Returns the inode number of the file, which is known from the directory listing 
+        (i.e. without any syscall, except on Windows) unless the file was not discovered by it.
+
+        Raises:
+            OSError: if the inode cannot be determined.
+        """
+        if self._stat is None and self._dir_entry is not None:
+            return self._dir_entry.inode()
+        return self.stat().st_ino
+
+    def stat(self) -> os.stat_result:
+        """Returns the stat of the file (without following symbolic links), issuing the
+        corresponding syscall only the first time it is invoked.
+
+        Raises:
+            OSError: if the file cannot be stat-ed (e.g., it was removed meanwhile).
+
+        Returns:
+            os.stat_result: the stat of the file.
+        """
+        if self._stat is None:
+            if self._dir_entry is not None:
+                self._stat = self._dir_entry.stat(follow_symlinks=False)
+            else:
+                self._stat = os.stat(self.path, follow_symlinks=False)
+        return self._stat
+
+    def __repr__(self) -> str:
+        return f"FileEntry(path={self.path!r}, depth={self.depth})"
+
+
+def yield_file_entries(directory_path: str,
+                       on_error = None,
+                       traversal_options: TraversalOptions = TraversalOptions()) -> Generator[FileEntry, None, None]:
+    """Generate the entries of the files contained in the directory tree pointed by the
+    path provided, one by one, by walking the tree top-down with os.scandir.
+    Each directory is listed exactly once and no stat is issued by the traversal itself:
+    consumers needing it get it, cached, through FileEntry.stat.
+
+    Note that:
+    - Symbolic links are ignored (neither returned nor followed).
+    - Directories are not returned (only files).
+    - Directories excluded by the path filter of the traversal are not visited, as those
+        on other devices if the traversal is restricted to the file system of the root.
+    - if hard links are returned once, which path of a hard-linked file is returned is
+        not specified (the first one met).
+    - For files at the same depth level of the tree, no assumptions are made
+        regarding the order by which entries are returned.
+    - if no on_error is provided, exceptions during walk are silently ignored.
+    - in a parallel traversal, the files are stat-ed by the workers before being returned,
+        while on_error is always called by the thread consuming the generator.
+
+    Args:
+        directory_path (str): the path where the directory root of the tree resides.
+        on_error (optional): the handler for any errors happening during the walk.
+            Defaults to None.
+        traversal_options (TraversalOptions, optional): the settings of the traversal.
+            Defaults to TraversalOptions().
+
+    Yields:
+        Generator[FileEntry, None, None]: the generator of the entries of the files.
+    """
+    try:
+        path_filter, root_device, hard_links = traversal_options.start_traversal(directory_path)
+    except OSError as e:
+        call_if_not_none(on_error, e)
+        return
+    if traversal_options.workers > 1:
+        yield from _yield_file_entries_in_parallel(directory_path, traversal_options, path_filter, root_device, hard_links,
+                                                   on_error)
+        return
+    pending_directories = [(directory_path, 0)]
+    while pending_directories:
+        current_directory, depth = pending_directories.pop()
+        subdirectories = []
+        yield from yield_directory_file_entries(current_directory, depth, subdirectories, 
+                                                on_error, traversal_options.scan_index,
+                                                path_filter, root_device, hard_links)
+        # reversed so that subdirectories are visited in the order they were listed
+        pending_directories.extend(reversed(subdirectories))
+
+
+def yield_directory_file_entries(directory_path: str,
+                                 depth: int,
+                                 subdirectories: List[Tuple[str, int]],
+                                 on_error = None,
+                                 scan_index: "ScanIndex" = None,
+                                 path_filter: PathFilter = None,
+                                 root_device: int = None,
+                                 hard_links: HardLinks = None) -> Generator[FileEntry, None, None]:
+    """Generate the entries of the files directly contained in the provided directory (i.e. 
+    lists a single directory), appending its subdirectories, along with their depth, to the 
+    provided list. It is the building block of the traversals of the directory tree, and of 
+    those needing to control the order by which directories are visited (e.g., bottom-up ones).
+    If a scan index is provided and the directory did not change since its listing was recorded,
+    the recorded listing is used, otherwise the directory is listed and its listing recorded.
+    If a path filter is provided, only the selected files and the subdirectories which are
+    not excluded are returned (the recorded listing being the unfiltered one). Likewise, if a
+    root device is provided, the subdirectories on other devices are not returned, and if the
+    hard links met are provided, the files whose inode was already met are not returned.
+
+    Note that:
+    - Symbolic links are ignored (neither returned nor appended to subdirectories).
+    - if no on_error is provided, exceptions during listing are silently ignored.
+
+    Args:
+        directory_path (str): the path of the directory.
+        depth (int): the depth of the directory with respect to the root of the traversed tree,
+            i.e. that of the returned entries (subdirectories are appended with depth + 1).
+        subdirectories (List[Tuple[str, int]]): the list subdirectories are appended to.
+        on_error (optional): the handler for any errors happening during the listing.
+            Defaults to None.
+        scan_index (ScanIndex, optional): the index of past traversals.
+            Defaults to None.
+        path_filter (PathFilter, optional): the include and exclude patterns, relative to the
+            root of the traversal (see TraversalOptions.start_traversal).
+            Defaults to None.
+        root_device (int, optional): the device the traversal is restricted to 
+            (see TraversalOptions.start_traversal).
+            Defaults to None.
+        hard_links (HardLinks, optional): the hard links met so far by the traversal
+            (see TraversalOptions.start_traversal).
+            Defaults to None.
+
+    Yields:
+        Generator[FileEntry, None, None]: the generator of the entries of the files.
+    """
+    if path_filter is not None or root_device is not None or hard_links is not None:
+        yield from _yield_filtered_directory_file_entries(directory_path, depth, subdirectories, on_error, scan_index,
+                                                          path_filter, root_device, hard_links)
+        return
+    yield from _yield_listed_directory_file_entries(directory_path, depth, subdirectories, on_error, scan_index)
+
+
+def _yield_listed_directory_file_entries(directory_path: str,
+                                         depth: int,
+                                         subdirectories: List[Tuple],
+                                         on_error,
+                                         scan_index: Optional["ScanIndex"],
+                                         with_devices: bool = False) -> Generator[FileEntry, None, None]:
+    """Lists a single directory through yield_directory_file_entries, without filtering it.
+    If with_devices, subdirectories are appended along with their device too, if known from
+    the listing (i.e. None if the recorded listing is used, or if it cannot be determined).
+    """
+    if scan_index is None:
+        yield from _yield_directory_files(directory_path, depth, subdirectories, on_error, with_devices)
+        return
+    try:
+        directory_stat = os.stat(directory_path)
+    except OSError as e:
+        call_if_not_none(on_error, e)
+        return
+    if (listing := scan_index.directory_listing(directory_path, directory_stat)) is not None:
+        file_names, subdirectory_names = listing
+        subdirectories.extend((os.path.join(directory_path, name), depth + 1, *((None,) if with_devices else ()))
+                              for name in subdirectory_names)
+        for file_name in file_names:
+            yield FileEntry(os.path.join(directory_path, file_name), depth)
+        return
+    listing_errors = []
+    def on_listing_error(e: OSError) -> None:
+        listing_errors.append(e)
+        call_if_not_none(on_error, e)
+    first_subdirectory = len(subdirectories)
+    file_names = []
+    for entry in _yield_directory_files(directory_path, depth, subdirectories, on_listing_error, with_devices):
+        file_names.append(entry.name)
+        yield entry
+    if not listing_errors:
+        scan_index.record_directory_listing(directory_path, 
+                                            directory_stat, 
+                                            file_names,
+                                            [os.path.basename(subdirectory[0]) for subdirectory in subdirectories[first_subdirectory:]])
+
+
+def _yield_filtered_directory_file_entries(directory_path: str,
+                                           depth: int,
+                                           subdirectories: List[Tuple[str, int]],
+                                           on_error,
+                                           scan_index: "ScanIndex",
+                                           path_filter: Optional[PathFilter],
+                                           root_device: Optional[int],
+                                           hard_links: Optional[HardLinks]) -> Generator[FileEntry, None, None]:
+    """Lists a single directory through yield_directory_file_entries, leaving out the files
+    and the subdirectories which are filtered out by the provided path filter, root device
+    and hard links.
+    """
+    if hard_links is not None:
+        try:
+            # the files of a directory reside on its device (mount points are directories)
+            device = root_device if root_device is not None else os.stat(directory_path).st_dev
+        except OSError as e:
+            call_if_not_none(on_error, e)
+            return
+    listed_subdirectories = []
+    for entry in _yield_listed_directory_file_entries(directory_path, depth, listed_subdirectories, on_error, scan_index,
+                                                      with_devices=root_device is not None):
+        if path_filter is not None and not path_filter.is_selected_file(entry.path):
+            continue
+        if hard_links is not None and not hard_links.is_first_link(device, entry):
+            continue
+        yield entry
+    for subdirectory in listed_subdirectories:
+        if path_filter is not None and path_filter.is_excluded(subdirectory[0]):
+            continue
+        if root_device is not None:
+            try:
+                subdirectory_device = subdirectory[2] if subdirectory[2] is not None else os.lstat(subdirectory[0]).st_dev
+            except OSError as e:
+                call_if_not_none(on_error, e)
+                continue
+            if subdirectory_device != root_device:
+                continue
+        subdirectories.append(subdirectory[:2])
+
+
+def _yield_directory_files(directory_path: str,
+                           depth: int,
+                           subdirectories: List[Tuple],
+                           on_error = None,
+                           with_devices: bool = False) -> Generator[FileEntry, None, None]:
+    """Lists a single directory, yielding the entries of its files and appending its
+    subdirectories (along with their depth, and their device if with_devices) to the provided
+    list. It is the building block shared by every traversal of the directory tree.
+    """
+    try:
+        scandir_iterator = os.scandir(directory_path)
+    except OSError as e:
+        call_if_not_none(on_error, e)
+        return
+    with scandir_iterator:
+        while True:
+            try:
+                dir_entry = next(scandir_iterator)
+            except StopIteration:
+                break
+            except OSError as e:
+                call_if_not_none(on_error, e)
+                return
+            try:
+                if dir_entry.is_symlink():
+                    continue
+                is_directory = dir_entry.is_dir(follow_symlinks=False)
+            except OSError:
+                # like os.walk, entries whose type cannot be determined are deemed files
+                is_directory = False
+            if is_directory and with_devices:
+                subdirectories.append((dir_entry.path, depth + 1, _entry_device(dir_entry)))
+            elif is_directory:
+                subdirectories.append((dir_entry.path, depth + 1))
+            else:
+                yield FileEntry(dir_entry.path, depth, dir_entry)
+
+
+def _entry_device(dir_entry: os.DirEntry) -> Optional[int]:
+    # the stat of the entry is free on Windows, and it costs a single syscall elsewhere
+    try:
+        return dir_entry.stat(follow_symlinks=False).st_dev
+    except OSError:
+        return None  # raised again when the subdirectory is stat-ed by path
+
+
+# the bounds of the queues of a parallel traversal, per worker
+_PENDING_DIRECTORIES_PER_WORKER = 64
+_RESULTS_PER_WORKER = 16
+# the max number of entries sent at once from a worker to the consumer
+_RESULTS_BATCH_SIZE = 512
+# how often (in seconds) blocked workers check whether the traversal was stopped
+_POLL_INTERVAL = 0.05
+_TRAVERSAL_COMPLETED = object()
+
+
+def _yield_file_entries_in_parallel(directory_path: str,
+                                    traversal_options: TraversalOptions,
+                                    path_filter: Optional[PathFilter],
+                                    root_device: Optional[int],
+                                    hard_links: Optional[HardLinks],
+                                    on_error = None) -> Generator[FileEntry, None, None]:
+    """Distributes the directories of the tree to a pool of threads, each one listing them
+    and stat-ing their files, and streams back the resulting entries (in batches) through 
+    a bounded queue. Subdirectories are shared through a bounded queue too: when it is full,
+    the worker which discovered them visits them itself, so that workers never block each other.
+    """
+    workers = traversal_options.workers
+    pending_directories = queue.Queue(maxsize=workers * _PENDING_DIRECTORIES_PER_WORKER)
+    results = queue.Queue(maxsize=workers * _RESULTS_PER_WORKER)
+    stopped = threading.Event()
+    unfinished_directories_lock = threading.Lock()
+    unfinished_directories = 1
+    pending_directories.put((directory_path, 0))
+
+    def send(result) -> None:
+        while not stopped.is_set():
+            try:
+                results.put(result, timeout=_POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+    def visit(directory: Tuple[str, int], own_directories: List[Tuple[str, int]]) -> None:
+        nonlocal unfinished_directories
+        subdirectories = []
+        batch = []
+        def on_listing_error(e: OSError) -> None:
+            # the errors are sent along with the entries, in the batch being filled
+            batch.append(e)
+        for entry in yield_directory_file_entries(*directory, subdirectories, on_listing_error, 
+                                                  traversal_options.scan_index, path_filter,
+                                                  root_device, hard_links):
+            if stopped.is_set():
+                return
+            try:
+                entry.stat()
+            except OSError:
+                pass  # raised again to the consumer, when it stats the entry
+            batch.append(entry)
+            if len(batch) >= _RESULTS_BATCH_SIZE:
+                send(batch)
+                batch = []
+        if batch:
+            send(batch)
+        with unfinished_directories_lock:
+            unfinished_directories += len(subdirectories)
+        for subdirectory in subdirectories:
+            try:
+                pending_directories.put_nowait(subdirectory)
+            except queue.Full:
+                own_directories.append(subdirectory)
+        with unfinished_directories_lock:
+            unfinished_directories -= 1
+            if unfinished_directories == 0:
+                send(_TRAVERSAL_COMPLETED)
+
+    def work() -> None:
+        try:
+            while not stopped.is_set():
+                try:
+                    own_directories = [pending_directories.get(timeout=_POLL_INTERVAL)]
+                except queue.Empty:
+                    continue
+                while own_directories and not stopped.is_set():
+                    visit(own_directories.pop(), own_directories)
+        except Exception as e:
+            send(e)
+
+    # imported here, since concurrent.futures slows down the start of the CLI
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fs_analyzer_walk") as executor:
+        for _ in range(workers):
+            executor.submit(work)
+        try:
+            while (result := results.get()) is not _TRAVERSAL_COMPLETED:
+                if isinstance(result, Exception):
+                    raise result
+                for item in result:
+                    if isinstance(item, OSError):
+                        call_if_not_none(on_error, item)
+                    else:
+                        yield item
+        finally:
+            stopped.set()
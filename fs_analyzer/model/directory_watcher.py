@@ -0,0 +1,443 @@
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Generator, Iterable, List, Optional, Set, Tuple
+import errno
+import functools
+import os
+import select
+import stat
+import struct
+import sys
+import time
+
+from fs_analyzer.model.directory_traversal import FileEntry, TraversalOptions, yield_directory_file_entries
+from fs_analyzer.model.file_categorization_strategy import FileCategorizationStrategy, FileCategorizerByExtension
+from fs_analyzer.model.file_category import FileCategory
+from fs_analyzer.model.file_permission_reporting_strategy import FilePermissionsReportingStrategy
+from fs_analyzer.model.file_permissions import FilePermission
+from fs_analyzer.model.func_utils import call_if_not_none_with_param as call_if_not_none
+
+
+# whether inotify, which DirectoryWatcher relies on, is available (i.e. on Linux only)
+INOTIFY_AVAILABLE = sys.platform.startswith("linux")
+
+# the inotify events and flags (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = os.O_CLOEXEC
+# the events watched for each directory
+_WATCHED_EVENTS = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+                   | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW | IN_EXCL_UNLINK)
+_EVENTS_REMOVING_ENTRIES = IN_MOVED_FROM | IN_DELETE
+_EVENTS_ADDING_ENTRIES = IN_MOVED_TO | IN_CREATE
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_SIZE = 1 << 16
+
+
+@functools.lru_cache(maxsize=None)
+def _inotify_libc():
+    # the C library is only loaded once a directory is watched, since loading it (through
+    # ctypes) slows down the start of the CLI; the symbols of the C library the interpreter
+    # is linked to are looked up, without searching for it (which spawns ldconfig)
+    import ctypes
+    libc = ctypes.CDLL(None, use_errno=True)
+    libc.inotify_init1.argtypes = [ctypes.c_int]
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    return libc
+
+
+def _require_inotify():
+    if INOTIFY_AVAILABLE:
+        try:
+            return _inotify_libc()
+        except (OSError, AttributeError):
+            pass
+    raise OSError(errno.ENOSYS, "watching directories requires inotify, which is only available on Linux.")
+
+
+@dataclass(frozen=True)
+class InotifyEvent:
+    """Represents an inotify event. Instances of this class cannot be edited at runtime.
+
+    Args:
+        watch (int): the watch descriptor of the directory the event happened in (-1 if the
+            event queue overflowed).
+        mask (int): the bits of the event (e.g., IN_CREATE | IN_ISDIR).
+        name (str): the name of the entry of the directory the event is about ('' if it is
+            about the directory itself).
+    """
+    watch: int
+    mask: int
+    name: str
+
+
+class Inotify:
+    """Represents an inotify instance, accessed through ctypes (i.e. without third-party
+    modules): the directories are watched through add_watch and their events read, in bulk,
+    through read_events.
+
+    Raises:
+        OSError: if inotify is not available or the instance cannot be created (e.g., because
+            of the limit on the number of instances).
+    """
+    def __init__(self) -> None:
+        self._libc = _require_inotify()
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            _raise_errno()
+        self._poll = select.poll()
+        self._poll.register(self._fd, select.POLLIN)
+
+    def add_watch(self, directory_path: str, mask: int = _WATCHED_EVENTS) -> int:
+        """Watches the provided directory (or updates its watch), returning its watch descriptor.
+
+        Raises:
+            OSError: if the directory cannot be watched (e.g., because of the limit on the
+                number of watches, see /proc/sys/fs/inotify/max_user_watches).
+        """
+        watch = self._libc.inotify_add_watch(self._fd, os.fsencode(directory_path), mask)
+        if watch < 0:
+            _raise_errno(directory_path)
+        return watch
+
+    def remove_watch(self, watch: int) -> None:
+        """Stops watching the directory of the provided watch descriptor (if still watched)."""
+        self._libc.inotify_rm_watch(self._fd, watch)
+
+    def read_events(self, timeout: Optional[float] = None) -> List[InotifyEvent]:
+        """Returns the events available, waiting up to timeout seconds for the first one.
+
+        Args:
+            timeout (float, optional): the max number of seconds to wait for.
+                Defaults to None (i.e. waits indefinitely).
+        """
+        if not self._poll.poll(None if timeout is None else max(0, int(timeout * 1000))):
+            return []
+        events = []
+        while True:
+            try:
+                data = os.read(self._fd, _READ_SIZE)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                watch, mask, _, name_length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + name_length].rstrip(b"\0"))
+                offset += name_length
+                events.append(InotifyEvent(watch, mask, name))
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+    def __enter__(self) -> "Inotify":
+        return self
+
+    def __exit__(self, exception_type, exception, traceback) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"Inotify(fd={self._fd})"
+
+
+def _raise_errno(path: str = None):
+    import ctypes
+    error_number = ctypes.get_errno()
+    raise OSError(error_number, os.strerror(error_number), path)
+
+
+@dataclass(frozen=True)
+class WatchedFile:
+    """Represents the state of a watched file, i.e. the outcomes of its analyses. Instances
+    of this class cannot be edited at runtime.
+
+    Args:
+        size (int): the size of the file.
+        category (FileCategory): the category of the file (None if not classified).
+        permissions (FrozenSet[FilePermission]): the unusual permissions of the file.
+    """
+    size: int
+    category: Optional[FileCategory]
+    permissions: FrozenSet[FilePermission]
+
+
+@dataclass(frozen=True)
+class FileChange:
+    """Represents the change of a watched file. Instances of this class cannot be edited at
+    runtime.
+
+    Args:
+        path (str): the path of the file.
+        old_state (WatchedFile): the state of the file before the change (None if added).
+        new_state (WatchedFile): the state of the file after the change (None if removed).
+    """
+    path: str
+    old_state: Optional[WatchedFile]
+    new_state: Optional[WatchedFile]
+
+
+class DirectoryWatcher:
+    """Represents the watch of a directory tree: after an initial scan, the files of the tree
+    are kept up to date by consuming the inotify events of its directories, so that only the
+    affected entries are stat-ed (and classified) again, rather than the whole tree. Events are
+    coalesced over latency_seconds, so that a file written many times is analyzed once.
+    If the events overflow the inotify queue, the tree is scanned again, and only the files
+    which changed meanwhile are returned.
+
+    Note that:
+    - it requires inotify (see INOTIFY_AVAILABLE), i.e. Linux.
+    - Symbolic links are ignored (neither returned nor followed).
+    - the path filter and the one_file_system setting of the traversal options are honoured,
+        while workers, scan indexes and hard_links_once are not supported (i.e. ignored).
+    - the directories which cannot be watched (e.g., because of the limit on the number of
+        watches) are scanned anyway, and their error passed to on_error.
+    - if no on_error is provided, exceptions during walk are silently ignored.
+
+    Args:
+        directory_path (str): the path where the directory root of the tree resides.
+        file_categorization_strategy (FileCategorizationStrategy, optional): the strategy by
+            which to classify files.
+            Defaults to FileCategorizerByExtension.
+        permission_reporting_strategy (FilePermissionsReportingStrategy, optional): the strategy
+            by which to identify unusual permissions.
+            Defaults to None (i.e. permissions are not evaluated).
+        on_error (optional): the handler for any errors happening during the walk.
+            Defaults to None.
+        traversal_options (TraversalOptions, optional): the settings of the traversal.
+            Defaults to TraversalOptions().
+        latency_seconds (float, optional): the number of seconds events are coalesced over.
+            Defaults to 1.
+
+    Raises:
+        OSError: if inotify is not available.
+    """
+    def __init__(self,
+                 directory_path: str,
+                 file_categorization_strategy: FileCategorizationStrategy = FileCategorizerByExtension(),
+                 permission_reporting_strategy: FilePermissionsReportingStrategy = None,
+                 on_error = None,
+                 traversal_options: TraversalOptions = TraversalOptions(),
+                 latency_seconds: float = 1.0) -> None:
+        _require_inotify()
+        self.directory_path = directory_path
+        self.latency_seconds = latency_seconds
+        self._file_categorization_strategy = file_categorization_strategy
+        self._permission_reporting_strategy = permission_reporting_strategy
+        self._on_error = on_error
+        self._path_filter = traversal_options.path_filter.relative_to(directory_path) \
+            if traversal_options.path_filter is not None else None
+        self._one_file_system = traversal_options.one_file_system
+        self._root_device = None
+        self._inotify: Inotify = None
+        # the states of the files, by directory and then by name
+        self._files: Dict[str, Dict[str, WatchedFile]] = {}
+        self._directories_by_watch: Dict[int, str] = {}
+
+    def yield_changes(self) -> Generator[List[FileChange], None, None]:
+        """Generate the changes of the files of the tree, in batches: the first batch lists all
+        the files of the tree (as added), while each of the following ones lists those which
+        changed since the previous batch, once every latency_seconds at most. The watch lasts
+        until the generator is closed or the root of the tree is removed.
+
+        Raises:
+            OSError: if the inotify instance cannot be created.
+
+        Yields:
+            Generator[List[FileChange], None, None]: the generator of the batches of changes.
+        """
+        with Inotify() as self._inotify:
+            try:
+                if self._one_file_system:
+                    self._root_device = os.stat(self.directory_path).st_dev
+                yield self._scan(self.directory_path)
+                while self._directories_by_watch:
+                    events = self._inotify.read_events()
+                    deadline = time.monotonic() + self.latency_seconds
+                    while (remaining_seconds := deadline - time.monotonic()) > 0:
+                        events.extend(self._inotify.read_events(remaining_seconds))
+                    changes = self._process(events)
+                    if changes:
+                        yield changes
+            except OSError as e:
+                call_if_not_none(self._on_error, e)
+            finally:
+                self._files.clear()
+                self._directories_by_watch.clear()
+
+    def _process(self, events: Iterable[InotifyEvent]) -> List[FileChange]:
+        """Applies the provided events, returning the changes of the files."""
+        affected_files: Set[str] = set()
+        removed_directories: Set[str] = set()
+        added_directories: Set[str] = set()
+        for event in events:
+            if event.mask & IN_Q_OVERFLOW:
+                return self._scan(self.directory_path)
+            if event.mask & IN_IGNORED:
+                self._directories_by_watch.pop(event.watch, None)
+                continue
+            directory_path = self._directories_by_watch.get(event.watch)
+            if directory_path is None:
+                continue
+            if event.mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                if directory_path == self.directory_path:
+                    removed_directories.add(directory_path)
+                continue
+            path = os.path.join(directory_path, event.name)
+            if event.mask & IN_ISDIR:
+                if event.mask & _EVENTS_REMOVING_ENTRIES:
+                    removed_directories.add(path)
+                    added_directories.discard(path)
+                if event.mask & _EVENTS_ADDING_ENTRIES:
+                    added_directories.add(path)
+            else:
+                affected_files.add(path)
+        changes = self._remove_directories(removed_directories) if removed_directories else []
+        for directory_path in added_directories:
+            if self._is_traversed(directory_path):
+                changes.extend(self._scan(directory_path))
+        # the files of the removed directories and of the added ones are skipped, or unchanged
+        changes.extend(self._update_files(affected_files))
+        return changes
+
+    def _scan(self, directory_path: str) -> List[FileChange]:
+        """Scans the provided directory tree, watching its directories, returning the changes of
+        its files with respect to their known states (if any).
+        """
+        new_files: Dict[str, Dict[str, WatchedFile]] = {}
+        pending_directories = [(directory_path, 0)]
+        def yield_entries() -> Generator[FileEntry, None, None]:
+            while pending_directories:
+                current_directory, depth = pending_directories.pop()
+                # watched before being listed, so that no entry added meanwhile is missed
+                self._watch(current_directory)
+                new_files[current_directory] = {}
+                yield from yield_directory_file_entries(current_directory, depth, pending_directories, self._on_error,
+                                                        path_filter=self._path_filter, root_device=self._root_device)
+        for (entry, watched_file) in self._analyze(yield_entries()):
+            new_files[os.path.dirname(entry.path)][entry.name] = watched_file
+        old_files = {}
+        if directory_path in self._files:
+            old_files = {path: files for (path, files) in self._files.items() if _is_in_any(path, (directory_path,))}
+        for path in old_files.keys() - new_files.keys():
+            del self._files[path]
+        self._files.update(new_files)
+        return _changes(old_files, new_files)
+
+    def _is_traversed(self, directory_path: str) -> bool:
+        """Returns whether the provided directory, added to the tree after it was scanned, must
+        be scanned and watched, i.e. it is neither excluded by the path filter nor on another
+        device (if the traversal stays on the file system of the root).
+        """
+        if self._path_filter is not None and self._path_filter.is_excluded(directory_path):
+            return False
+        if self._root_device is None:
+            return True
+        try:
+            return os.lstat(directory_path).st_dev == self._root_device
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            call_if_not_none(self._on_error, e)
+            return False
+
+    def _remove_directories(self, directory_paths: Set[str]) -> List[FileChange]:
+        """Forgets the provided directory trees (e.g., removed or moved away)."""
+        old_files = {path: self._files.pop(path) for path in list(self._files) if _is_in_any(path, directory_paths)}
+        for (watch, path) in list(self._directories_by_watch.items()):
+            if _is_in_any(path, directory_paths):
+                # the watches of the moved directories are still active
+                self._inotify.remove_watch(watch)
+                del self._directories_by_watch[watch]
+        return _changes(old_files, {})
+
+    def _update_files(self, file_paths: Iterable[str]) -> List[FileChange]:
+        """Analyzes again the provided files (i.e. re-stats them), returning their changes."""
+        changes = []
+        entries = []
+        for file_path in file_paths:
+            directory_path, name = os.path.split(file_path)
+            directory_files = self._files.get(directory_path)
+            if directory_files is None:
+                continue
+            old_state = directory_files.pop(name, None)
+            try:
+                file_stat = os.lstat(file_path)
+            except FileNotFoundError:
+                file_stat = None
+            except OSError as e:
+                call_if_not_none(self._on_error, e)
+                file_stat = None
+            if (file_stat is None or not stat.S_ISREG(file_stat.st_mode)
+                    or (self._path_filter is not None and not self._path_filter.is_selected_file(file_path))):
+                if old_state is not None:
+                    changes.append(FileChange(file_path, old_state, None))
+                continue
+            entries.append((FileEntry(file_path, stat=file_stat), old_state))
+        old_states = {entry.path: old_state for (entry, old_state) in entries}
+        for (entry, new_state) in self._analyze(entry for (entry, _) in entries):
+            self._files[os.path.dirname(entry.path)][entry.name] = new_state
+            old_state = old_states.pop(entry.path)
+            if new_state != old_state:
+                changes.append(FileChange(entry.path, old_state, new_state))
+        # the files which could not be analyzed anymore
+        changes.extend(FileChange(path, old_state, None) for (path, old_state) in old_states.items() if old_state is not None)
+        return changes
+
+    def _analyze(self, entries: Iterable[FileEntry]) -> Generator[Tuple[FileEntry, WatchedFile], None, None]:
+        if self._file_categorization_strategy is not None:
+            categorized_entries = self._file_categorization_strategy.categorize_files(entries, on_error=self._on_error)
+        else:
+            categorized_entries = ((entry, None) for entry in entries)
+        for (entry, file_category) in categorized_entries:
+            try:
+                file_stat = entry.stat()
+                permissions = frozenset(self._permission_reporting_strategy.report_file_unusual_permissions(entry.path, file_stat)
+                                        if self._permission_reporting_strategy is not None else ())
+            except OSError as e:
+                call_if_not_none(self._on_error, e)
+                continue
+            yield (entry, WatchedFile(file_stat.st_size, file_category, permissions))
+
+    def _watch(self, directory_path: str) -> None:
+        try:
+            self._directories_by_watch[self._inotify.add_watch(directory_path)] = directory_path
+        except OSError as e:
+            call_if_not_none(self._on_error, e)
+
+    def __len__(self) -> int:
+        """Returns the number of files watched."""
+        return sum(len(files) for files in self._files.values())
+
+    def __repr__(self) -> str:
+        return f"DirectoryWatcher(directory_path={self.directory_path!r}, latency_seconds={self.latency_seconds})"
+
+
+def _is_in_any(path: str, directory_paths: Iterable[str]) -> bool:
+    """Returns whether the provided path is any of the provided directories or is inside any of them."""
+    return any(path == directory_path or path.startswith(os.path.join(directory_path, "")) for directory_path in directory_paths)
+
+
+def _changes(old_files: Dict[str, Dict[str, WatchedFile]], new_files: Dict[str, Dict[str, WatchedFile]]) -> List[FileChange]:
+    changes = []
+    for directory_path in old_files.keys() | new_files.keys():
+        old_directory_files = old_files.get(directory_path, {})
+        new_directory_files = new_files.get(directory_path, {})
+        for name in old_directory_files.keys() | new_directory_files.keys():
+            old_state, new_state = old_directory_files.get(name), new_directory_files.get(name)
+            if old_state != new_state:
+                changes.append(FileChange(os.path.join(directory_path, name), old_state, new_state))
+    return changes
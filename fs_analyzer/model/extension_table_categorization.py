@@ -0,0 +1,273 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Hashable, Mapping, Optional
+import functools
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import sys
+import threading
+
+from fs_analyzer.model.directory_traversal import FileEntry
+from fs_analyzer.model.file_categorization_strategy import FileCategorizationStrategy, FileCategorizerByExtension
+from fs_analyzer.model.file_category import UNKNOWN_FILE_CATEGORY, FileCategory
+
+
+# the version of the format of the files extension tables are cached to
+_CACHE_FORMAT_VERSION = 2
+# the scheme of the URLs, as recognized by mimetypes (e.g., 'data:')
+_URL_SCHEME = re.compile(r"([^/:]+):", re.DOTALL)
+# what the lookup tables of the strategies map the extensions of compressed files to
+_COMPOUND_EXTENSION = object()
+
+
+@dataclass(frozen=True)
+class ExtensionTable:
+    """Represents the mime types database (see mimetypes) precompiled into lookup tables keyed
+    on the extensions of the files. Instances of this class cannot be edited at runtime.
+
+    Note that the categories are interned, i.e. the extensions of the same mime type (e.g.,
+    '.jpg' and '.jpeg') share a single instance of FileCategory.
+
+    Args:
+        categories_by_extension (Mapping[str, FileCategory]): the categories of the files by
+            their extension (e.g., '.txt'), as registered in the database (i.e. not only in
+            lower case).
+        suffix_map (Mapping[str, str]): the lower case extensions standing for compound ones
+            (e.g., '.tgz' for '.tar.gz').
+        encodings_map (Mapping[str, str]): the extensions of the encodings (e.g., '.gz' for
+            gzip), which are case sensitive.
+    """
+    categories_by_extension: Mapping[str, FileCategory]
+    suffix_map: Mapping[str, str]
+    encodings_map: Mapping[str, str]
+
+    @classmethod
+    def from_mime_types(cls,
+                        types_map: Mapping[str, str],
+                        suffix_map: Mapping[str, str],
+                        encodings_map: Mapping[str, str]) -> "ExtensionTable":
+        """Builds the table from the provided maps, shaped like those of mimetypes."""
+        categories: Dict[str, FileCategory] = {}
+        return cls(MappingProxyType({extension: categories.setdefault(mime_type, FileCategory(mime_type))
+                                     for (extension, mime_type) in types_map.items()}),
+                   MappingProxyType(dict(suffix_map)),
+                   MappingProxyType(dict(encodings_map)))
+
+    @classmethod
+    def from_mimetypes(cls) -> "ExtensionTable":
+        """Builds the table from the mime types database loaded by mimetypes (i.e. its defaults
+        and the files listed in mimetypes.knownfiles), initializing it if needed.
+        """
+        if not mimetypes.inited:
+            mimetypes.init()
+        return cls.from_mime_types(mimetypes.types_map, mimetypes.suffix_map, mimetypes.encodings_map)
+
+    @classmethod
+    def from_cache(cls, cache_path: str) -> "ExtensionTable":
+        """Loads the table from the provided cache file, if it is still valid (i.e. it was written
+        by the same version of Python from the same database files), otherwise builds it through
+        from_mimetypes and (atomically) caches it there.
+
+        Note that errors reading or writing the cache are ignored: the table is built anyway.
+        """
+        database_stamp = _database_stamp()
+        try:
+            with open(cache_path, encoding="utf-8") as cache_file:
+                cache = json.load(cache_file)
+            if cache["version"] == _CACHE_FORMAT_VERSION and cache["stamp"] == database_stamp:
+                return cls.from_mime_types(cache["types_map"], cache["suffix_map"], cache["encodings_map"])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass
+        extension_table = cls.from_mimetypes()
+        try:
+            temporary_path = cache_path + ".tmp"
+            with open(temporary_path, "w", encoding="utf-8") as cache_file:
+                json.dump({"version": _CACHE_FORMAT_VERSION,
+                           "stamp": database_stamp,
+                           **extension_table._as_mime_types()}, cache_file)
+            os.replace(temporary_path, cache_path)
+        except OSError:
+            pass
+        return extension_table
+
+    def _as_mime_types(self) -> Dict[str, Dict[str, str]]:
+        return {"types_map": {extension: category.name for (extension, category) in self.categories_by_extension.items()},
+                "suffix_map": dict(self.suffix_map),
+                "encodings_map": dict(self.encodings_map)}
+
+    def __reduce__(self):
+        # mapping proxies cannot be pickled (e.g., to classify files in a process pool)
+        mime_types = self._as_mime_types()
+        return (ExtensionTable.from_mime_types,
+                (mime_types["types_map"], mime_types["suffix_map"], mime_types["encodings_map"]))
+
+
+@functools.lru_cache(maxsize=None)
+def _looks_up_exact_case_first() -> bool:
+    """Returns whether mimetypes.guess_type looks up the extensions as they are before looking
+    them up in lower case (as some versions of Python do), rather than only in lower case.
+    """
+    mime_types = mimetypes.MimeTypes(filenames=())
+    mime_types.add_type("application/x-exact-case", ".Exact")
+    return mime_types.guess_type("file.Exact")[0] is not None
+
+
+def _database_stamp() -> Dict[str, object]:
+    """Returns what the mime types database depends on: the version of Python (providing its
+    defaults) and the modification times of the files listed in mimetypes.knownfiles.
+    """
+    modification_times = {}
+    for file_path in mimetypes.knownfiles:
+        try:
+            modification_times[file_path] = os.stat(file_path).st_mtime_ns
+        except OSError:
+            continue
+    return {"python": sys.version, "files": modification_times}
+
+
+_default_extension_table: Optional[ExtensionTable] = None
+_default_extension_table_lock = threading.Lock()
+
+
+def default_extension_table(cache_path: Optional[str] = None) -> ExtensionTable:
+    """Returns the table of the mime types database, built once per process (when first
+    requested), or loaded from the provided cache file (see ExtensionTable.from_cache).
+
+    Note that the cache file is only considered by the first call.
+    """
+    global _default_extension_table
+    if _default_extension_table is None:
+        with _default_extension_table_lock:
+            if _default_extension_table is None:
+                _default_extension_table = ExtensionTable.from_cache(cache_path) if cache_path is not None \
+                    else ExtensionTable.from_mimetypes()
+    return _default_extension_table
+
+
+class FileCategorizerByExtensionTable(FileCategorizationStrategy):
+    """A concrete implementation of FileCategorizationStrategy that classifies files by inspecting
+    their file extension, like FileCategorizerByExtension (returning the same categories), but
+    faster: rather than parsing the whole path through mimetypes.guess_type, only the final
+    extension is split and looked up (as it is and then in lower case, or only in lower case,
+    like mimetypes does) in an ExtensionTable precompiled once per process.
+
+    Note that:
+    - the rare paths whose extension needs more than a lookup (i.e. compressed files, like
+        .tar.gz, and URLs, like data URLs) are parsed as mimetypes.guess_type does.
+    - its identifier is the one of FileCategorizerByExtension, since files are classified the
+        same way (e.g., the categories in a scan index are reused).
+
+    Args:
+        extension_table (ExtensionTable, optional): the table files are classified through.
+            Defaults to the one returned by default_extension_table.
+        cache_path (str, optional): the file the default table is cached to, if any.
+            Defaults to None.
+    """
+    def __init__(self, extension_table: Optional[ExtensionTable] = None, cache_path: Optional[str] = None):
+        self._extension_table = extension_table
+        self._cache_path = cache_path
+        self._lookup_table: Optional[Dict[str, object]] = None
+
+    @property
+    def identifier(self) -> str:
+        return FileCategorizerByExtension.__qualname__
+
+    @property
+    def extension_table(self) -> ExtensionTable:
+        """The table files are classified through (the default one is loaded lazily, so that
+        creating the strategy is cheap, e.g. as a default argument).
+        """
+        if self._extension_table is None:
+            self._extension_table = default_extension_table(self._cache_path)
+        return self._extension_table
+
+    def cache_key(self, file_entry: FileEntry) -> Hashable:
+        # files are memoized per extension, except for those parsed as mimetypes does
+        extension = _final_extension(file_entry.path)
+        if extension is None or _look_up(self._lookup()[0], extension) is _COMPOUND_EXTENSION:
+            return file_entry.path
+        return extension
+
+    def categorize_file(self, file_path: str) -> FileCategory:
+        (lookup_table, extension_table) = self._lookup_table or self._lookup()
+        extension = _final_extension(file_path)
+        if extension is None or (category := _look_up(lookup_table, extension)) is _COMPOUND_EXTENSION:
+            return _guess_category(extension_table, file_path)
+        return category
+
+    def _lookup(self):
+        """Returns the table actually looked up, i.e. a dict mapping the extensions to their
+        categories (those which are not in lower case only if mimetypes looks them up as they
+        are), or to _COMPOUND_EXTENSION for those (possibly) standing for many extensions
+        (e.g., '.tgz' and '.gz'), along with the table it is compiled from.
+        """
+        if self._lookup_table is None:
+            extension_table = self.extension_table
+            exact_case = _looks_up_exact_case_first()
+            lookup_table: Dict[str, object] = {extension: category
+                                               for (extension, category) in extension_table.categories_by_extension.items()
+                                               if exact_case or extension == extension.lower()}
+            for extension in [*extension_table.suffix_map, *extension_table.encodings_map]:
+                lookup_table[extension] = lookup_table[extension.lower()] = _COMPOUND_EXTENSION
+            self._lookup_table = (lookup_table, extension_table)
+        return self._lookup_table
+
+    def __getstate__(self):
+        # the lookup table is compiled again (e.g., by the workers of a process pool), since
+        # it refers to _COMPOUND_EXTENSION by identity
+        return {**self.__dict__, "_lookup_table": None}
+
+
+def _look_up(lookup_table: Dict[str, object], extension: str) -> object:
+    """Looks up the provided extension as it is and then in lower case (e.g., '.JPG' and '.jpg')."""
+    if (category := lookup_table.get(extension)) is None:
+        return lookup_table.get(extension.lower(), UNKNOWN_FILE_CATEGORY)
+    return category
+
+
+def _final_extension(file_path: str) -> Optional[str]:
+    """Returns the final extension of the provided path (e.g., '.GZ' for 'a.tar.GZ'), '' if it
+    has none (e.g., for '.bashrc', like posixpath.splitext), or None if it is a URL.
+    """
+    if ":" in file_path and _URL_SCHEME.match(file_path):
+        return None
+    (head, dot, extension) = file_path.rpartition(".")
+    if not dot or "/" in extension:
+        return ""
+    if head[-1:] not in ("/", ".", ""):
+        return "." + extension
+    # the extension is the whole name, unless the leading dots are followed by something else
+    file_name = head[head.rfind("/") + 1:]
+    return "." + extension if file_name.lstrip(".") else ""
+
+
+def _guess_category(extension_table: ExtensionTable, url: str) -> FileCategory:
+    """Classifies the provided path or URL as mimetypes.guess_type does, through the table."""
+    if (scheme := _URL_SCHEME.match(url)) is not None:
+        url = url[scheme.end():]
+        if scheme.group(1).lower() == "data":
+            return _data_url_category(url)
+    base, extension = posixpath.splitext(url)
+    while (extension_lower := extension.lower()) in extension_table.suffix_map:
+        base, extension = posixpath.splitext(base + extension_table.suffix_map[extension_lower])
+    if extension in extension_table.encodings_map:
+        base, extension = posixpath.splitext(base)
+    if _looks_up_exact_case_first() and extension in extension_table.categories_by_extension:
+        return extension_table.categories_by_extension[extension]
+    return extension_table.categories_by_extension.get(extension.lower(), UNKNOWN_FILE_CATEGORY)
+
+
+def _data_url_category(url: str) -> FileCategory:
+    # data URLs are made of "[type/subtype][;parameter=value]...[;base64],data", where the
+    # type defaults to text/plain
+    comma_index = url.find(",")
+    if comma_index < 0:
+        return UNKNOWN_FILE_CATEGORY
+    semicolon_index = url.find(";", 0, comma_index)
+    mime_type = url[:semicolon_index] if semicolon_index >= 0 else url[:comma_index]
+    if "=" in mime_type or "/" not in mime_type:
+        mime_type = "text/plain"
+    return FileCategory(mime_type)
@@ -1,8 +1,12 @@
 from abc import ABC, abstractmethod
-import filetype
+from typing import FrozenSet, Generator, Hashable, Iterable
 import mimetypes
+import os
+import threading
 
+from fs_analyzer.model.directory_traversal import FileEntry
 from fs_analyzer.model.file_category import UNKNOWN_FILE_CATEGORY, FileCategory
+from fs_analyzer.model.func_utils import call_if_not_none_with_param as call_if_not_none
 
 
 class FileCategorizationStrategy(ABC):
@@ -26,6 +30,61 @@ class FileCategorizationStrategy(ABC):
         """
         pass
 
+    @property
+    def identifier(self) -> str:
+        """An identifier of the classification logic of the strategy, which is shared by the 
+        strategies classifying files the same way (e.g., by decorators), so that it can be
+        used to tell whether categories computed in the past can be reused.
+        """
+        return type(self).__qualname__
+
+    def cache_key(self, file_entry: FileEntry) -> Hashable:
+        """Returns a key such that files with the same key are classified the same way by 
+        the strategy, suitable for memoizing its outcomes. 
+        By default, it is the (device, inode, modification time) of the file, so that hard links
+        to the same file share the same key, but implementations may provide a coarser key.
+
+        Args:
+            file_entry (FileEntry): the entry of the file.
+
+        Raises:
+            OSError: if the file cannot be inspected to compute the key (e.g., it cannot be stat-ed).
+
+        Returns:
+            Hashable: the key of the file.
+        """
+        stat = file_entry.stat()
+        return (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+
+    def categorize_files(self, 
+                         file_entries: Iterable[FileEntry], 
+                         on_error = None) -> Generator[tuple[FileEntry, FileCategory], None, None]:
+        """Classifies the files of the provided entries, as soon as they are made available.
+        By default, files are classified one by one through categorize_file, but implementations
+        may override this method to classify them in batches (e.g., in parallel).
+
+        Note that:
+        - No assumptions are made regarding the order by which entries are returned.
+        - Files which cannot be classified because of an OSError are skipped and the error
+            passed to on_error, if provided.
+
+        Args:
+            file_entries (Iterable[FileEntry]): the entries of the files to be classified.
+            on_error (optional): the handler for any errors happening during classification.
+                Defaults to None.
+
+        Yields:
+            Generator[tuple[FileEntry, FileCategory], None, None]: the generator of (file entry, 
+            file category) tuples.
+        """
+        for file_entry in file_entries:
+            try:
+                category = self.categorize_file(file_entry.path)
+            except OSError as e:
+                call_if_not_none(on_error, e)
+                continue
+            yield (file_entry, category)
+
 
 class FileCategorizerBySignature(FileCategorizationStrategy):
     """A concrete implementation of FileCategorizationStrategy that classifies files by inspecting its 
@@ -35,6 +94,9 @@ class FileCategorizerBySignature(FileCategorizationStrategy):
         FileCategorizationStrategy: the abstract file categorization strategy.
     """
     def categorize_file(self, file_path: str) -> FileCategory:
+        # filetype is only imported once a file is classified by signature, since importing
+        # it (and its many matchers) slows down the commands which never do
+        import filetype
         category = UNKNOWN_FILE_CATEGORY
         if (guessed_category_info := filetype.guess(file_path)) is not None:
             category = FileCategory((guessed_category_info).mime)
@@ -45,16 +107,85 @@ class FileCategorizerByExtension(FileCategorizationStrategy):
     """A concrete implementation of FileCategorizationStrategy that classifies files by inspecting its 
     file extension rather than its file signature.
 
+    Note that the mime types database of the system is only loaded once the first file is
+    classified (and not when the strategy is created, e.g. as a default argument).
+
     Args:
         FileCategorizationStrategy: the abstract file categorization strategy.
     """
-    def __init__(self):
-        mimetypes.init()
+    _mimetypes_lock = threading.Lock()
+
+    @classmethod
+    def _init_mimetypes(cls) -> None:
+        if not mimetypes.inited:
+            with cls._mimetypes_lock:
+                if not mimetypes.inited:
+                    mimetypes.init()
+
+    def cache_key(self, file_entry: FileEntry) -> Hashable:
+        self._init_mimetypes()
+        # the category only depends on the extension, but for compressed files (e.g., .tar.gz)
+        # on the one preceding it too, while data URLs are classified by their contents
+        if file_entry.path.startswith("data:"):
+            return file_entry.path
+        root, extension = os.path.splitext(file_entry.name)
+        if extension in mimetypes.encodings_map or extension.lower() in mimetypes.suffix_map:
+            extension = os.path.splitext(root)[1] + extension
+        return extension
         
     def categorize_file(self, filepath: str) -> FileCategory:
+        self._init_mimetypes()
         category = UNKNOWN_FILE_CATEGORY
         guessed_mime, _ = mimetypes.guess_type(filepath)
         if guessed_mime is not None:
             category = FileCategory(guessed_mime)
         return category
-    
\ No newline at end of file
+    
+
+
+# the extensions commonly given to files of any kind, which the hybrid strategy does not trust
+DEFAULT_UNTRUSTED_EXTENSIONS: FrozenSet[str] = frozenset({".bin", ".dat", ".tmp", ".part", ".download", ".bak"})
+
+
+class HybridFileCategorizer(FileCategorizationStrategy):
+    """A concrete implementation of FileCategorizationStrategy that classifies files by inspecting 
+    their file extension and, only if it is missing, unknown or untrusted, their file signature,
+    so that the accuracy of the latter is achieved by reading a fraction of the files.
+
+    Note that:
+    - files whose signature is not recognized are classified by their extension anyway
+        (e.g., plain text files with an untrusted extension).
+    - untrusted extensions are matched case-insensitively.
+
+    Args:
+        untrusted_extensions (Iterable[str], optional): the extensions (e.g., ".bin") of the files
+            to be classified by signature even if they are known.
+            Defaults to DEFAULT_UNTRUSTED_EXTENSIONS.
+    """
+    def __init__(self, untrusted_extensions: Iterable[str] = DEFAULT_UNTRUSTED_EXTENSIONS):
+        self._categorizer_by_extension = FileCategorizerByExtension()
+        self._categorizer_by_signature = FileCategorizerBySignature()
+        self._untrusted_extensions = frozenset(("" if extension.startswith(".") else ".") + extension.lower()
+                                               for extension in untrusted_extensions)
+
+    def cache_key(self, file_entry: FileEntry) -> Hashable:
+        # files classified by their extension are memoized per extension, the others per file
+        if self._category_by_extension(file_entry.path) != UNKNOWN_FILE_CATEGORY:
+            return ("extension", self._categorizer_by_extension.cache_key(file_entry))
+        return super().cache_key(file_entry)
+
+    def categorize_file(self, file_path: str) -> FileCategory:
+        category = self._category_by_extension(file_path)
+        if category == UNKNOWN_FILE_CATEGORY:
+            category = self._categorizer_by_signature.categorize_file(file_path)
+            if category == UNKNOWN_FILE_CATEGORY:
+                category = self._categorizer_by_extension.categorize_file(file_path)
+        return category
+
+    def _category_by_extension(self, file_path: str) -> FileCategory:
+        """Returns the category of the provided file according to its extension, 
+        or UNKNOWN_FILE_CATEGORY if the extension is missing, unknown or untrusted.
+        """
+        if os.path.splitext(file_path)[1].lower() in self._untrusted_extensions:
+            return UNKNOWN_FILE_CATEGORY
+        return self._categorizer_by_extension.categorize_file(file_path)
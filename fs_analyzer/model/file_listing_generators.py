@@ -1,56 +1,77 @@
-from typing import Generator, Set
+from typing import Callable, Dict, Generator, Iterable, List, Set
+import heapq
 import os
+import time
 
 from fs_analyzer.model.file_categorization_strategy import *
 from fs_analyzer.model.file_permission_reporting_strategy import *
 from fs_analyzer.model.file_category import FileCategory
 from fs_analyzer.model.file_permissions import FilePermission
+from fs_analyzer.model.files_batch import CategoryTable, FilesBatch
+from fs_analyzer.model.directory_traversal import FileEntry, HardLinks, TraversalOptions, yield_directory_file_entries, yield_file_entries
+from fs_analyzer.model.scan_checkpoint import ScanCheckpoint, ScanCheckpointer
 from fs_analyzer.model.func_utils import call_if_not_none_with_param as call_if_not_none
 
+# the unit of st_blocks, which is 512 bytes regardless of the block size of the file system
+_STAT_BLOCK_SIZE = 512
+
+def allocated_size(file_stat: os.stat_result)->int:
+    """Returns the number of bytes actually allocated on disk to a file, given its stat (i.e.
+    without any further syscall). It is lower than the apparent size (st_size) of sparse files
+    (e.g., virtual machine images), and usually greater than that of small files (since whole
+    blocks are allocated).
+
+    Note that:
+    - where the allocated blocks are not reported (e.g., on Windows), the apparent size is returned.
+    """
+    blocks = getattr(file_stat, "st_blocks", None)
+    return blocks * _STAT_BLOCK_SIZE if blocks is not None else file_stat.st_size
+
 def yield_files_sizes(directory_path: str, 
-                      on_error = None)->Generator[tuple[str, int],None, None]:
+                      on_error = None,
+                      traversal_options: TraversalOptions = TraversalOptions())->Generator[tuple[str, int],None, None]:
     """ Generate the file names and corresponding file sizes contained in the 
     directory tree pointed by the path provided, one by one, by walking the tree
     top-down.
     
     Note that:
-    - Symbolic links are ignored.
+    - Symbolic links are ignored (neither returned nor followed).
     - Directories names and sizes are not returned (only those of files).
     - For files at the same depth level of the tree, no assumptions are made 
         regarding the order by which filenames are returned.
+    - if traversal_options.hard_links_once is set, each hard-linked file is accounted once.
     - if no on_error is provided, exceptions during walk are silently ignored.
 
     Args:
         directory_path (str): the path where the directory root of the tree resides.
         on_error (optional): the handler for any errors happening during the walk.
             Defaults to None.
+        traversal_options (TraversalOptions, optional): the settings of the traversal.
+            Defaults to TraversalOptions().
 
     Yields:
         Generator[tuple[str, int], None, None]: the generator of (file name, file 
         size) tuples.
     """
-    for root, _, filenames in os.walk(directory_path, 
-                                      onerror=on_error):
-        for file_name in filenames:
-            try:
-                file_path = os.path.join(root, file_name)
-                file_size = os.stat(file_path).st_size
-            except OSError as e:
-                if on_error is not None:
-                    on_error(e)
-                continue
-            yield (file_path, file_size)
+    for entry in yield_file_entries(directory_path, on_error=on_error, traversal_options=traversal_options):
+        try:
+            file_size = entry.stat().st_size
+        except OSError as e:
+            call_if_not_none(on_error, e)
+            continue
+        yield (entry.path, file_size)
 
 
 def yield_file_categories(directory_path: str, 
-                          file_categorization_strategy: FileCategorizationStrategy = FileCategorizerByExtension, 
-                          on_error = None) -> Generator[tuple[str, FileCategory], None, None]:
+                          file_categorization_strategy: FileCategorizationStrategy = FileCategorizerByExtension(), 
+                          on_error = None,
+                          traversal_options: TraversalOptions = TraversalOptions()) -> Generator[tuple[str, FileCategory], None, None]:
     """Generate the file names and corresponding file categories contained in the 
     directory tree pointed by the path provided, one by one, by walking the tree
     top-down.
     
     Note that:
-    - Symbolic links are ignored.
+    - Symbolic links are ignored (neither returned nor followed).
     - Directories names and sizes are not returned (only those of files).
     - For files at the same depth level of the tree, no assumptions are made 
         regarding the order by which filenames are returned.
@@ -63,31 +84,98 @@ def yield_file_categories(directory_path: str,
             Defaults to FileCategorizerByExtension.
         on_error (_type_, optional): the handler for any errors happening during the walk.
             Defaults to None.
+        traversal_options (TraversalOptions, optional): the settings of the traversal.
+            Defaults to TraversalOptions().
 
     Yields:
         Generator[tuple[str, FileCategory], None, None]:  the generator of (file_name, 
         file category) tuples.
     """
-    for root, _, filenames in os.walk(directory_path, onerror=on_error):
-        for file_name in filenames:
-            try:
-                file_path = os.path.join(root, file_name)
-                file_category = file_categorization_strategy.categorize_file(file_path)
-            except OSError as e:
-                if on_error is not None:
-                    on_error(e)
-                continue
-            yield (file_path, file_category)
+    entries = yield_file_entries(directory_path, on_error=on_error, traversal_options=traversal_options)
+    for (entry, file_category) in file_categorization_strategy.categorize_files(entries, on_error=on_error):
+        yield (entry.path, file_category)
  
+def yield_files_disk_usages(directory_path: str, 
+                            on_error = None,
+                            traversal_options: TraversalOptions = TraversalOptions())->Generator[tuple[str, int, int], None, None]:
+    """Generate the file names contained in the directory tree pointed by the path provided,
+    along with both their apparent size and the bytes allocated to them on disk (see 
+    allocated_size), one by one, by walking the tree top-down. Both sizes come from the 
+    same stat of each file.
+    
+    Note that:
+    - Symbolic links are ignored (neither returned nor followed).
+    - Directories names and sizes are not returned (only those of files).
+    - For files at the same depth level of the tree, no assumptions are made 
+        regarding the order by which filenames are returned.
+    - if no on_error is provided, exceptions during walk are silently ignored.
+
+    Args:
+        directory_path (str): the path where the directory root of the tree resides.
+        on_error (optional): the handler for any errors happening during the walk.
+            Defaults to None.
+        traversal_options (TraversalOptions, optional): the settings of the traversal.
+            Defaults to TraversalOptions().
+
+    Yields:
+        Generator[tuple[str, int, int], None, None]: the generator of (file name, file 
+        size, allocated size) tuples.
+    """
+    for entry in yield_file_entries(directory_path, on_error=on_error, traversal_options=traversal_options):
+        try:
+            file_stat = entry.stat()
+        except OSError as e:
+            call_if_not_none(on_error, e)
+            continue
+        yield (entry.path, file_stat.st_size, allocated_size(file_stat))
+
+def yield_large_files_disk_usages(directory_path: str,
+                                  threshold_in_bytes: int,
+                                  by_allocated_size: bool = True,
+                                  on_error = None,
+                                  traversal_options: TraversalOptions = TraversalOptions())->Generator[tuple[str, int, int], None, None]:
+    """Generate the file names, apparent sizes and allocated sizes (see 
+    yield_files_disk_usages) of the files larger than the given threshold in bytes, contained
+    in the directory tree pointed by the provided path, by either their allocated or their
+    apparent size. This is done one by one by walking the tree top-down.
+
+    Note that:
+    - Symbolic links are ignored (neither returned nor followed).
+    - Directories names and sizes are not returned (only those of files).
+    - For files at the same depth level of the tree, no assumptions are made 
+        regarding the order by which filenames are returned.
+    - if no on_error is provided, exceptions during walk are silently ignored.
+
+    Args:
+        directory_path (str): the path where the directory root of the tree resides.
+        threshold_in_bytes (int): The size threshold in bytes.
+        by_allocated_size (bool, optional): whether the threshold applies to the allocated
+            size of the files, rather than to their apparent size.
+            Defaults to True.
+        on_error (_type_, optional): the handler for any errors happening during the walk.
+            Defaults to None.
+        traversal_options (TraversalOptions, optional): the settings of the traversal.
+            Defaults to TraversalOptions().
+
+    Yields:
+        Generator[tuple[str, int, int], None, None]: the generator of (file name, file 
+        size, allocated size) tuples.
+    """
+    for (filename, file_size, file_allocated_size) in yield_files_disk_usages(directory_path, on_error=on_error, 
+                                                                               traversal_options=traversal_options):
+        if (file_allocated_size if by_allocated_size else file_size) > threshold_in_bytes:
+            yield (filename, file_size, file_allocated_size)
+
 def yield_files_larger_than(directory_path: str,
                             threshold_in_bytes: int, 
-                            on_error = None)->Generator[tuple[str, int], None, None]:
+                            on_error = None,
+                            traversal_options: TraversalOptions = TraversalOptions())->Generator[tuple[str, int], None, None]:
     """Generate the file names and corresponding sizes for the files with a size greater
     than the given threshold in bytes, contained in the directory tree pointed by 
     the provided path. This is done one by one by walking the tree top-down.
 
     Note that:
-    - Symbolic links are ignored.
+    - Symbolic links are ignored (neither returned nor followed).
     - Directories names and sizes are not returned (only those of files).
     - For files at the same depth level of the tree, no assumptions are made 
         regarding the order by which filenames are returned.
@@ -99,27 +187,86 @@ def yield_files_larger_than(directory_path: str,
             than this threshold will be included in the results.
         on_error (_type_, optional): the handler for any errors happening during the walk.
             Defaults to None.
+        traversal_options (TraversalOptions, optional): the settings of the traversal.
+            Defaults to TraversalOptions().
 
     Yields:
         Generator[tuple[str, int], None, None]:  the generator of (file_name, 
         file size) tuples.
     """
-    for (filename, file_size_in_bytes) in yield_files_sizes(directory_path, on_error=on_error):
+    for (filename, file_size_in_bytes) in yield_files_sizes(directory_path, on_error=on_error, traversal_options=traversal_options):
         if file_size_in_bytes > threshold_in_bytes:
             yield (filename, file_size_in_bytes)
+
+def yield_largest_files(directory_path: str,
+                        files_count: int,
+                        threshold_in_bytes: int = -1,
+                        on_new_leader = None,
+                        on_error = None,
+                        traversal_options: TraversalOptions = TraversalOptions())->Generator[tuple[str, int], None, None]:
+    """Generate the file names and corresponding sizes of the files_count largest files 
+    contained in the directory tree pointed by the provided path, from the largest one. 
+    While walking the tree, the largest files found so far (i.e. the leaders) are kept in a 
+    min-heap of files_count items, so that the memory used does not depend on the size of the tree.
+
+    Note that:
+    - Symbolic links are ignored (neither returned nor followed).
+    - Directories names and sizes are not returned (only those of files).
+    - Files are returned only once the whole tree has been walked, but on_new_leader, if 
+        provided, is called as soon as a file becomes one of the leaders.
+    - files with the same size are returned in descending order of name.
+    - if no on_error is provided, exceptions during walk are silently ignored.
+    
+    Args:
+        directory_path (str): the path where the directory root of the tree resides.
+        files_count (int): the number of files to return.
+        threshold_in_bytes (int, optional): The size threshold in bytes. Only files with sizes 
+            greater than this threshold are returned.
+            Defaults to -1 (i.e. no threshold).
+        on_new_leader (optional): the handler for any file becoming one of the largest files
+            found so far, called with its name and size.
+            Defaults to None.
+        on_error (_type_, optional): the handler for any errors happening during the walk.
+            Defaults to None.
+        traversal_options (TraversalOptions, optional): the settings of the traversal.
+            Defaults to TraversalOptions().
+
+    Yields:
+        Generator[tuple[str, int], None, None]:  the generator of (file_name, 
+        file size) tuples.
+    """
+    if files_count <= 0:
+        return
+    leaders: List[tuple[int, str]] = []
+    for (filename, file_size_in_bytes) in yield_files_sizes(directory_path, on_error=on_error, traversal_options=traversal_options):
+        if file_size_in_bytes <= threshold_in_bytes:
+            continue
+        if len(leaders) < files_count:
+            heapq.heappush(leaders, (file_size_in_bytes, filename))
+        elif (file_size_in_bytes, filename) > leaders[0]:
+            heapq.heapreplace(leaders, (file_size_in_bytes, filename))
+        else:
+            continue
+        if on_new_leader is not None:
+            on_new_leader(filename, file_size_in_bytes)
+    for (file_size_in_bytes, filename) in sorted(leaders, reverse=True):
+        yield (filename, file_size_in_bytes)
             
 def yield_unusual_permissions(directory_path:str, 
                               permission_reporting_strategy: FilePermissionsReportingStrategy = LooserPermissionsReporting(), 
-                              on_error = None)->Generator[tuple[str, Set[FilePermission]], None, None]:
+                              on_error = None,
+                              traversal_options: TraversalOptions = TraversalOptions())->Generator[tuple[str, Set[FilePermission]], None, None]:
     """Generate the file names with unusual permissions contained in the directory tree pointed by 
     the provided path, along with a human readable name for those permission. This is done one
     by one by walking the tree top-down.
 
     Note that:
-    - Symbolic links are ignored.
+    - Symbolic links are ignored (neither returned nor followed).
     - Directories names and sizes are not returned (only those of files).
     - For files at the same depth level of the tree, no assumptions are made 
         regarding the order by which filenames are returned.
+    - if the strategy declares its unusual_mode_bits, files are evaluated in batches, 
+        through a single mask test each.
     - if no on_error is provided, exceptions during walk are silently ignored.
 
     Args:
@@ -129,35 +276,69 @@ def yield_unusual_permissions(directory_path:str,
             Defaults to LooserPermissionsReporting().
         on_error (_type_, optional): the handler for any errors happening during the walk.
             Defaults to None.
+        traversal_options (TraversalOptions, optional): the settings of the traversal.
+            Defaults to TraversalOptions().
     Yields:
         Generator[tuple[str, Set[FilePermission]], None, None]: the generator of (file_name, 
         file size) tuples.
     """
-    for root, _, filenames in os.walk(directory_path, onerror=on_error):
-        for filename in filenames:
-            try:
-                filepath = os.path.join(root, filename)
-                stat = os.stat(filepath)
-                unusual_permissions = permission_reporting_strategy.report_unusual_permissions(stat)
-            except OSError as e:
-                if on_error is not None:
-                    on_error(e)
-                continue
-            if len(unusual_permissions) > 0:
-                yield (filepath, unusual_permissions)
+    if permission_reporting_strategy.unusual_mode_bits is not None:
+        yield from _yield_unusual_permissions_in_bulk(directory_path, permission_reporting_strategy, 
+                                                      on_error, traversal_options)
+        return
+    for entry in yield_file_entries(directory_path, on_error=on_error, traversal_options=traversal_options):
+        try:
+            unusual_permissions = permission_reporting_strategy.report_file_unusual_permissions(entry.path, entry.stat())
+        except OSError as e:
+            call_if_not_none(on_error, e)
+            continue
+        if len(unusual_permissions) > 0:
+            yield (entry.path, unusual_permissions)
         
+# the number of files whose permissions are evaluated at once
+_PERMISSIONS_BATCH_SIZE = 512
+
+def _yield_unusual_permissions_in_bulk(directory_path:str, 
+                                       permission_reporting_strategy: FilePermissionsReportingStrategy,
+                                       on_error,
+                                       traversal_options: TraversalOptions)->Generator[tuple[str, Set[FilePermission]], None, None]:
+    """Evaluates the permissions of the files in batches (see 
+    FilePermissionsReportingStrategy.report_unusual_modes), materializing the set of 
+    unusual permissions only for the files having any.
+    """
+    paths, modes = [], []
+    def evaluate_batch():
+        for (path, unusual_mode_mask) in zip(paths, permission_reporting_strategy.report_unusual_modes(modes)):
+            if unusual_mode_mask:
+                yield (path, permission_reporting_strategy.permissions_of(unusual_mode_mask))
+        paths.clear()
+        modes.clear()
+    for entry in yield_file_entries(directory_path, on_error=on_error, traversal_options=traversal_options):
+        try:
+            modes.append(entry.stat().st_mode)
+        except OSError as e:
+            call_if_not_none(on_error, e)
+            continue
+        paths.append(entry.path)
+        if len(paths) >= _PERMISSIONS_BATCH_SIZE:
+            yield from evaluate_batch()
+    yield from evaluate_batch()
+
 def yield_categories_sizes(directory_path:str, 
                            file_categorization_strategy: FileCategorizationStrategy = FileCategorizerByExtension(), 
-                           on_error = None)->Generator[tuple[FileCategory, int], None, None]:
+                           on_error = None,
+                           traversal_options: TraversalOptions = TraversalOptions(),
+                           checkpointer: ScanCheckpointer = None)->Generator[tuple[FileCategory, int], None, None]:
     """Generate the file categories and corresponding sizes contained in the 
     directory tree pointed by the path provided, one by one, by walking the tree
     top-down.
     
     Note that:
-    - Symbolic links are ignored.
+    - Symbolic links are ignored (neither returned nor followed).
     - Directories names and sizes are not returned (only those of files).
     - For files at the same depth level of the tree, no assumptions are made 
         regarding the order by which filenames are returned.
+    - if traversal_options.hard_links_once is set, each hard-linked file is accounted once.
     - if no on_error is provided, exceptions during walk are silently ignored.
 
     Args:
@@ -167,23 +348,385 @@ def yield_categories_sizes(directory_path:str,
             Defaults to FileCategorizerByExtension.       
         on_error (_type_, optional): the handler for any errors happening during the walk.
             Defaults to None.
+        traversal_options (TraversalOptions, optional): the settings of the traversal.
+            Defaults to TraversalOptions().
+        checkpointer (ScanCheckpointer, optional): the checkpointer of the scan, if it is
+            to be resumable (see yield_categories_sizes_snapshots).
+            Defaults to None.
     Returns:
         Generator[tuple[FileCategory, int], None, None]: the generator of (file category, 
         file size) tuples.
 
     """
+    for (sizes_by_categories, _, _) in yield_categories_sizes_snapshots(directory_path, 
+                                                                        file_categorization_strategy,
+                                                                        on_error=on_error,
+                                                                        traversal_options=traversal_options,
+                                                                        checkpointer=checkpointer):
+        pass
+    return  ((category, sizes) for category, sizes in sizes_by_categories.items())
+
+def yield_categories_disk_usages(directory_path:str, 
+                                 file_categorization_strategy: FileCategorizationStrategy = FileCategorizerByExtension(), 
+                                 on_error = None,
+                                 traversal_options: TraversalOptions = TraversalOptions())->Generator[tuple[FileCategory, int, int], None, None]:
+    """Generate the file categories contained in the directory tree pointed by the path 
+    provided, along with both the apparent size and the bytes allocated on disk (see 
+    allocated_size) of their files, aggregated while walking the tree top-down. Both sizes
+    come from the same stat of each file.
+    
+    Note that:
+    - Symbolic links are ignored (neither returned nor followed).
+    - Directories sizes are not accounted (only those of files).
+    - if traversal_options.hard_links_once is set, each hard-linked file is accounted once.
+    - if no on_error is provided, exceptions during walk are silently ignored.
+
+    Args:
+        directory_path (str): the path where the directory root of the tree resides.
+        file_categorization_strategy (FileCategorizationStrategy, optional): the strategy by
+            which to classify files. 
+            Defaults to FileCategorizerByExtension.       
+        on_error (_type_, optional): the handler for any errors happening during the walk.
+            Defaults to None.
+        traversal_options (TraversalOptions, optional): the settings of the traversal.
+            Defaults to TraversalOptions().
+
+    Yields:
+        Generator[tuple[FileCategory, int, int], None, None]: the generator of (file category, 
+        size, allocated size) tuples.
+    """
+    disk_usages_by_categories: Dict[FileCategory, List[int]] = {}
+    entries = yield_file_entries(directory_path, on_error=on_error, traversal_options=traversal_options)
+    for (entry, filecategory) in file_categorization_strategy.categorize_files(entries, on_error=on_error):
+        try:
+            file_stat = entry.stat()
+        except OSError as e:
+            call_if_not_none(on_error, e)
+            continue
+        if (disk_usage := disk_usages_by_categories.get(filecategory)) is None:
+            disk_usage = disk_usages_by_categories[filecategory] = [0, 0]
+        disk_usage[0] += file_stat.st_size
+        disk_usage[1] += allocated_size(file_stat)
+    for (filecategory, (size, category_allocated_size)) in disk_usages_by_categories.items():
+        yield (filecategory, size, category_allocated_size)
+
+def yield_categories_sizes_snapshots(directory_path:str, 
+                                     file_categorization_strategy: FileCategorizationStrategy = FileCategorizerByExtension(), 
+                                     files_interval: int = None,
+                                     seconds_interval: float = None,
+                                     on_error = None,
+                                     traversal_options: TraversalOptions = TraversalOptions(),
+                                     checkpointer: ScanCheckpointer = None)->Generator[tuple[Dict[FileCategory, int], int, bool], None, None]:
+    """Generate snapshots of the sizes of the file categories contained in the directory tree
+    pointed by the path provided, as they are aggregated while walking the tree top-down: 
+    an interim snapshot every files_interval files or seconds_interval seconds (whichever 
+    comes first), and a final one, with the totals, once the walk is completed.
+    If a checkpointer is provided, the scan is resumable: periodically, at a directory boundary,
+    the directories still to be visited and the sizes aggregated so far are saved to its 
+    checkpoint file, so that a scan interrupted (e.g., by a crash or a SIGTERM) can be resumed 
+    from the last checkpoint, without visiting again the directories already aggregated.
+    
+    Note that:
+    - Symbolic links are ignored (neither returned nor followed).
+    - Directories sizes are not accounted (only those of files).
+    - Each snapshot is a new dictionary, which can be retained by the consumer.
+    - if neither files_interval nor seconds_interval are provided, only the final snapshot 
+        is returned.
+    - if traversal_options.hard_links_once is set, each hard-linked file is accounted once
+        (the hard links met before a checkpoint being saved along with it).
+    - a resumable scan walks the tree sequentially (traversal_options.workers is ignored), and
+        its checkpoint file is removed once the walk is completed.
+    - if no on_error is provided, exceptions during walk are silently ignored.
+
+    Args:
+        directory_path (str): the path where the directory root of the tree resides.
+        file_categorization_strategy (FileCategorizationStrategy, optional): the strategy by
+            which to classify files. 
+            Defaults to FileCategorizerByExtension.
+        files_interval (int, optional): the number of files after which an interim snapshot 
+            is returned.
+            Defaults to None.
+        seconds_interval (float, optional): the number of seconds after which an interim 
+            snapshot is returned (checked whenever a file is aggregated).
+            Defaults to None.
+        on_error (_type_, optional): the handler for any errors happening during the walk.
+            Defaults to None.
+        traversal_options (TraversalOptions, optional): the settings of the traversal.
+            Defaults to TraversalOptions().
+        checkpointer (ScanCheckpointer, optional): the checkpointer of the scan, which is 
+            resumed from its checkpoint if checkpointer.resume is set.
+            Defaults to None (i.e. the scan is not resumable).
+
+    Raises:
+        OSError: if the checkpoint cannot be read or saved.
+        ValueError: if the checkpoint to resume from is invalid or refers to another tree.
+
+    Yields:
+        Generator[tuple[Dict[FileCategory, int], int, bool], None, None]: the generator of 
+        (sizes by file category, number of files aggregated, whether the walk is completed) tuples.
+    """
     sizes_by_categories = {}
-    for root, _, filenames in os.walk(directory_path, onerror = on_error):
-        for filename in filenames:
+    files_count = 0
+    if checkpointer is None:
+        entries_groups = [yield_file_entries(directory_path, on_error=on_error, traversal_options=traversal_options)]
+    else:
+        checkpoint = checkpointer.load() if checkpointer.resume else None
+        if checkpoint is not None:
+            if os.path.abspath(checkpoint.directory_path) != os.path.abspath(directory_path):
+                raise ValueError(f"the checkpoint refers to another directory ('{checkpoint.directory_path}').")
+            sizes_by_categories = dict(checkpoint.sizes_by_categories)
+            files_count = checkpoint.files_count
+        entries_groups = _yield_checkpointed_entries_groups(directory_path, checkpointer, checkpoint, 
+                                                            lambda: (dict(sizes_by_categories), files_count),
+                                                            on_error, traversal_options)
+    next_snapshot_files_count = files_count + files_interval if files_interval is not None else None
+    next_snapshot_time = time.monotonic() + seconds_interval if seconds_interval is not None else None
+    for entries in entries_groups:
+        for (entry, filecategory) in file_categorization_strategy.categorize_files(entries, on_error=on_error):
+            try:
+                filesize = entry.stat().st_size
+            except OSError as e:
+                call_if_not_none(on_error, e)
+                continue
+            sizes_by_categories[filecategory] = sizes_by_categories.get(filecategory, 0) + filesize
+            files_count += 1
+            if ((next_snapshot_files_count is not None and files_count >= next_snapshot_files_count) or
+                    (next_snapshot_time is not None and time.monotonic() >= next_snapshot_time)):
+                yield (dict(sizes_by_categories), files_count, False)
+                if next_snapshot_files_count is not None:
+                    next_snapshot_files_count = files_count + files_interval
+                if next_snapshot_time is not None:
+                    next_snapshot_time = time.monotonic() + seconds_interval
+    yield (sizes_by_categories, files_count, True)
+
+def _yield_checkpointed_entries_groups(directory_path: str,
+                                       checkpointer: ScanCheckpointer,
+                                       checkpoint: ScanCheckpoint,
+                                       aggregates: Callable[[], tuple[Dict[FileCategory, int], int]],
+                                       on_error,
+                                       traversal_options: TraversalOptions)->Generator[Iterable[FileEntry], None, None]:
+    """Walks the tree sequentially (starting from the frontier of the provided checkpoint, if
+    any) in groups of whole directories, each group lasting until a checkpoint is due. Groups 
+    are generated as lazy iterables of file entries, so that each one is consumed (e.g., by a 
+    categorization strategy) in a single pass: once a group is consumed, the sizes aggregated 
+    so far (returned by aggregates) account for exactly the directories visited, and they are 
+    saved along with the frontier.
+    """
+    try:
+        path_filter, root_device, hard_links = traversal_options.start_traversal(directory_path)
+    except OSError as e:
+        call_if_not_none(on_error, e)
+        return
+    pending_directories = [(directory_path, 0)]
+    if checkpoint is not None:
+        pending_directories = list(checkpoint.pending_directories)
+        if hard_links is not None:
+            hard_links = HardLinks(checkpoint.hard_links)
+
+    def yield_entries_until_checkpoint()->Generator[FileEntry, None, None]:
+        while pending_directories:
+            current_directory, depth = pending_directories.pop()
+            subdirectories = []
+            yield from yield_directory_file_entries(current_directory, depth, subdirectories, 
+                                                    on_error, traversal_options.scan_index,
+                                                    path_filter, root_device, hard_links)
+            # reversed so that subdirectories are visited in the order they were listed
+            pending_directories.extend(reversed(subdirectories))
+            if checkpointer.is_due():
+                return
+
+    while pending_directories:
+        yield yield_entries_until_checkpoint()
+        if pending_directories:
+            sizes_by_categories, files_count = aggregates()
+            checkpointer.save(ScanCheckpoint(directory_path, tuple(pending_directories), sizes_by_categories, files_count,
+                                             hard_links.inodes_by_device() if hard_links is not None else {}))
+    checkpointer.remove()
+
+def yield_files_analyses(directory_path:str,
+                         file_categorization_strategy: FileCategorizationStrategy = None,
+                         permission_reporting_strategy: FilePermissionsReportingStrategy = None,
+                         with_size: bool = True,
+                         on_error = None,
+                         traversal_options: TraversalOptions = TraversalOptions())->Generator[tuple[str, int, FileCategory, Set[FilePermission]], None, None]:
+    """Generate, for each file contained in the directory tree pointed by the path provided, 
+    the outcomes of many analyses at once, so that the tree is walked (and each file is 
+    stat-ed) only once, no matter how many analyses are requested.
+    An analysis is skipped (and None is returned in place of its outcome) if it is not
+    requested, i.e. if the corresponding strategy is not provided or with_size is False. 
+
+    Note that:
+    - Symbolic links are ignored (neither returned nor followed).
+    - Directories names and sizes are not returned (only those of files).
+    - For files at the same depth level of the tree, no assumptions are made 
+        regarding the order by which filenames are returned.
+    - if no on_error is provided, exceptions during walk are silently ignored.
+
+    Args:
+        directory_path (str): the path where the directory root of the tree resides.
+        file_categorization_strategy (FileCategorizationStrategy, optional): the strategy by
+            which to classify files. 
+            Defaults to None.
+        permission_reporting_strategy (FilePermissionsReportingStrategy, optional): the strategy by
+            which to identify unusual permissions. 
+            Defaults to None.
+        with_size (bool, optional): whether or not to report the file sizes.
+            Defaults to True.
+        on_error (_type_, optional): the handler for any errors happening during the walk.
+            Defaults to None.
+        traversal_options (TraversalOptions, optional): the settings of the traversal.
+            Defaults to TraversalOptions().
+
+    Yields:
+        Generator[tuple[str, int, FileCategory, Set[FilePermission]], None, None]: the generator 
+        of (file name, file size, file category, unusual permissions) tuples.
+    """
+    entries = yield_file_entries(directory_path, on_error=on_error, traversal_options=traversal_options)
+    if file_categorization_strategy is not None:
+        categorized_entries = file_categorization_strategy.categorize_files(entries, on_error=on_error)
+    else:
+        categorized_entries = ((entry, None) for entry in entries)
+    for (entry, file_category) in categorized_entries:
+        file_size = unusual_permissions = None
+        try:
+            if with_size:
+                file_size = entry.stat().st_size
+            if permission_reporting_strategy is not None:
+                unusual_permissions = permission_reporting_strategy.report_file_unusual_permissions(entry.path, entry.stat())
+        except OSError as e:
+            call_if_not_none(on_error, e)
+            continue
+        yield (entry.path, file_size, file_category, unusual_permissions)
+
+def yield_files_batches(directory_path:str,
+                        file_categorization_strategy: FileCategorizationStrategy = None,
+                        batch_size: int = 65536,
+                        on_error = None,
+                        traversal_options: TraversalOptions = TraversalOptions())->Generator[FilesBatch, None, None]:
+    """Generate the files contained in the directory tree pointed by the path provided, along
+    with their size, mode, inode and (optionally) category, in batches stored in columnar form 
+    (see FilesBatch), so that exporting the details of huge trees does not allocate a tuple 
+    (and many objects) per file.
+    The categories of the files of all the batches are interned in a single category table.
+
+    Note that:
+    - Symbolic links are ignored (neither returned nor followed).
+    - Directories names and sizes are not returned (only those of files).
+    - For files at the same depth level of the tree, no assumptions are made 
+        regarding the order by which filenames are returned.
+    - if no on_error is provided, exceptions during walk are silently ignored.
+
+    Args:
+        directory_path (str): the path where the directory root of the tree resides.
+        file_categorization_strategy (FileCategorizationStrategy, optional): the strategy by
+            which to classify files. 
+            Defaults to None (i.e. files are not classified).
+        batch_size (int, optional): the max number of files of a batch.
+            Defaults to 65536.
+        on_error (_type_, optional): the handler for any errors happening during the walk.
+            Defaults to None.
+        traversal_options (TraversalOptions, optional): the settings of the traversal.
+            Defaults to TraversalOptions().
+
+    Yields:
+        Generator[FilesBatch, None, None]: the generator of the batches of files.
+    """
+    entries = yield_file_entries(directory_path, on_error=on_error, traversal_options=traversal_options)
+    if file_categorization_strategy is not None:
+        categorized_entries = file_categorization_strategy.categorize_files(entries, on_error=on_error)
+        category_table = CategoryTable()
+    else:
+        categorized_entries = ((entry, None) for entry in entries)
+        category_table = None
+    files_batch = FilesBatch(category_table)
+    for (entry, file_category) in categorized_entries:
+        try:
+            files_batch.append(entry.path, entry.stat(), file_category)
+        except OSError as e:
+            call_if_not_none(on_error, e)
+            continue
+        if len(files_batch) >= batch_size:
+            yield files_batch
+            files_batch = FilesBatch(category_table)
+    if len(files_batch) > 0:
+        yield files_batch
+
+def yield_directories_sizes(directory_path:str,
+                            max_depth: int = None,
+                            on_error = None,
+                            traversal_options: TraversalOptions = TraversalOptions())->Generator[tuple[str, int, int], None, None]:
+    """Generate the directory names contained in the directory tree pointed by the path provided
+    (including its root), along with the cumulative size and number of the files contained in 
+    their subtrees (like du does), by walking the tree depth-first and rolling up the sizes
+    bottom-up, so that only the directories being visited (i.e. at most one per depth level, 
+    along with their pending subdirectories) are kept in memory.
+
+    Note that:
+    - Symbolic links are ignored (neither returned nor followed).
+    - Directories are returned bottom-up, i.e. each directory after its subdirectories.
+    - The sizes of the directories themselves are not accounted (only those of files).
+    - For directories at the same depth level of the tree, no assumptions are made 
+        regarding the order by which they are returned.
+    - the tree is always walked sequentially (traversal_options.workers is ignored).
+    - if hard links are returned once (see TraversalOptions), a hard-linked file is only
+        accounted in the size of the first directory met containing it.
+    - if no on_error is provided, exceptions during walk are silently ignored.
+
+    Args:
+        directory_path (str): the path where the directory root of the tree resides.
+        max_depth (int, optional): the max depth (with respect to the root, whose depth is 0) 
+            of the returned directories. Deeper directories are still walked and accounted
+            in the sizes of their ancestors.
+            Defaults to None (i.e. no limit).
+        on_error (_type_, optional): the handler for any errors happening during the walk.
+            Defaults to None.
+        traversal_options (TraversalOptions, optional): the settings of the traversal.
+            Defaults to TraversalOptions().
+
+    Yields:
+        Generator[tuple[str, int, int], None, None]: the generator of (directory name, 
+        cumulative size, cumulative files count) tuples.
+    """
+    try:
+        path_filter, root_device, hard_links = traversal_options.start_traversal(directory_path)
+    except OSError as e:
+        call_if_not_none(on_error, e)
+        return
+
+    def visit(directory_path: str, depth: int) -> _DirectorySize:
+        directory_size = _DirectorySize(directory_path, depth)
+        for entry in yield_directory_file_entries(directory_path, depth, directory_size.subdirectories, 
+                                                  on_error, traversal_options.scan_index,
+                                                  path_filter, root_device, hard_links):
             try:
-                filepath = os.path.join(root, filename)
-                filesize = os.stat(filepath).st_size
-                filecategory =  file_categorization_strategy.categorize_file(filepath)
-                if filecategory in sizes_by_categories:
-                    sizes_by_categories[filecategory]+=filesize
-                else:
-                    sizes_by_categories[filecategory]=filesize
+                directory_size.size += entry.stat().st_size
             except OSError as e:
-                if on_error is not None:
-                    on_error(e)
-    return  ((category, sizes) for category, sizes in sizes_by_categories.items())
\ No newline at end of file
+                call_if_not_none(on_error, e)
+                continue
+            directory_size.files_count += 1
+        return directory_size
+
+    visited_directories = [visit(directory_path, 0)]
+    while visited_directories:
+        directory_size = visited_directories[-1]
+        if directory_size.subdirectories:
+            visited_directories.append(visit(*directory_size.subdirectories.pop()))
+            continue
+        visited_directories.pop()
+        if visited_directories:
+            visited_directories[-1].size += directory_size.size
+            visited_directories[-1].files_count += directory_size.files_count
+        if max_depth is None or directory_size.depth <= max_depth:
+            yield (directory_size.path, directory_size.size, directory_size.files_count)
+
+
+class _DirectorySize:
+    """The cumulative size of a directory being visited by yield_directories_sizes."""
+    __slots__ = ("path", "depth", "subdirectories", "size", "files_count")
+
+    def __init__(self, path: str, depth: int) -> None:
+        self.path = path
+        self.depth = depth
+        self.subdirectories: List[tuple[str, int]] = []
+        self.size = 0
+        self.files_count = 0
@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
 from ast import Set
 from os import stat_result
-from typing import Set
+from typing import Dict, Iterable, List, Set
+import stat as stat_module
 
 from fs_analyzer.model.file_permissions import *
 
@@ -11,7 +12,13 @@ class FilePermissionsReportingStrategy(ABC):
     It isolates the permission reporting logic so allowing to reuse it in different scenarios
     and make its implementations interchangeable without affecting the context using them, as well
     as to make the current context compatible with future implementations.
+    Strategies deeming as unusual some bits of the file mode can declare them in 
+    unusual_mode_bits, so that files can be evaluated in bulk (see report_unusual_modes).
     """
+    # the bits of the file mode deemed as unusual, each along with the corresponding permission
+    # (None if the strategy cannot be evaluated on the file mode only)
+    unusual_mode_bits: Dict[int, FilePermission] = None
+
     @abstractmethod
     def report_unusual_permissions(self, stat:stat_result)->Set[FilePermission]:
         """Reports the file permissions deemed as unusual.
@@ -23,6 +30,48 @@ class FilePermissionsReportingStrategy(ABC):
             Set[FilePermission]: The file permissions considered unusual.
         """
         pass
+
+    def report_file_unusual_permissions(self, file_path:str, stat:stat_result)->Set[FilePermission]:
+        """Reports the file permissions deemed as unusual, for the strategies which depend on the
+        path of the file too. By default, it only depends on the stat (see report_unusual_permissions).
+
+        Args:
+            file_path (str): the path of the file.
+            stat (stat_result): the data structure containing file-related info.
+
+        Returns:
+            Set[FilePermission]: The file permissions considered unusual.
+        """
+        return self.report_unusual_permissions(stat)
+
+    @property
+    def unusual_mode_mask(self)->int:
+        """The mask combining all the unusual_mode_bits."""
+        mask = 0
+        for bit in self.unusual_mode_bits:
+            mask |= bit
+        return mask
+
+    def report_unusual_modes(self, modes:Iterable[int])->List[int]:
+        """Evaluates many files at once by their modes (i.e. their st_mode), through a single
+        mask test per file, so that no set is allocated for the (common) files without unusual
+        permissions. The permissions of the others are then obtained through permissions_of.
+        Requires unusual_mode_bits.
+
+        Args:
+            modes (Iterable[int]): the modes of the files.
+
+        Returns:
+            List[int]: for each file, the mask of its unusual bits (0 if none).
+        """
+        mask = self.unusual_mode_mask
+        return [mode & mask for mode in modes]
+
+    def permissions_of(self, unusual_mode_mask:int)->Set[FilePermission]:
+        """Returns the permissions corresponding to the provided mask of unusual bits (as 
+        returned by report_unusual_modes). Requires unusual_mode_bits.
+        """
+        return {permission for (bit, permission) in self.unusual_mode_bits.items() if unusual_mode_mask & bit}
     
 class StricterPermissionsReporting(FilePermissionsReportingStrategy):
     """Deems as unusual the files which can be executed by anyone.
@@ -30,6 +79,9 @@ class StricterPermissionsReporting(FilePermissionsReportingStrategy):
     Args:
         FilePermissionsReportingStrategy (_type_): the abstract permissions reporting strategy.
     """
+    # the bits tested by is_world_executable
+    unusual_mode_bits = {stat_module.S_IXOTH: UNUSUAL_PERMISSIONS["WORLD_EXECUTABLE"]}
+
     def report_unusual_permissions(self, stat:stat_result)->Set[FilePermission]:
         unusual_permissions = set()
         if is_world_executable(stat):
@@ -42,6 +94,10 @@ class LooserPermissionsReporting(FilePermissionsReportingStrategy):
     Args:
         FilePermissionsReportingStrategy (_type_): the abstract file permissions reporting strategy.
     """
+    # the bits tested by is_world_executable and is_world_writable
+    unusual_mode_bits = {stat_module.S_IXOTH: UNUSUAL_PERMISSIONS["WORLD_EXECUTABLE"],
+                         stat_module.S_IWGRP: UNUSUAL_PERMISSIONS["WORLD_WRITABLE"]}
+
     def report_unusual_permissions(self, stat:stat_result)->Set[FilePermission]:
         unusual_permissions = set()
         if is_world_executable(stat):
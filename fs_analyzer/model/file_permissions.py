@@ -24,6 +24,17 @@ UNUSUAL_PERMISSIONS = {
     "IS_GUID_ENABLED": FilePermission("IS_GUID_ENABLED"),
 }
 
+"""The (mask, value) comparisons of the file mode performed by the checks below, by the name
+of the corresponding unusual permission: a file has it if st_mode & mask == value.
+"""
+MODE_CHECKS = {
+    "WORLD_EXECUTABLE" : (stat.S_IXOTH, stat.S_IXOTH),
+    "WITH_ANY_OWNER_PERMISSIONS" : (stat.S_IRWXU, 0),
+    "WORLD_WRITABLE" : (stat.S_IWGRP, stat.S_IWGRP),
+    "IS_SUID_ENABLED" : (stat.S_ISUID, stat.S_ISUID),
+    "IS_GUID_ENABLED": (stat.S_ISGID, stat.S_ISGID),
+}
+
 
 def is_world_writable(st:stat_result)->bool:
     """Checks if the os.stat_result provided indicates if 
@@ -83,4 +94,4 @@ def is_guid_enabled(st:stat_result)->bool:
     Returns:
         bool: whether or not the file has the setguid bit enabled.
     """
-    return bool(st.st_mode & stat.S_IGUID)
\ No newline at end of file
+    return bool(st.st_mode & stat.S_ISGID)
\ No newline at end of file
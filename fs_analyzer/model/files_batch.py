@@ -0,0 +1,105 @@
+from array import array
+from typing import Dict, Iterator, List, Optional
+import os
+
+from fs_analyzer.model.file_category import FileCategory
+
+
+class CategoryTable:
+    """Represents the table interning the categories of the files of many batches, so that
+    each category is stored once, and files refer to it through a small integer id.
+    """
+    __slots__ = ("_ids", "categories")
+
+    def __init__(self) -> None:
+        self._ids: Dict[FileCategory, int] = {}
+        self.categories: List[FileCategory] = []
+
+    def id_of(self, file_category: FileCategory) -> int:
+        """Returns the id of the provided category, adding it to the table if missing."""
+        category_id = self._ids.get(file_category)
+        if category_id is None:
+            category_id = self._ids[file_category] = len(self.categories)
+            self.categories.append(file_category)
+        return category_id
+
+    def __getitem__(self, category_id: int) -> FileCategory:
+        return self.categories[category_id]
+
+    def __len__(self) -> int:
+        return len(self.categories)
+
+
+class FilesBatch:
+    """Represents a batch of files in columnar form, i.e. storing each of their attributes
+    in a compact, contiguous buffer rather than in a tuple per file: sizes, modes and inodes
+    are stored as arrays of 64-bit integers, the categories as ids of a category
+    table (possibly shared by many batches), and the paths as a single blob of bytes
+    (encoded like the file system does) along with the offsets at which each of them ends.
+    Batches can be filled (through append) and then read either by column or by row.
+
+    Args:
+        category_table (CategoryTable, optional): the table interning the categories of
+            the files.
+            Defaults to None (i.e. categories are not stored).
+    """
+    __slots__ = ("_paths", "_path_ends", "sizes", "modes", "inodes", "category_ids", "category_table")
+
+    def __init__(self, category_table: CategoryTable = None) -> None:
+        self._paths = bytearray()
+        self._path_ends = array("q")
+        self.sizes = array("q")
+        self.modes = array("q")
+        self.inodes = array("Q")
+        self.category_ids = array("i")
+        self.category_table = category_table
+
+    def append(self, file_path: str, file_stat: os.stat_result, file_category: FileCategory = None) -> None:
+        """Adds a file to the batch.
+
+        Args:
+            file_path (str): the path of the file.
+            file_stat (os.stat_result): the stat of the file.
+            file_category (FileCategory, optional): the category of the file, stored only
+                if the batch has a category table.
+                Defaults to None.
+        """
+        self._paths += os.fsencode(file_path)
+        self._path_ends.append(len(self._paths))
+        self.sizes.append(file_stat.st_size)
+        self.modes.append(file_stat.st_mode)
+        self.inodes.append(file_stat.st_ino)
+        if self.category_table is not None:
+            self.category_ids.append(self.category_table.id_of(file_category))
+
+    def path(self, index: int) -> str:
+        """Returns the path of the file at the provided index."""
+        start = self._path_ends[index - 1] if index > 0 else 0
+        return os.fsdecode(bytes(self._paths[start:self._path_ends[index]]))
+
+    def paths(self) -> Iterator[str]:
+        """Generate the paths of the files of the batch, in order."""
+        start = 0
+        for end in self._path_ends:
+            yield os.fsdecode(bytes(self._paths[start:end]))
+            start = end
+
+    def category(self, index: int) -> Optional[FileCategory]:
+        """Returns the category of the file at the provided index (None if not stored)."""
+        return self.category_table[self.category_ids[index]] if self.category_table is not None else None
+
+    def categories(self) -> Iterator[Optional[FileCategory]]:
+        """Generate the categories of the files of the batch (None if not stored), in order."""
+        if self.category_table is None:
+            return iter([None] * len(self))
+        return map(self.category_table.__getitem__, self.category_ids)
+
+    def __len__(self) -> int:
+        return len(self._path_ends)
+
+    def __iter__(self) -> Iterator[tuple[str, int, Optional[FileCategory]]]:
+        """Generate the (file name, file size, file category) tuples of the files of the batch."""
+        return zip(self.paths(), self.sizes, self.categories())
+
+    def __repr__(self) -> str:
+        return f"FilesBatch(files={len(self)}, paths_bytes={len(self._paths)})"
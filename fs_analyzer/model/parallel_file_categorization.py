@@ -0,0 +1,144 @@
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Dict, Generator, Hashable, Iterable, List, Optional
+import multiprocessing
+import threading
+import weakref
+
+from fs_analyzer.model.directory_traversal import FileEntry
+from fs_analyzer.model.file_categorization_strategy import FileCategorizationStrategy
+from fs_analyzer.model.file_category import FileCategory
+from fs_analyzer.model.func_utils import call_if_not_none_with_param as call_if_not_none
+
+
+# the max number of chunks submitted to the pool and not yet returned, per worker
+_CHUNKS_IN_FLIGHT_PER_WORKER = 4
+
+
+class ParallelFileCategorizer(FileCategorizationStrategy):
+    """A concrete implementation of FileCategorizationStrategy that classifies files in parallel
+    by sending chunks of paths to a pool of workers, each of them relying on the decorated
+    strategy (through the structural "Decorator" OO pattern).
+    A process pool suits CPU-bound strategies (e.g., FileCategorizerBySignature on local disks),
+    while a thread pool suits I/O-bound ones (e.g., FileCategorizerBySignature on network mounts).
+    The decorated strategy must be picklable to be used with a process pool.
+    The pool is started by the first call to categorize_files and reused by the following ones
+    (e.g., for each group of files between two checkpoints of a resumable scan), since starting
+    a process pool is expensive: it is shut down by close (or once the strategy is collected).
+
+    Args:
+        file_categorization_strategy (FileCategorizationStrategy): the decorated strategy.
+        workers (int): the number of workers of the pool.
+        use_processes (bool, optional): whether to use a process pool rather than a thread pool.
+            Defaults to True.
+        chunk_size (int, optional): the number of paths sent to a worker at once.
+            Defaults to 256.
+    """
+    def __init__(self,
+                 file_categorization_strategy: FileCategorizationStrategy,
+                 workers: int,
+                 use_processes: bool = True,
+                 chunk_size: int = 256):
+        self._file_categorization_strategy = file_categorization_strategy
+        self._workers = workers
+        self._use_processes = use_processes
+        self._chunk_size = chunk_size
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+
+    def categorize_file(self, file_path: str) -> FileCategory:
+        return self._file_categorization_strategy.categorize_file(file_path)
+
+    @property
+    def identifier(self) -> str:
+        return self._file_categorization_strategy.identifier
+
+    def cache_key(self, file_entry: FileEntry) -> Hashable:
+        return self._file_categorization_strategy.cache_key(file_entry)
+
+    def categorize_files(self,
+                         file_entries: Iterable[FileEntry],
+                         on_error = None) -> Generator[tuple[FileEntry, FileCategory], None, None]:
+        file_entries = iter(file_entries)
+        max_chunks_in_flight = self._workers * _CHUNKS_IN_FLIGHT_PER_WORKER
+        chunks_in_flight: Dict[Future, List[FileEntry]] = {}
+        executor = self._started_executor()
+        try:
+            while chunk := list(islice(file_entries, self._chunk_size)):
+                future = executor.submit(_categorize_chunk,
+                                         self._file_categorization_strategy,
+                                         [file_entry.path for file_entry in chunk])
+                chunks_in_flight[future] = chunk
+                # stream the chunks already classified, blocking only if too many are pending
+                yield from _yield_completed_chunks(chunks_in_flight,
+                                                   on_error,
+                                                   block=len(chunks_in_flight) >= max_chunks_in_flight)
+            while chunks_in_flight:
+                yield from _yield_completed_chunks(chunks_in_flight, on_error, block=True)
+        finally:
+            for future in chunks_in_flight:
+                future.cancel()
+
+    def close(self) -> None:
+        """Shuts down the pool of workers, if started (a later call to categorize_files starts
+        a new one).
+        """
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> "ParallelFileCategorizer":
+        return self
+
+    def __exit__(self, exception_type, exception, traceback) -> None:
+        self.close()
+
+    def __getstate__(self):
+        # the pool (and its lock) is not shared with copies, e.g. those sent to other processes
+        return {**self.__dict__, "_executor": None, "_executor_lock": None}
+
+    def __setstate__(self, state) -> None:
+        self.__dict__.update(state, _executor_lock=threading.Lock())
+
+    def _started_executor(self) -> Executor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = self._create_executor()
+                weakref.finalize(self, self._executor.shutdown, wait=False, cancel_futures=True)
+            return self._executor
+
+    def _create_executor(self) -> Executor:
+        if self._use_processes:
+            # forking a process which may be running traversal threads could lead to deadlocks
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            return ProcessPoolExecutor(max_workers=self._workers,
+                                       mp_context=multiprocessing.get_context(start_method))
+        return ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="fs_analyzer_categorize")
+
+
+def _categorize_chunk(file_categorization_strategy: FileCategorizationStrategy,
+                      file_paths: List[str]) -> List[FileCategory | OSError]:
+    """Classifies a chunk of files inside a worker, returning the errors in place of the
+    categories of the files which could not be classified.
+    """
+    categories = []
+    for file_path in file_paths:
+        try:
+            categories.append(file_categorization_strategy.categorize_file(file_path))
+        except OSError as e:
+            categories.append(e)
+    return categories
+
+
+def _yield_completed_chunks(chunks_in_flight: Dict[Future, List[FileEntry]],
+                            on_error,
+                            block: bool) -> Generator[tuple[FileEntry, FileCategory], None, None]:
+    completed, _ = wait(chunks_in_flight, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+    for future in completed:
+        chunk = chunks_in_flight.pop(future)
+        for (file_entry, category) in zip(chunk, future.result()):
+            if isinstance(category, OSError):
+                call_if_not_none(on_error, category)
+            else:
+                yield (file_entry, category)
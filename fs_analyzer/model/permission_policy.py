@@ -0,0 +1,162 @@
+from dataclasses import dataclass
+from fnmatch import translate
+from os import stat_result
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+import json
+import os
+import re
+import tomllib
+
+from fs_analyzer.model.file_permission_reporting_strategy import FilePermissionsReportingStrategy
+from fs_analyzer.model.file_permissions import MODE_CHECKS, UNUSUAL_PERMISSIONS, FilePermission
+
+
+@dataclass(frozen=True)
+class PermissionRule:
+    """Represents a rule of a permission policy: a file has the permission of the rule if
+    all of its conditions hold. Instances of this class cannot be edited at runtime.
+
+    Args:
+        permission (FilePermission): the permission reported for the files matching the rule.
+        mode_mask (int): the bits of the file mode to compare.
+        mode_value (int): the value the masked bits must have (e.g., mode_mask to require them
+            all set, 0 to require them all unset).
+        uid (int, optional): the uid the owner of the file must have.
+            Defaults to None (i.e. any owner).
+        gid (int, optional): the gid the group of the file must have.
+            Defaults to None (i.e. any group).
+        path_globs (Tuple[str, ...], optional): the glob patterns (e.g., '*.sh') the path of
+            the file must match any of.
+            Defaults to () (i.e. any path).
+    """
+    permission: FilePermission
+    mode_mask: int
+    mode_value: int
+    uid: Optional[int] = None
+    gid: Optional[int] = None
+    path_globs: Tuple[str, ...] = ()
+
+
+class PolicyPermissionsReporting(FilePermissionsReportingStrategy):
+    """A concrete implementation of FilePermissionsReportingStrategy deeming as unusual the
+    permissions of a declarative policy, i.e. a list of rules over the bits of the file mode,
+    its owner and its path (see PermissionRule), usually loaded from a configuration file
+    (see from_file).
+    The rules are compiled once into a flat list of mask/value comparisons (the path globs of
+    each rule being compiled into a single regular expression), so that the evaluation of a
+    file takes a few integer operations per rule.
+
+    Note that:
+    - the rules over paths never hold for the files evaluated without their path (i.e.
+        through report_unusual_permissions).
+
+    Args:
+        rules (Iterable[PermissionRule]): the rules of the policy.
+    """
+    def __init__(self, rules: Iterable[PermissionRule]):
+        self.rules = tuple(rules)
+        self._compiled_rules = [(rule.mode_mask,
+                                 rule.mode_value,
+                                 rule.uid,
+                                 rule.gid,
+                                 _compile_globs(rule.path_globs),
+                                 rule.permission) for rule in self.rules]
+
+    @classmethod
+    def from_file(cls, policy_path: str) -> "PolicyPermissionsReporting":
+        """Loads a policy from a TOML or JSON file (according to its extension), listing
+        its rules under "rules", e.g.:
+
+            [[rules]]
+            permission = "IS_SUID_ENABLED"
+
+            [[rules]]
+            permission = "WORLD_EXECUTABLE_ROOT_SCRIPT"
+            mode_mask = 0o111
+            mode_value = 0o111
+            uid = 0
+            paths = ["*.sh"]
+
+        where the fields of each rule are those of PermissionRule (modes can be written as
+        octal strings too) and the mode of the rules naming one of UNUSUAL_PERMISSIONS
+        defaults to the corresponding check (see MODE_CHECKS).
+
+        Args:
+            policy_path (str): the path of the configuration file.
+
+        Raises:
+            OSError: if the file cannot be read.
+            ValueError: if the file is not a valid policy.
+
+        Returns:
+            PolicyPermissionsReporting: the policy.
+        """
+        _, extension = os.path.splitext(policy_path)
+        with open(policy_path, "rb") as policy_file:
+            match extension.lower():
+                case ".toml":
+                    policy = tomllib.load(policy_file)
+                case ".json":
+                    policy = json.load(policy_file)
+                case _:
+                    raise ValueError(f"unsupported policy format '{extension}' (use .toml or .json).")
+        if not isinstance(policy, dict) or not isinstance(policy.get("rules"), list):
+            raise ValueError("a policy must list its rules under 'rules'.")
+        return cls(_parse_rule(rule) for rule in policy["rules"])
+
+    def report_unusual_permissions(self, stat: stat_result) -> Set[FilePermission]:
+        return self.report_file_unusual_permissions(None, stat)
+
+    def report_file_unusual_permissions(self, file_path: Optional[str], stat: stat_result) -> Set[FilePermission]:
+        mode, uid, gid = stat.st_mode, stat.st_uid, stat.st_gid
+        unusual_permissions = set()
+        for (mode_mask, mode_value, rule_uid, rule_gid, path_match, permission) in self._compiled_rules:
+            if (mode & mode_mask == mode_value
+                    and (rule_uid is None or uid == rule_uid)
+                    and (rule_gid is None or gid == rule_gid)
+                    and (path_match is None or (file_path is not None and path_match(file_path)))):
+                unusual_permissions.add(permission)
+        return unusual_permissions
+
+
+def _compile_globs(path_globs: Tuple[str, ...]) -> Optional[Callable[[str], Any]]:
+    if not path_globs:
+        return None
+    return re.compile("|".join(translate(path_glob) for path_glob in path_globs)).match
+
+
+def _parse_rule(rule: Dict[str, Any]) -> PermissionRule:
+    if not isinstance(rule, dict) or not isinstance(rule.get("permission"), str):
+        raise ValueError(f"each rule must name its 'permission': {rule!r}.")
+    unknown_fields = rule.keys() - {"permission", "mode_mask", "mode_value", "uid", "gid", "paths"}
+    if unknown_fields:
+        raise ValueError(f"unknown fields {sorted(unknown_fields)} in rule {rule!r}.")
+    name = rule["permission"]
+    default_mode_mask, default_mode_value = MODE_CHECKS.get(name, (0, 0))
+    mode_mask = _parse_mode(rule.get("mode_mask", default_mode_mask))
+    mode_value = _parse_mode(rule.get("mode_value", mode_mask if "mode_mask" in rule else default_mode_value))
+    if mode_value & ~mode_mask:
+        raise ValueError(f"the mode_value of rule {rule!r} has bits outside its mode_mask.")
+    paths = rule.get("paths", [])
+    if not isinstance(paths, list) or not all(isinstance(path, str) for path in paths):
+        raise ValueError(f"the paths of rule {rule!r} must be a list of globs.")
+    return PermissionRule(permission=UNUSUAL_PERMISSIONS.get(name, FilePermission(name)),
+                          mode_mask=mode_mask,
+                          mode_value=mode_value,
+                          uid=_parse_id(rule, "uid"),
+                          gid=_parse_id(rule, "gid"),
+                          path_globs=tuple(paths))
+
+
+def _parse_mode(mode: Any) -> int:
+    try:
+        return mode if isinstance(mode, int) and not isinstance(mode, bool) else int(mode, 8)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid mode {mode!r} (use an integer or an octal string).") from None
+
+
+def _parse_id(rule: Dict[str, Any], field: str) -> Optional[int]:
+    value = rule.get(field)
+    if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+        raise ValueError(f"the {field} of rule {rule!r} must be an integer.")
+    return value
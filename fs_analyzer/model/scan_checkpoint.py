@@ -0,0 +1,120 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+import json
+import os
+import time
+
+from fs_analyzer.model.file_category import FileCategory
+
+
+# the version of the format of the checkpoint files
+_CHECKPOINT_FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class ScanCheckpoint:
+    """Represents the progress of a scan aggregating the sizes of the file categories of a
+    directory tree, as of a directory boundary: the directories still to be visited (i.e. the
+    frontier of the traversal) and the sizes aggregated from all the others. Instances of this
+    class cannot be edited at runtime.
+
+    Args:
+        directory_path (str): the path of the root of the scanned tree.
+        pending_directories (Tuple[Tuple[str, int], ...]): the directories still to be visited,
+            along with their depth, in the order they are popped (i.e. the last one first).
+        sizes_by_categories (Dict[FileCategory, int]): the sizes aggregated so far.
+        files_count (int): the number of files aggregated so far.
+        hard_links (Dict[int, Tuple[int, ...]], optional): the inodes with many links met so
+            far, by device, if each hard-linked file is accounted once (see HardLinks).
+            Defaults to no inodes.
+    """
+    directory_path: str
+    pending_directories: Tuple[Tuple[str, int], ...]
+    sizes_by_categories: Dict[FileCategory, int]
+    files_count: int
+    hard_links: Dict[int, Tuple[int, ...]] = field(default_factory=dict)
+
+
+class ScanCheckpointer:
+    """Represents the policy and the storage of the checkpoints of a scan: checkpoints are
+    taken every seconds_interval seconds (at the first directory boundary after that) and
+    saved to a JSON file, atomically replacing the previous one, so that the file always
+    holds a complete checkpoint, even if the process is killed while saving it.
+
+    Args:
+        checkpoint_path (str): the path of the checkpoint file.
+        seconds_interval (float, optional): the number of seconds between two checkpoints.
+            Defaults to 60.
+        resume (bool, optional): whether the scan resumes from the checkpoint saved in the
+            file, if any (otherwise, it starts from scratch, overwriting it).
+            Defaults to False.
+    """
+    def __init__(self, checkpoint_path: str, seconds_interval: float = 60.0, resume: bool = False) -> None:
+        self.checkpoint_path = checkpoint_path
+        self.seconds_interval = seconds_interval
+        self.resume = resume
+        self._next_checkpoint_time = time.monotonic() + seconds_interval
+
+    def is_due(self) -> bool:
+        """Returns whether a checkpoint is to be taken."""
+        return time.monotonic() >= self._next_checkpoint_time
+
+    def load(self) -> Optional[ScanCheckpoint]:
+        """Loads the checkpoint saved in the file.
+
+        Raises:
+            OSError: if the file exists but cannot be read.
+            ValueError: if the file is not a valid checkpoint.
+
+        Returns:
+            Optional[ScanCheckpoint]: the checkpoint, or None if the file does not exist.
+        """
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+        except FileNotFoundError:
+            return None
+        try:
+            if checkpoint["version"] != _CHECKPOINT_FORMAT_VERSION:
+                raise ValueError(f"unsupported checkpoint version {checkpoint['version']!r}.")
+            return ScanCheckpoint(directory_path=str(checkpoint["directory_path"]),
+                                  pending_directories=tuple((str(path), int(depth))
+                                                            for (path, depth) in checkpoint["pending_directories"]),
+                                  sizes_by_categories={FileCategory(str(name)): int(size)
+                                                       for (name, size) in checkpoint["sizes_by_categories"]},
+                                  files_count=int(checkpoint["files_count"]),
+                                  hard_links={int(device): tuple(int(inode) for inode in inodes)
+                                              for (device, inodes) in checkpoint.get("hard_links", [])})
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"invalid checkpoint file '{self.checkpoint_path}'.") from e
+
+    def save(self, checkpoint: ScanCheckpoint) -> None:
+        """Saves the provided checkpoint to the file (through a temporary file, atomically
+        replacing it), and schedules the next one.
+
+        Raises:
+            OSError: if the file cannot be written.
+        """
+        temporary_path = self.checkpoint_path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as checkpoint_file:
+            json.dump({"version": _CHECKPOINT_FORMAT_VERSION,
+                       "directory_path": checkpoint.directory_path,
+                       "pending_directories": checkpoint.pending_directories,
+                       "sizes_by_categories": [(category.name, size)
+                                               for (category, size) in checkpoint.sizes_by_categories.items()],
+                       "files_count": checkpoint.files_count,
+                       "hard_links": list(checkpoint.hard_links.items())}, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temporary_path, self.checkpoint_path)
+        self._next_checkpoint_time = time.monotonic() + self.seconds_interval
+
+    def remove(self) -> None:
+        """Removes the checkpoint file, if any (e.g., once the scan is completed)."""
+        try:
+            os.remove(self.checkpoint_path)
+        except FileNotFoundError:
+            pass
+
+    def __repr__(self) -> str:
+        return f"ScanCheckpointer(checkpoint_path={self.checkpoint_path!r}, seconds_interval={self.seconds_interval})"
@@ -0,0 +1,230 @@
+from typing import List, Optional, Tuple
+import os
+import sqlite3
+import threading
+import time
+
+from fs_analyzer.model.caching_file_categorization import CachingFileCategorizer
+from fs_analyzer.model.directory_traversal import FileEntry
+from fs_analyzer.model.file_categorization_strategy import FileCategorizationStrategy
+from fs_analyzer.model.file_category import FileCategory
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    name TEXT,
+    dev INTEGER,
+    inode INTEGER,
+    mtime_ns INTEGER
+);
+CREATE INDEX IF NOT EXISTS directories_by_parent ON directories (parent);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    name TEXT NOT NULL,
+    dev INTEGER,
+    inode INTEGER,
+    size INTEGER,
+    mtime_ns INTEGER,
+    ctime_ns INTEGER,
+    mode INTEGER,
+    categorizer TEXT,
+    category TEXT
+);
+CREATE INDEX IF NOT EXISTS files_by_parent ON files (parent);
+"""
+
+# the number of writes after which the pending transaction is committed
+_WRITES_PER_TRANSACTION = 10_000
+# directories modified more recently than this (in nanoseconds) are not recorded, since
+# they could be modified again within the granularity of their mtime without noticing it
+_RACY_MTIME_WINDOW_NS = 2_000_000_000
+
+
+class ScanIndex:
+    """Represents a persistent, on-disk index of the outcomes of past directory tree traversals,
+    backed by a SQLite database in WAL mode, allowing subsequent scans of a mostly unchanged
+    tree to skip most of the work. In particular, it records:
+    - for each directory, its listing along with its (dev, inode, mtime), so that unchanged
+        directories (i.e. directories whose entries were neither added, removed nor renamed)
+        are not listed again.
+    - for each file, its (dev, inode, size, mtime, ctime, permission bits) along with its category,
+        so that unchanged files are not classified again.
+    Paths are recorded as absolute paths, so that the index can be shared among scans of the
+    same tree addressed through different relative paths.
+    It can be safely used by many threads, and as a context manager.
+
+    Args:
+        index_path (str): the path of the database file (created if missing).
+    """
+    def __init__(self, index_path: str):
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self._connection = sqlite3.connect(index_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def directory_listing(self,
+                          directory_path: str,
+                          directory_stat: os.stat_result) -> Optional[Tuple[List[str], List[str]]]:
+        """Returns the recorded listing of the provided directory, if it did not change since then.
+
+        Args:
+            directory_path (str): the path of the directory.
+            directory_stat (os.stat_result): the current stat of the directory.
+
+        Returns:
+            Optional[Tuple[List[str], List[str]]]: the names of the files and those of the
+            subdirectories of the directory, or None if it was not recorded or it changed.
+        """
+        directory_path = os.path.abspath(directory_path)
+        with self._lock:
+            recorded_stat = self._connection.execute(
+                "SELECT dev, inode, mtime_ns FROM directories WHERE path = ?", (directory_path,)).fetchone()
+            if recorded_stat != (directory_stat.st_dev, directory_stat.st_ino, directory_stat.st_mtime_ns):
+                return None
+            file_names = [name for (name,) in self._connection.execute(
+                "SELECT name FROM files WHERE parent = ?", (directory_path,))]
+            subdirectory_names = [name for (name,) in self._connection.execute(
+                "SELECT name FROM directories WHERE parent = ?", (directory_path,))]
+        return (file_names, subdirectory_names)
+
+    def record_directory_listing(self,
+                                 directory_path: str,
+                                 directory_stat: os.stat_result,
+                                 file_names: List[str],
+                                 subdirectory_names: List[str]) -> None:
+        """Records the listing of the provided directory, keeping what was recorded about
+        the files and subdirectories still listed in it (and forgetting the whole subtrees of
+        the subdirectories not listed anymore).
+
+        Args:
+            directory_path (str): the path of the directory.
+            directory_stat (os.stat_result): the stat of the directory, taken before listing it.
+            file_names (List[str]): the names of the files of the directory.
+            subdirectory_names (List[str]): the names of the subdirectories of the directory.
+        """
+        if directory_stat.st_mtime_ns > time.time_ns() - _RACY_MTIME_WINDOW_NS:
+            return
+        directory_path = os.path.abspath(directory_path)
+        with self._lock:
+            for (table, names) in [("files", file_names), ("directories", subdirectory_names)]:
+                recorded_names = {name for (name,) in self._connection.execute(
+                    f"SELECT name FROM {table} WHERE parent = ?", (directory_path,))}
+                names = set(names)
+                self._connection.executemany(f"DELETE FROM {table} WHERE path = ?",
+                                             ((os.path.join(directory_path, name),) for name in recorded_names - names))
+                if table == "directories":
+                    self._delete_subtrees([os.path.join(directory_path, name) for name in recorded_names - names])
+                self._connection.executemany(f"INSERT INTO {table} (path, parent, name) VALUES (?, ?, ?)",
+                                             ((os.path.join(directory_path, name), directory_path, name)
+                                              for name in names - recorded_names))
+            self._connection.execute(
+                "INSERT INTO directories (path, parent, name, dev, inode, mtime_ns) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (path) DO UPDATE SET dev = excluded.dev, inode = excluded.inode, mtime_ns = excluded.mtime_ns",
+                (directory_path, os.path.dirname(directory_path), os.path.basename(directory_path),
+                 directory_stat.st_dev, directory_stat.st_ino, directory_stat.st_mtime_ns))
+            self._count_writes(len(file_names) + len(subdirectory_names) + 1)
+
+    def _delete_subtrees(self, directory_paths: List[str]) -> None:
+        # the paths under a directory are those between "<directory>/" and "<directory>0" (the
+        # character following the separator), so that they are found through the primary keys
+        subtrees_ranges = [(directory_path + os.sep, directory_path + chr(ord(os.sep) + 1))
+                           for directory_path in directory_paths]
+        for table in ["files", "directories"]:
+            self._connection.executemany(f"DELETE FROM {table} WHERE path > ? AND path < ?", subtrees_ranges)
+
+    def file_category(self,
+                      file_path: str,
+                      file_stat: os.stat_result,
+                      categorizer: str) -> Optional[FileCategory]:
+        """Returns the recorded category of the provided file, if it did not change since then.
+
+        Args:
+            file_path (str): the path of the file.
+            file_stat (os.stat_result): the current stat of the file.
+            categorizer (str): the identifier of the strategy by which the file is classified.
+
+        Returns:
+            Optional[FileCategory]: the recorded category, or None if it was not recorded
+            (by the same strategy) or the file changed.
+        """
+        with self._lock:
+            recorded_file = self._connection.execute(
+                "SELECT dev, inode, size, mtime_ns, ctime_ns, categorizer, category FROM files WHERE path = ?",
+                (os.path.abspath(file_path),)).fetchone()
+        if recorded_file is None or recorded_file[6] is None:
+            return None
+        if recorded_file[:6] != (file_stat.st_dev, file_stat.st_ino, file_stat.st_size,
+                                 file_stat.st_mtime_ns, file_stat.st_ctime_ns, categorizer):
+            return None
+        return FileCategory(recorded_file[6])
+
+    def record_file(self,
+                    file_path: str,
+                    file_stat: os.stat_result,
+                    categorizer: str,
+                    file_category: FileCategory) -> None:
+        """Records the stat and the category of the provided file.
+
+        Args:
+            file_path (str): the path of the file.
+            file_stat (os.stat_result): the stat of the file, taken before classifying it.
+            categorizer (str): the identifier of the strategy by which the file was classified.
+            file_category (FileCategory): the category of the file.
+        """
+        file_path = os.path.abspath(file_path)
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO files (path, parent, name, dev, inode, size, mtime_ns, ctime_ns, mode, categorizer, category) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (path) DO UPDATE SET dev = excluded.dev, inode = excluded.inode, size = excluded.size, "
+                "mtime_ns = excluded.mtime_ns, ctime_ns = excluded.ctime_ns, mode = excluded.mode, "
+                "categorizer = excluded.categorizer, category = excluded.category",
+                (file_path, os.path.dirname(file_path), os.path.basename(file_path),
+                 file_stat.st_dev, file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns,
+                 file_stat.st_ctime_ns, file_stat.st_mode & 0o7777, categorizer, file_category.name))
+            self._count_writes(1)
+
+    def close(self) -> None:
+        """Commits the pending changes and closes the index."""
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+    def __enter__(self) -> "ScanIndex":
+        return self
+
+    def __exit__(self, *exception_info) -> None:
+        self.close()
+
+    def _count_writes(self, writes: int) -> None:
+        self._pending_writes += writes
+        if self._pending_writes >= _WRITES_PER_TRANSACTION:
+            self._connection.commit()
+            self._pending_writes = 0
+
+
+class IndexedFileCategorizer(CachingFileCategorizer):
+    """A concrete implementation of CachingFileCategorizer whose cache is a ScanIndex, so that
+    files which did not change since they were classified in a past scan (even by another process)
+    are not classified again.
+
+    Args:
+        file_categorization_strategy (FileCategorizationStrategy): the decorated strategy.
+        scan_index (ScanIndex): the index where categories are looked up and recorded.
+    """
+    def __init__(self,
+                 file_categorization_strategy: FileCategorizationStrategy,
+                 scan_index: ScanIndex):
+        super().__init__(file_categorization_strategy)
+        self._scan_index = scan_index
+
+    def _cached_category(self, file_entry: FileEntry) -> Optional[FileCategory]:
+        return self._scan_index.file_category(file_entry.path, file_entry.stat(), self.identifier)
+
+    def _cache_category(self, file_entry: FileEntry, file_category: FileCategory) -> None:
+        self._scan_index.record_file(file_entry.path, file_entry.stat(), self.identifier, file_category)
@@ -0,0 +1,436 @@
+from array import array
+from dataclasses import dataclass
+from enum import Enum
+from typing import BinaryIO, Dict, Generator, Iterable, Iterator, List, Optional, Tuple
+import json
+import os
+import struct
+import sys
+import zlib
+
+from fs_analyzer.model.directory_traversal import FileEntry, TraversalOptions, yield_directory_file_entries
+from fs_analyzer.model.file_categorization_strategy import FileCategorizationStrategy, FileCategorizerByExtension
+from fs_analyzer.model.file_category import FileCategory
+from fs_analyzer.model.files_batch import CategoryTable
+from fs_analyzer.model.func_utils import call_if_not_none_with_param as call_if_not_none
+
+
+# the header of the snapshot files, i.e. their magic number and the version of their format
+SNAPSHOT_FORMAT_MAGIC = b"FSASNAP\x01"
+# the number of files of a block, i.e. of the unit of compression and of decoding
+DEFAULT_BLOCK_SIZE = 65536
+_UINT32 = struct.Struct("<I")
+
+
+@dataclass(frozen=True)
+class SnapshotEntry:
+    """Represents a file of a snapshot. Instances of this class cannot be edited at runtime.
+
+    Args:
+        path (str): the path of the file, relative to the root of the scanned tree.
+        size (int): the size of the file.
+        mode (int): the mode of the file.
+        mtime_ns (int): the modification time of the file, in nanoseconds.
+        category (FileCategory): the category of the file.
+    """
+    path: str
+    size: int
+    mode: int
+    mtime_ns: int
+    category: FileCategory
+
+
+class ScanSnapshotWriter:
+    """Represents the writer of a snapshot of a scan, i.e. of a compact, column-oriented file
+    listing the files of a directory tree, sorted by path (see yield_sorted_file_categories),
+    written in a streaming fashion: files are collected in blocks of block_size files, each
+    one written as soon as it is full, so that memory does not depend on the size of the tree.
+    Each block stores each attribute of its files in its own zlib-compressed column: paths are
+    front-coded (i.e. as the length of the prefix shared with the previous path, and the rest),
+    which sorted paths make very effective, while sizes, modes, mtimes and category ids are
+    arrays of little-endian integers. Categories are interned (see CategoryTable), each block
+    listing those it introduces.
+    The file is written to a temporary file, atomically replacing snapshot_path once closed,
+    so that an interrupted scan does not leave a truncated snapshot behind.
+
+    Args:
+        snapshot_path (str): the path of the snapshot file.
+        directory_path (str): the path of the root of the scanned tree.
+        block_size (int, optional): the number of files of a block.
+            Defaults to DEFAULT_BLOCK_SIZE.
+        compression_level (int, optional): the zlib compression level of the columns.
+            Defaults to 6.
+
+    Raises:
+        OSError: if the snapshot file cannot be written.
+    """
+    def __init__(self, snapshot_path: str, directory_path: str,
+                 block_size: int = DEFAULT_BLOCK_SIZE, compression_level: int = 6) -> None:
+        self.snapshot_path = snapshot_path
+        self.files_count = 0
+        self._block_size = block_size
+        self._compression_level = compression_level
+        self._category_table = CategoryTable()
+        self._written_categories = 0
+        self._temporary_path = snapshot_path + ".tmp"
+        self._snapshot_file: BinaryIO = open(self._temporary_path, "wb")
+        header = json.dumps({"directory_path": directory_path}).encode("utf-8")
+        self._snapshot_file.write(SNAPSHOT_FORMAT_MAGIC + _UINT32.pack(len(header)) + header)
+        self._start_block()
+
+    def _start_block(self) -> None:
+        self._previous_path = b""
+        self._prefix_lengths = array("I")
+        self._suffixes = bytearray()
+        self._suffix_ends = array("I")
+        self._sizes, self._modes, self._mtimes = array("q"), array("q"), array("q")
+        self._category_ids = array("i")
+
+    def append(self, path: str, file_stat: os.stat_result, file_category: FileCategory) -> None:
+        """Adds a file to the snapshot (files must be appended sorted by path).
+
+        Args:
+            path (str): the path of the file, relative to the root of the scanned tree.
+            file_stat (os.stat_result): the stat of the file.
+            file_category (FileCategory): the category of the file.
+        """
+        encoded_path = os.fsencode(path)
+        prefix_length = _common_prefix_length(self._previous_path, encoded_path)
+        self._prefix_lengths.append(prefix_length)
+        self._suffixes += encoded_path[prefix_length:]
+        self._suffix_ends.append(len(self._suffixes))
+        self._previous_path = encoded_path
+        self._sizes.append(file_stat.st_size)
+        self._modes.append(file_stat.st_mode)
+        self._mtimes.append(file_stat.st_mtime_ns)
+        self._category_ids.append(self._category_table.id_of(file_category))
+        if len(self._sizes) >= self._block_size:
+            self._write_block()
+
+    def _write_block(self) -> None:
+        files_count = len(self._sizes)
+        new_categories = [category.name for category in self._category_table.categories[self._written_categories:]]
+        self._written_categories = len(self._category_table)
+        columns = [json.dumps(new_categories).encode("utf-8"),
+                   _little_endian(self._prefix_lengths),
+                   bytes(self._suffixes),
+                   _little_endian(self._suffix_ends),
+                   _little_endian(self._sizes),
+                   _little_endian(self._modes),
+                   _little_endian(self._mtimes),
+                   _little_endian(self._category_ids)]
+        chunks = [_UINT32.pack(files_count)]
+        for column in columns:
+            compressed_column = zlib.compress(column, self._compression_level)
+            chunks.append(_UINT32.pack(len(compressed_column)))
+            chunks.append(compressed_column)
+        self._snapshot_file.write(b"".join(chunks))
+        self.files_count += files_count
+        self._start_block()
+
+    def close(self) -> None:
+        """Writes the last block and the end of the snapshot, replacing snapshot_path."""
+        if self._sizes:
+            self._write_block()
+        # an empty block marks the end of the snapshot
+        self._snapshot_file.write(_UINT32.pack(0))
+        self._snapshot_file.flush()
+        os.fsync(self._snapshot_file.fileno())
+        self._snapshot_file.close()
+        os.replace(self._temporary_path, self.snapshot_path)
+
+    def discard(self) -> None:
+        """Discards the snapshot being written, leaving snapshot_path untouched."""
+        self._snapshot_file.close()
+        os.remove(self._temporary_path)
+
+    def __enter__(self) -> "ScanSnapshotWriter":
+        return self
+
+    def __exit__(self, exception_type, exception, traceback) -> None:
+        if exception_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def __repr__(self) -> str:
+        return f"ScanSnapshotWriter(snapshot_path={self.snapshot_path!r}, files_count={self.files_count})"
+
+
+class ScanSnapshotReader:
+    """Represents the reader of a snapshot written by ScanSnapshotWriter, returning its files
+    in order, one block at a time, so that memory does not depend on the size of the snapshot.
+
+    Args:
+        snapshot_path (str): the path of the snapshot file.
+
+    Raises:
+        OSError: if the snapshot file cannot be read.
+        ValueError: if the file is not a snapshot.
+    """
+    def __init__(self, snapshot_path: str) -> None:
+        self.snapshot_path = snapshot_path
+        self._snapshot_file: BinaryIO = open(snapshot_path, "rb")
+        try:
+            if self._snapshot_file.read(len(SNAPSHOT_FORMAT_MAGIC)) != SNAPSHOT_FORMAT_MAGIC:
+                raise ValueError(f"'{snapshot_path}' is not a snapshot of fs_analyzer.")
+            header = json.loads(self._read(_UINT32.unpack(self._read(_UINT32.size))[0]))
+            self.directory_path: str = header["directory_path"]
+        except Exception:
+            self._snapshot_file.close()
+            raise
+
+    def _read(self, size: int) -> bytes:
+        data = self._snapshot_file.read(size)
+        if len(data) != size:
+            raise ValueError(f"the snapshot '{self.snapshot_path}' is truncated.")
+        return data
+
+    def _read_column(self, typecode: Optional[str] = None):
+        column = zlib.decompress(self._read(_UINT32.unpack(self._read(_UINT32.size))[0]))
+        if typecode is None:
+            return column
+        values = array(typecode, column)
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+
+    def __iter__(self) -> Iterator[SnapshotEntry]:
+        """Generate the files of the snapshot, sorted by path.
+
+        Raises:
+            ValueError: if the snapshot is truncated or corrupted.
+        """
+        categories: List[FileCategory] = []
+        while files_count := _UINT32.unpack(self._read(_UINT32.size))[0]:
+            try:
+                categories.extend(FileCategory(name) for name in json.loads(self._read_column()))
+                prefix_lengths = self._read_column("I")
+                suffixes = self._read_column()
+                suffix_ends = self._read_column("I")
+                sizes, modes, mtimes = self._read_column("q"), self._read_column("q"), self._read_column("q")
+                category_ids = self._read_column("i")
+            except zlib.error as e:
+                raise ValueError(f"the snapshot '{self.snapshot_path}' is corrupted.") from e
+            path = b""
+            suffix_start = 0
+            for i in range(files_count):
+                path = path[:prefix_lengths[i]] + suffixes[suffix_start:suffix_ends[i]]
+                suffix_start = suffix_ends[i]
+                yield SnapshotEntry(os.fsdecode(path), sizes[i], modes[i], mtimes[i], categories[category_ids[i]])
+
+    def close(self) -> None:
+        self._snapshot_file.close()
+
+    def __enter__(self) -> "ScanSnapshotReader":
+        return self
+
+    def __exit__(self, exception_type, exception, traceback) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"ScanSnapshotReader(snapshot_path={self.snapshot_path!r}, directory_path={self.directory_path!r})"
+
+
+def yield_sorted_file_categories(directory_path: str,
+                                 file_categorization_strategy: FileCategorizationStrategy = FileCategorizerByExtension(),
+                                 on_error = None,
+                                 traversal_options: TraversalOptions = TraversalOptions()) -> Generator[Tuple[FileEntry, FileCategory], None, None]:
+    """Generate the (file entry, file category) tuples of the files contained in the directory
+    tree pointed by the path provided, sorted by path, i.e. by walking the tree depth-first and
+    visiting the files and the subdirectories of each directory sorted by name. Each directory
+    is listed and its files classified at once, so that memory depends on the size of the
+    directories on the path from the root to the current one, rather than on the size of the tree.
+
+    Note that:
+    - paths are sorted component by component (see snapshot_path_key), i.e. the files of a
+        directory come right after it, whatever the names of its siblings are.
+    - the traversal is sequential (workers are ignored).
+    - if no on_error is provided, exceptions during walk are silently ignored.
+
+    Args:
+        directory_path (str): the path where the directory root of the tree resides.
+        file_categorization_strategy (FileCategorizationStrategy, optional): the strategy by
+            which to classify files.
+            Defaults to FileCategorizerByExtension.
+        on_error (optional): the handler for any errors happening during the walk.
+            Defaults to None.
+        traversal_options (TraversalOptions, optional): the settings of the traversal.
+            Defaults to TraversalOptions().
+
+    Yields:
+        Generator[Tuple[FileEntry, FileCategory], None, None]: the generator of the tuples.
+    """
+    try:
+        path_filter, root_device, hard_links = traversal_options.start_traversal(directory_path)
+    except OSError as e:
+        call_if_not_none(on_error, e)
+        return
+    # the files (along with their category) and directories still to be visited, the next one last
+    pending: List[Tuple[Optional[Tuple[FileEntry, FileCategory]], Optional[Tuple[str, int]]]] = [(None, (directory_path, 0))]
+    while pending:
+        categorized_entry, directory = pending.pop()
+        if directory is None:
+            yield categorized_entry
+            continue
+        subdirectories = []
+        entries = list(yield_directory_file_entries(directory[0], directory[1], subdirectories,
+                                                    on_error, traversal_options.scan_index,
+                                                    path_filter, root_device, hard_links))
+        children = [(entry.name, (entry, category), None)
+                    for (entry, category) in file_categorization_strategy.categorize_files(entries, on_error=on_error)]
+        children.extend((os.path.basename(subdirectory[0]), None, subdirectory) for subdirectory in subdirectories)
+        children.sort(key=lambda child: child[0], reverse=True)
+        pending.extend((categorized_entry, subdirectory) for (_, categorized_entry, subdirectory) in children)
+
+
+def write_snapshot(directory_path: str,
+                   snapshot_path: str,
+                   file_categorization_strategy: FileCategorizationStrategy = FileCategorizerByExtension(),
+                   on_error = None,
+                   traversal_options: TraversalOptions = TraversalOptions(),
+                   block_size: int = DEFAULT_BLOCK_SIZE) -> int:
+    """Scans the directory tree pointed by the path provided, writing its snapshot (see
+    ScanSnapshotWriter) in a streaming fashion.
+
+    Note that:
+    - the files which cannot be stat-ed are left out (their error being reported).
+    - if no on_error is provided, exceptions during walk are silently ignored.
+
+    Args:
+        directory_path (str): the path where the directory root of the tree resides.
+        snapshot_path (str): the path of the snapshot file.
+        file_categorization_strategy (FileCategorizationStrategy, optional): the strategy by
+            which to classify files.
+            Defaults to FileCategorizerByExtension.
+        on_error (optional): the handler for any errors happening during the walk.
+            Defaults to None.
+        traversal_options (TraversalOptions, optional): the settings of the traversal.
+            Defaults to TraversalOptions().
+        block_size (int, optional): the number of files of a block of the snapshot.
+            Defaults to DEFAULT_BLOCK_SIZE.
+
+    Raises:
+        OSError: if the snapshot file cannot be written.
+
+    Returns:
+        int: the number of files of the snapshot.
+    """
+    root_length = len(os.path.join(directory_path, ""))
+    with ScanSnapshotWriter(snapshot_path, os.path.abspath(directory_path), block_size) as snapshot_writer:
+        for (entry, file_category) in yield_sorted_file_categories(directory_path, file_categorization_strategy,
+                                                                   on_error, traversal_options):
+            try:
+                file_stat = entry.stat()
+            except OSError as e:
+                call_if_not_none(on_error, e)
+                continue
+            snapshot_writer.append(entry.path[root_length:], file_stat, file_category)
+    return snapshot_writer.files_count
+
+
+class Change(str, Enum):
+    """Enumerates the changes of a file between two snapshots."""
+    ADDED = "added"
+    REMOVED = "removed"
+    GROWN = "grown"
+    SHRUNK = "shrunk"
+
+
+@dataclass(frozen=True)
+class SnapshotDifference:
+    """Represents the change of a file between two snapshots. Instances of this class cannot
+    be edited at runtime.
+
+    Args:
+        change (Change): the kind of change.
+        path (str): the path of the file, relative to the root of the scanned tree.
+        old_size (int): the size of the file in the old snapshot (0 if added).
+        new_size (int): the size of the file in the new snapshot (0 if removed).
+    """
+    change: Change
+    path: str
+    old_size: int
+    new_size: int
+
+
+def snapshot_path_key(path: str) -> List[str]:
+    """Returns the key snapshots are sorted by, i.e. the components of the provided path."""
+    return path.split(os.sep)
+
+
+def yield_snapshots_differences(old_entries: Iterable[SnapshotEntry],
+                                new_entries: Iterable[SnapshotEntry],
+                                sizes_by_categories: Dict[FileCategory, List[int]] = None) -> Generator[SnapshotDifference, None, None]:
+    """Generate the differences between the files of two snapshots (i.e. the files added,
+    removed, grown or shrunk), by merge-joining them: since both are sorted by path, they are
+    read once, side by side, in O(n) time and constant memory.
+    If a dictionary is provided, the total sizes of each category in the old and in the new
+    snapshot (as [old size, new size] lists) are added to it, too.
+
+    Note that:
+    - files whose size did not change are not returned, even if their category did (which
+        is accounted in the sizes of the categories anyway).
+
+    Args:
+        old_entries (Iterable[SnapshotEntry]): the files of the old snapshot.
+        new_entries (Iterable[SnapshotEntry]): the files of the new snapshot.
+        sizes_by_categories (Dict[FileCategory, List[int]], optional): the dictionary the
+            sizes of the categories are added to.
+            Defaults to None.
+
+    Raises:
+        ValueError: if any of the snapshots is not sorted by path.
+
+    Yields:
+        Generator[SnapshotDifference, None, None]: the generator of the differences.
+    """
+    def sorted_entries(entries: Iterable[SnapshotEntry], size_index: int) -> Iterator[Tuple[List[str], SnapshotEntry]]:
+        previous_key = None
+        for entry in entries:
+            key = snapshot_path_key(entry.path)
+            if previous_key is not None and key <= previous_key:
+                raise ValueError(f"the snapshot is not sorted by path (at '{entry.path}').")
+            previous_key = key
+            if sizes_by_categories is not None:
+                sizes_by_categories.setdefault(entry.category, [0, 0])[size_index] += entry.size
+            yield (key, entry)
+
+    old_iterator, new_iterator = sorted_entries(old_entries, 0), sorted_entries(new_entries, 1)
+    old_key, old_entry = next(old_iterator, (None, None))
+    new_key, new_entry = next(new_iterator, (None, None))
+    while old_entry is not None or new_entry is not None:
+        if new_entry is None or (old_entry is not None and old_key < new_key):
+            yield SnapshotDifference(Change.REMOVED, old_entry.path, old_entry.size, 0)
+            old_key, old_entry = next(old_iterator, (None, None))
+        elif old_entry is None or new_key < old_key:
+            yield SnapshotDifference(Change.ADDED, new_entry.path, 0, new_entry.size)
+            new_key, new_entry = next(new_iterator, (None, None))
+        else:
+            if new_entry.size != old_entry.size:
+                yield SnapshotDifference(Change.GROWN if new_entry.size > old_entry.size else Change.SHRUNK,
+                                         new_entry.path, old_entry.size, new_entry.size)
+            old_key, old_entry = next(old_iterator, (None, None))
+            new_key, new_entry = next(new_iterator, (None, None))
+
+
+def _common_prefix_length(first: bytes, second: bytes) -> int:
+    length = min(len(first), len(second))
+    if first[:length] == second[:length]:
+        return length
+    # binary search of the first different byte, comparing slices (i.e. in C)
+    low, high = 0, length
+    while low < high:
+        middle = (low + high + 1) // 2
+        if first[:middle] == second[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
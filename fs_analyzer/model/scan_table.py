@@ -0,0 +1,203 @@
+from array import array
+from typing import Dict, List, Sequence
+import importlib.util
+
+from fs_analyzer.model.directory_traversal import TraversalOptions, yield_file_entries
+from fs_analyzer.model.file_categorization_strategy import FileCategorizationStrategy, FileCategorizerByExtension
+from fs_analyzer.model.file_category import FileCategory
+from fs_analyzer.model.files_batch import CategoryTable
+from fs_analyzer.model.func_utils import call_if_not_none_with_param as call_if_not_none
+
+
+# whether NumPy, which ScanTable relies on, is installed (it is an optional dependency)
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+# NumPy is only imported once a table is built, since importing it slows down the start of the CLI
+np = None
+
+
+def _require_numpy() -> None:
+    global np
+    if not NUMPY_AVAILABLE:
+        raise ImportError("ScanTable requires NumPy: install it with 'pip install fs_analyzer[analytics]'.")
+    if np is None:
+        import numpy as np
+
+
+class ScanTable:
+    """Represents the outcome of a scan of a directory tree as a table, with a NumPy column
+    per attribute of the files (size, mode, mtime, category code and depth), so that many
+    queries over the same scan (e.g., counting the files above many thresholds, or the
+    histograms of the sizes of each category) are answered through vectorized operations,
+    without walking the tree again.
+    Categories are stored as codes, i.e. as ids of the table interning them.
+    It requires NumPy, which is an optional dependency (see NUMPY_AVAILABLE).
+
+    Args:
+        paths (List[str]): the paths of the files.
+        sizes (np.ndarray): the sizes of the files (int64).
+        modes (np.ndarray): the modes of the files (int64).
+        mtimes (np.ndarray): the modification times of the files, in nanoseconds (int64).
+        category_codes (np.ndarray): the codes of the categories of the files (int32).
+        depths (np.ndarray): the depths of the files with respect to the root (int32).
+        category_table (CategoryTable): the table interning the categories of the files.
+
+    Raises:
+        ImportError: if NumPy is not installed.
+    """
+    def __init__(self, paths: List[str], sizes, modes, mtimes, category_codes, depths,
+                 category_table: CategoryTable) -> None:
+        _require_numpy()
+        self.paths = paths
+        self.sizes = sizes
+        self.modes = modes
+        self.mtimes = mtimes
+        self.category_codes = category_codes
+        self.depths = depths
+        self.category_table = category_table
+        self._sorted_sizes = None
+
+    @classmethod
+    def from_directory(cls,
+                       directory_path: str,
+                       file_categorization_strategy: FileCategorizationStrategy = FileCategorizerByExtension(),
+                       on_error = None,
+                       traversal_options: TraversalOptions = TraversalOptions()) -> "ScanTable":
+        """Builds the table of the files contained in the directory tree pointed by the path
+        provided, by walking it once. The columns are filled as compact arrays during the walk,
+        and then handed over to NumPy without copying them.
+
+        Note that:
+        - Symbolic links are ignored (neither returned nor followed).
+        - Directories are not recorded (only files).
+        - if no on_error is provided, exceptions during walk are silently ignored.
+
+        Args:
+            directory_path (str): the path where the directory root of the tree resides.
+            file_categorization_strategy (FileCategorizationStrategy, optional): the strategy by
+                which to classify files.
+                Defaults to FileCategorizerByExtension.
+            on_error (optional): the handler for any errors happening during the walk.
+                Defaults to None.
+            traversal_options (TraversalOptions, optional): the settings of the traversal.
+                Defaults to TraversalOptions().
+
+        Raises:
+            ImportError: if NumPy is not installed.
+
+        Returns:
+            ScanTable: the table of the files.
+        """
+        _require_numpy()
+        category_table = CategoryTable()
+        paths = []
+        sizes, modes, mtimes = array("q"), array("q"), array("q")
+        category_codes, depths = array("i"), array("i")
+        entries = yield_file_entries(directory_path, on_error=on_error, traversal_options=traversal_options)
+        for (entry, file_category) in file_categorization_strategy.categorize_files(entries, on_error=on_error):
+            try:
+                file_stat = entry.stat()
+            except OSError as e:
+                call_if_not_none(on_error, e)
+                continue
+            paths.append(entry.path)
+            sizes.append(file_stat.st_size)
+            modes.append(file_stat.st_mode)
+            mtimes.append(file_stat.st_mtime_ns)
+            category_codes.append(category_table.id_of(file_category))
+            depths.append(entry.depth)
+        return cls(paths,
+                   np.frombuffer(sizes, dtype=np.int64),
+                   np.frombuffer(modes, dtype=np.int64),
+                   np.frombuffer(mtimes, dtype=np.int64),
+                   np.frombuffer(category_codes, dtype=np.int32),
+                   np.frombuffer(depths, dtype=np.int32),
+                   category_table)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def select(self, mask) -> "ScanTable":
+        """Returns the table of the files selected by the provided boolean mask (or indices),
+        sharing the category table with this one.
+        """
+        indices = np.flatnonzero(mask) if np.asarray(mask).dtype == np.bool_ else np.asarray(mask)
+        return ScanTable([self.paths[i] for i in indices.tolist()],
+                         self.sizes[indices],
+                         self.modes[indices],
+                         self.mtimes[indices],
+                         self.category_codes[indices],
+                         self.depths[indices],
+                         self.category_table)
+
+    def with_permission_bits(self, permission_bits: int, all_bits: bool = True) -> "ScanTable":
+        """Returns the table of the files whose mode has the provided permission bits set.
+
+        Args:
+            permission_bits (int): the permission bits (e.g., 0o002 for world-writable files).
+            all_bits (bool, optional): whether all the bits must be set, rather than any of them.
+                Defaults to True.
+        """
+        set_bits = self.modes & permission_bits
+        return self.select(set_bits == permission_bits if all_bits else set_bits != 0)
+
+    def count_larger_than(self, thresholds_in_bytes: Sequence[int]) -> List[int]:
+        """Returns, for each of the provided thresholds, the number of files whose size is
+        greater than it, through a binary search over the sizes sorted once.
+        """
+        if self._sorted_sizes is None:
+            self._sorted_sizes = np.sort(self.sizes)
+        positions = np.searchsorted(self._sorted_sizes, np.asarray(thresholds_in_bytes, dtype=np.int64), side="right")
+        return (len(self) - positions).tolist()
+
+    def files_larger_than(self, threshold_in_bytes: int) -> List[tuple[str, int]]:
+        """Returns the (file name, file size) tuples of the files whose size is greater
+        than the provided threshold.
+        """
+        indices = np.flatnonzero(self.sizes > threshold_in_bytes)
+        return [(self.paths[i], size) for (i, size) in zip(indices.tolist(), self.sizes[indices].tolist())]
+
+    def sizes_percentiles(self, percentiles: Sequence[float]) -> Dict[FileCategory, List[int]]:
+        """Returns, for each category, the provided percentiles (in [0, 100]) of the sizes of
+        its files (nearest lower size).
+        """
+        order = np.lexsort((self.sizes, self.category_codes))
+        sorted_codes = self.category_codes[order]
+        sorted_sizes = self.sizes[order]
+        boundaries = np.searchsorted(sorted_codes, np.arange(len(self.category_table) + 1))
+        fractions = np.asarray(percentiles, dtype=np.float64) / 100
+        sizes_percentiles = {}
+        for (code, file_category) in enumerate(self.category_table.categories):
+            start, end = boundaries[code], boundaries[code + 1]
+            if start == end:
+                continue
+            sizes_percentiles[file_category] = sorted_sizes[start + np.floor(fractions * (end - start - 1)).astype(np.int64)].tolist()
+        return sizes_percentiles
+
+    def sizes_histograms(self, bin_edges: Sequence[int] = None) -> tuple[List[int], Dict[FileCategory, List[int]]]:
+        """Returns, for each category, the histogram of the sizes of its files, computed at
+        once for all the categories.
+
+        Args:
+            bin_edges (Sequence[int], optional): the increasing lower edges of the bins, the
+                last bin being unbounded.
+                Defaults to None (i.e. 0 followed by the powers of 2 up to the largest size).
+
+        Returns:
+            tuple[List[int], Dict[FileCategory, List[int]]]: the lower edges of the bins, and
+            the number of files in each bin, for each category.
+        """
+        if bin_edges is None:
+            largest_size = int(self.sizes.max()) if len(self) > 0 else 0
+            bin_edges = [0] + [2 ** exponent for exponent in range(max(largest_size, 1).bit_length())]
+        bin_edges = np.asarray(bin_edges, dtype=np.int64)
+        bins = np.searchsorted(bin_edges, self.sizes, side="right") - 1
+        # files smaller than the lowest edge are not counted
+        counted = bins >= 0
+        counts = np.bincount(self.category_codes[counted].astype(np.int64) * len(bin_edges) + bins[counted],
+                             minlength=len(self.category_table) * len(bin_edges))
+        counts = counts.reshape(len(self.category_table), len(bin_edges))
+        return (bin_edges.tolist(), {file_category: counts[code].tolist()
+                                     for (code, file_category) in enumerate(self.category_table.categories)})
+
+    def __repr__(self) -> str:
+        return f"ScanTable(files={len(self)}, categories={len(self.category_table)})"
@@ -7,11 +7,27 @@ In particular,
 
 Modules:
 
+* test_async.py: testing the asynchronous generators and analyzer against the
+    synchronous ones, along with the cancellation of traversals.
 * test_cli.py: testing the correct input validation performed by the CLI.
+* test_directory_watcher.py: testing that watching a directory tree returns only the files which
+    changed, and that the analyses kept up to date are notified (skipped if not on Linux).
 * test_directory_analizer.py: checking the graceful degradation in case of 
     unexpected situations.
 * test_generators.py: containing the tests of the lower level file-listing generators,
     among which those of graceful degradation in case of unexpected situations.
+* test_output_writers.py: testing that the outcomes written in each format by the output
+    writers can be read back.
+* test_permission_policy.py: testing the loading and the evaluation of declarative
+    permission policies.
+* test_scan_checkpoint.py: testing that interrupted scans resumed from their last checkpoint
+    aggregate the same sizes as uninterrupted ones, without visiting completed directories again.
+* test_scan_index.py: testing that scans relying on a scan index skip unchanged 
+    directories and files.
+* test_scan_snapshot.py: testing that snapshots list the files of a tree sorted by path, and
+    that the differences between two of them are identified.
+* test_scan_table.py: testing the vectorized queries over the table of a scan against
+    the generators walking the directory tree (skipped if NumPy is not installed).
 * utils.py: containing some utils for testing along with a testing scenario.
 
 It employs unittest and pytest.
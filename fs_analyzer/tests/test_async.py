@@ -0,0 +1,172 @@
+import asyncio
+import os
+import threading
+
+from fs_analyzer.model.async_file_listing_generators import *
+from fs_analyzer.model.file_categorization_strategy import FileCategorizerByExtension
+from fs_analyzer.model.file_permission_reporting_strategy import LooserPermissionsReporting
+from fs_analyzer.tests.fixtures import DirectoryTreeScenario
+from fs_analyzer.tests.utils import FailingFileCategorizer
+from fs_analyzer.view_model.async_directory_analizer import AsyncDirectoryAnalizer
+from fs_analyzer.view_model.async_directory_observer import AsyncDirectoryObserver
+
+TEST_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), 'testdir'))
+directory_tree = DirectoryTreeScenario(TEST_PATH)
+
+
+def setup_module():
+    directory_tree.setup()
+
+
+def teardown_module():
+    directory_tree.remove()
+
+
+async def collect(async_generator):
+    return [item async for item in async_generator]
+
+
+class RecordingObserver(AsyncDirectoryObserver):
+    def __init__(self):
+        self.events = []
+
+    async def on_new_categorized_file(self, file_path, filecategory):
+        self.events.append(("categorized", file_path, filecategory))
+
+    async def on_new_file_category_size(self, files_category, category_size):
+        self.events.append(("category_size", files_category, category_size))
+
+    async def on_new_file_with_unusual_permission(self, file_path, file_permissions):
+        self.events.append(("permissions", file_path, file_permissions))
+
+    async def on_new_large_file(self, file_path, file_size):
+        self.events.append(("large", file_path, file_size))
+
+    async def on_file_not_found(self):
+        self.events.append(("file_not_found",))
+
+    async def on_invalid_input(self, msg):
+        self.events.append(("invalid_input", msg))
+
+
+def test_async_generators_return_the_same_items_as_the_synchronous_ones():
+    root_path = directory_tree.root_path()
+    assert sorted(asyncio.run(collect(async_yield_files_sizes(root_path)))) == \
+        sorted(yield_files_sizes(root_path))
+    assert sorted(asyncio.run(collect(async_yield_file_categories(root_path)))) == \
+        sorted(yield_file_categories(root_path))
+    assert sorted(asyncio.run(collect(async_yield_files_larger_than(root_path, 1)))) == \
+        sorted(yield_files_larger_than(root_path, 1))
+    assert asyncio.run(collect(async_yield_largest_files(root_path, 2))) == \
+        list(yield_largest_files(root_path, 2))
+    assert dict(asyncio.run(collect(async_yield_categories_sizes(root_path)))) == \
+        dict(yield_categories_sizes(root_path))
+    assert sorted(asyncio.run(collect(async_yield_directories_sizes(root_path)))) == \
+        sorted(yield_directories_sizes(root_path))
+
+
+def test_async_generators_stream_items_in_many_batches():
+    files_sizes = list(yield_files_sizes(directory_tree.root_path()))
+    async_files_sizes = asyncio.run(collect(iterate_in_executor(yield_files_sizes, 
+                                                                directory_tree.root_path(), 
+                                                                batch_size=1)))
+    assert sorted(async_files_sizes) == sorted(files_sizes)
+
+
+def test_async_generators_await_coroutine_callbacks_in_the_event_loop():
+    errors = []
+    loop_threads = []
+
+    async def on_error(e):
+        loop_threads.append(threading.get_ident())
+        errors.append(e)
+
+    async def categorize():
+        loop_threads.append(threading.get_ident())
+        return await collect(async_yield_file_categories(directory_tree.root_path(),
+                                                         FailingFileCategorizer(FileNotFoundError('mocked error')),
+                                                         on_error=on_error))
+    assert asyncio.run(categorize()) == []
+    assert len(errors) == len(directory_tree.files_paths())
+    assert all(isinstance(e, FileNotFoundError) for e in errors)
+    assert set(loop_threads) == {loop_threads[0]}
+
+
+def test_breaking_out_of_an_async_generator_closes_the_synchronous_one():
+    closed = threading.Event()
+
+    def yield_numbers():
+        try:
+            yield from range(10_000)
+        finally:
+            closed.set()
+
+    async def take_first():
+        async_numbers = iterate_in_executor(yield_numbers, batch_size=10)
+        async for number in async_numbers:
+            break
+        await async_numbers.aclose()
+        return number
+    assert asyncio.run(take_first()) == 0
+    assert closed.wait(timeout=5)
+
+
+def test_cancelling_a_traversal_stops_the_synchronous_generator():
+    started = threading.Event()
+    release = threading.Event()
+    closed = threading.Event()
+    produced = []
+
+    def yield_slowly():
+        try:
+            for number in range(10_000):
+                started.set()
+                release.wait(timeout=5)
+                produced.append(number)
+                yield number
+        finally:
+            closed.set()
+
+    async def cancel_while_walking():
+        task = asyncio.create_task(collect(iterate_in_executor(yield_slowly, batch_size=1)))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        release.set()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return True
+        return False
+    assert asyncio.run(cancel_while_walking())
+    assert closed.wait(timeout=5)
+    assert len(produced) < 10_000
+
+
+def test_async_analyzer_notifies_the_async_observer():
+    observer = RecordingObserver()
+    analizer = AsyncDirectoryAnalizer(directory_tree.root_path(), 
+                                      FileCategorizerByExtension(),
+                                      LooserPermissionsReporting(),
+                                      observer)
+    asyncio.run(analizer.categorize_files())
+    assert {(file_path, category) for (_, file_path, category) in observer.events} == \
+        set(yield_file_categories(directory_tree.root_path()))
+    observer.events.clear()
+    asyncio.run(analizer.analize_category_sizes())
+    assert {(category, size) for (_, category, size) in observer.events} == \
+        set(yield_categories_sizes(directory_tree.root_path()))
+
+
+def test_async_analyzer_reports_errors_through_the_async_observer():
+    observer = RecordingObserver()
+    asyncio.run(AsyncDirectoryAnalizer(directory_tree.root_path(), 
+                                       FailingFileCategorizer(FileNotFoundError('mocked error')),
+                                       LooserPermissionsReporting(),
+                                       observer).categorize_files())
+    assert ("file_not_found",) in observer.events
+    observer.events.clear()
+    asyncio.run(AsyncDirectoryAnalizer(directory_tree.root_path() + "jsj", 
+                                       FileCategorizerByExtension(),
+                                       LooserPermissionsReporting(),
+                                       observer).categorize_files())
+    assert observer.events == [("invalid_input", "The provided path does not point to a directory.")]
@@ -1,4 +1,7 @@
+import os
 import pytest
+import subprocess
+import sys
 from typer.testing import CliRunner
 
 from fs_analyzer.view.cli_view import CliView
@@ -28,6 +31,23 @@ def test_directory_must_be_provided_to_analyze_cat_sizes_command():
     result = runner.invoke(view.app, ["catsizes"])
     assert result.exit_code != 0
 
+def test_batch_size_must_be_positive():
+    result = runner.invoke(view.app, ["categorize", "./", "--batch-size", "0"])
+    assert result.exit_code != 0
+
+def test_permission_policy_must_exist():
+    result = runner.invoke(view.app, ["fileperms", "./", "--policy", "notvalidpolicy.toml"])
+    assert result.exit_code != 0
+
+def test_exclude_file_must_exist():
+    result = runner.invoke(view.app, ["categorize", "./", "--exclude-from", "notvalidpatterns.txt"])
+    assert result.exit_code != 0
+
+def test_index_must_be_openable(tmp_path):
+    result = runner.invoke(view.app, ["catsizes", str(tmp_path), "--index", str(tmp_path / "missing" / "index.db")])
+    assert result.exit_code != 0
+    assert "ERROR:invalid index" in result.stdout
+
 def test_size_argument_must_be_provided_to_large_files_command():
     result = runner.invoke(view.app, ["bigfiles", "directorypath/"])
     assert result.exit_code != 0
@@ -74,3 +94,76 @@ def test_a_existent_directory_must_be_provided_to_large_files_command():
     assert result.exit_code != 0
 
 
+
+def test_directory_must_be_provided_to_report_command():
+    result = runner.invoke(view.app, ["report"])
+    assert result.exit_code != 0
+
+def test_only_existing_analyses_must_be_provided_to_report_command():
+    result = runner.invoke(view.app, ["report", "./", "--analysis", "notananalysis"])
+    assert result.exit_code != 0
+
+def test_hybrid_categorizer_can_be_provided_to_categorize_command(tmp_path):
+    (tmp_path / "image.bin").write_bytes(b"\x89PNG\r\n\x1a\n")
+    result = runner.invoke(view.app, ["categorize", str(tmp_path), "--categorizer", "hybrid"])
+    assert result.exit_code == 0
+    assert "image/png" in result.stdout
+
+def test_hard_linked_files_are_counted_once_by_cat_sizes_command(tmp_path):
+    (tmp_path / "file.txt").write_bytes(b"0123456789")
+    os.link(tmp_path / "file.txt", tmp_path / "link.txt")
+    result = runner.invoke(view.app, ["catsizes", str(tmp_path), "--hard-links-once", "--one-file-system"])
+    assert result.exit_code == 0
+    assert "text/plain')\t| 10" in result.stdout
+
+def test_allocated_sizes_cannot_be_displayed_with_partial_sizes():
+    result = runner.invoke(view.app, ["catsizes", "./", "--allocated", "--progress-files", "10"])
+    assert result.exit_code != 0
+
+def test_checkpoint_file_must_be_provided_to_resume_cat_sizes_command():
+    result = runner.invoke(view.app, ["catsizes", "./", "--resume"])
+    assert result.exit_code != 0
+
+def test_a_positive_top_option_must_be_provided_to_large_files_command():
+    result = runner.invoke(view.app, ["bigfiles", "./", "0", "--top", "0"])
+    assert result.exit_code != 0
+
+def test_directory_must_be_provided_to_dir_sizes_command():
+    result = runner.invoke(view.app, ["dirsizes"])
+    assert result.exit_code != 0
+
+def test_outcomes_can_be_written_to_a_file_as_ndjson(tmp_path):
+    (tmp_path / "file.txt").write_bytes(b"0123456789")
+    output_path = tmp_path / "outcomes.ndjson"
+    result = runner.invoke(view.app, ["catsizes", str(tmp_path), "--format", "ndjson", "--output", str(output_path)])
+    assert result.exit_code == 0
+    assert "text/plain" not in result.stdout
+    assert '{"category": "text/plain", "size_b": 10}' in output_path.read_text().splitlines()
+
+def test_diff_command_lists_the_files_which_changed_between_snapshots(tmp_path):
+    (tmp_path / "tree").mkdir()
+    (tmp_path / "tree" / "file.txt").write_bytes(b"0123456789")
+    assert runner.invoke(view.app, ["snapshot", str(tmp_path / "tree"), str(tmp_path / "old.snapshot")]).exit_code == 0
+    (tmp_path / "tree" / "file.txt").write_bytes(b"01234567890123456789")
+    assert runner.invoke(view.app, ["snapshot", str(tmp_path / "tree"), str(tmp_path / "new.snapshot")]).exit_code == 0
+    result = runner.invoke(view.app, ["diff", str(tmp_path / "old.snapshot"), str(tmp_path / "new.snapshot"), "--format", "tsv"])
+    assert result.exit_code == 0
+    assert "grown\tfile.txt\t10\t20\t10" in result.stdout.splitlines()
+
+def test_diff_command_rejects_invalid_snapshots(tmp_path):
+    (tmp_path / "file.txt").write_bytes(b"0123456789")
+    result = runner.invoke(view.app, ["diff", str(tmp_path / "file.txt"), str(tmp_path / "file.txt")])
+    assert result.exit_code != 0
+
+def test_a_non_negative_latency_must_be_provided_to_watch_command(tmp_path):
+    result = runner.invoke(view.app, ["watch", str(tmp_path), "--latency", "-1"])
+    assert result.exit_code != 0
+
+def test_cli_does_not_import_the_dependencies_of_the_strategies_it_does_not_use():
+    # the imports of the CLI are checked in a fresh interpreter, since the tests import them all
+    imported_modules = subprocess.run([sys.executable, "-c", "import sys, fs_analyzer.view.cli_view; print(*sys.modules)"],
+                                      capture_output=True, text=True, check=True,
+                                      cwd=os.path.dirname(os.path.dirname(os.path.dirname(__file__)))).stdout.split()
+    deferred_modules = {"numpy", "asyncio", "filetype", "multiprocessing", "tomllib", "ctypes", "sqlite3",
+                        "concurrent.futures", "fs_analyzer.model.scan_snapshot"}
+    assert not deferred_modules & set(imported_modules)
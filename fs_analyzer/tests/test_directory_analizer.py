@@ -2,12 +2,14 @@ import os
 from unittest.mock import Mock, patch
 from pytest import fail
 
-from fs_analyzer.model.file_categorization_strategy import FileCategorizationStrategy
-from fs_analyzer.model.file_permission_reporting_strategy import FilePermissionsReportingStrategy
+from fs_analyzer.model.file_categorization_strategy import FileCategorizationStrategy, FileCategorizerByExtension
+from fs_analyzer.model.file_permission_reporting_strategy import FilePermissionsReportingStrategy, LooserPermissionsReporting
 from fs_analyzer.tests.fixtures import DirectoryTreeScenario
-from fs_analyzer.tests.utils import assert_no_exception_raised, assert_no_exception_raised_with_arg
+from fs_analyzer.tests.utils import FailingFileCategorizer, FailingPermissionsReporting, assert_no_exception_raised, assert_no_exception_raised_with_arg
 from fs_analyzer.view.cli_view import *
-from fs_analyzer.view_model.directory_analizer import DirectoryAnalizer
+from fs_analyzer.model.directory_traversal import yield_file_entries
+from fs_analyzer.model.parallel_file_categorization import ParallelFileCategorizer
+from fs_analyzer.view_model.directory_analizer import Analysis, DirectoryAnalizer
 from fs_analyzer.view_model.directory_observer import DirectoryObserver
 
 
@@ -51,14 +53,18 @@ def test_analyzer_gracefully_handle_not_readable_provided_directory():
 
 def test_reporting_permissions_gracefully_handle_file_not_found():
     mock = Mock()
-    mock.report_unusual_permissions.side_effect = FileNotFoundError('mocked error')
-    assert_no_exception_raised(directory_analizer(permission_reporting_strategy=mock).report_permissions)
+    failing_strategy = FailingPermissionsReporting(FileNotFoundError('mocked error'))
+    assert_no_exception_raised(directory_analizer(permission_reporting_strategy=failing_strategy,
+                                                  directory_observer=mock).report_permissions)
+    mock.on_file_not_found.assert_called()
 
 
 def test_categorizing_gracefully_handle_file_not_found():
     mock = Mock()
-    mock.categorize_file.side_effect = FileNotFoundError('mocked error')
-    assert_no_exception_raised(directory_analizer(file_categorization_strategy=mock).categorize_files)
+    failing_strategy = FailingFileCategorizer(FileNotFoundError('mocked error'))
+    assert_no_exception_raised(directory_analizer(file_categorization_strategy=failing_strategy,
+                                                  directory_observer=mock).categorize_files)
+    mock.on_file_not_found.assert_called()
 
 
 @patch('os.stat')
@@ -67,10 +73,62 @@ def test_large_files_gracefully_handle_file_not_found(test_patch):
     assert_no_exception_raised_with_arg(directory_analizer().identify_large_files, 10)
 
 
+def test_largest_files_requires_positive_files_count():
+    mock = Mock()
+    directory_analizer(directory_observer=mock).identify_largest_files(0)
+    mock.on_invalid_input.assert_called_once()
+
+
+def test_largest_files_streams_leaders_only_if_requested():
+    mock = Mock()
+    directory_analizer(directory_observer=mock).identify_largest_files(1)
+    mock.on_new_large_file.assert_called_once()
+    mock.on_new_large_file_leader.assert_not_called()
+    directory_analizer(directory_observer=mock).identify_largest_files(1, stream_leaders=True)
+    mock.on_new_large_file_leader.assert_called()
+
+
+def test_directories_sizes_reports_largest_directories_from_largest_one():
+    mock = Mock()
+    directory_analizer(directory_observer=mock).analize_directories_sizes(directories_count=1)
+    mock.on_new_directory_size.assert_called_once()
+    assert mock.on_new_directory_size.call_args.args[0] == directory_tree.root_path()
+
+
+def test_directories_sizes_requires_non_negative_depth():
+    mock = Mock()
+    directory_analizer(directory_observer=mock).analize_directories_sizes(max_depth=-1)
+    mock.on_invalid_input.assert_called_once()
+
+
+def test_cat_sizes_reports_partial_sizes_only_if_requested():
+    mock = Mock()
+    directory_analizer(directory_observer=mock).analize_category_sizes()
+    mock.on_partial_file_categories_sizes.assert_not_called()
+    directory_analizer(file_categorization_strategy=FileCategorizerByExtension(),
+                       directory_observer=mock).analize_category_sizes(files_interval=1)
+    assert mock.on_partial_file_categories_sizes.call_count == len(directory_tree.files_paths())
+
+
 def test_cat_sizes_gracefully_handle_file_not_found():
     mock = Mock()
-    mock.categorize_file.side_effect = FileNotFoundError('mocked error')
-    assert_no_exception_raised(directory_analizer(file_categorization_strategy=mock).analize_category_sizes)
+    failing_strategy = FailingFileCategorizer(FileNotFoundError('mocked error'))
+    assert_no_exception_raised(directory_analizer(file_categorization_strategy=failing_strategy,
+                                                  directory_observer=mock).analize_category_sizes)
+    mock.on_file_not_found.assert_called()
+
+
+def test_disk_usages_report_both_apparent_and_allocated_sizes():
+    mock = Mock()
+    directory_analizer(file_categorization_strategy=FileCategorizerByExtension(),
+                       directory_observer=mock).analize_category_disk_usages()
+    reported_sizes = [call.args[1] for call in mock.on_new_file_category_disk_usage.call_args_list]
+    assert sum(reported_sizes) == sum(os.path.getsize(fp) for fp in directory_tree.files_paths())
+    directory_analizer(directory_observer=mock).identify_large_files_disk_usages(0, by_allocated_size=False)
+    assert mock.on_new_large_file_disk_usage.call_count == len([fp for fp in directory_tree.files_paths() 
+                                                                if os.path.getsize(fp) > 0])
+    directory_analizer(directory_observer=mock).identify_large_files_disk_usages(-1)
+    mock.on_invalid_input.assert_called_once()
 
 
 def directory_analizer(directory_path: str = directory_tree.root_path(),
@@ -82,3 +140,66 @@ def directory_analizer(directory_path: str = directory_tree.root_path(),
                              file_categorization_strategy,
                              permission_reporting_strategy,
                              directory_observer)
+
+
+def test_categorizing_in_batches_notifies_whole_batches():
+    mock = Mock()
+    directory_analizer(file_categorization_strategy=FileCategorizerByExtension(),
+                       directory_observer=mock).categorize_files(batch_size=len(directory_tree.files_paths()))
+    mock.on_new_files_batch.assert_called_once()
+    mock.on_new_categorized_file.assert_not_called()
+    assert sorted(mock.on_new_files_batch.call_args.args[0].paths()) == sorted(directory_tree.files_paths())
+
+
+@patch('fs_analyzer.view_model.directory_analizer.NUMPY_AVAILABLE', False)
+def test_sizes_statistics_require_numpy():
+    mock = Mock()
+    directory_analizer(directory_observer=mock).analize_sizes_statistics([0])
+    mock.on_invalid_input.assert_called_once()
+    mock.on_new_large_files_count.assert_not_called()
+
+
+def test_report_performs_all_analyses_in_a_single_walk():
+    mock = Mock()
+    with patch('fs_analyzer.model.file_listing_generators.yield_file_entries',
+               wraps=yield_file_entries) as walk:
+        directory_analizer(file_categorization_strategy=FileCategorizerByExtension(),
+                           permission_reporting_strategy=LooserPermissionsReporting(),
+                           directory_observer=mock).report(set(Analysis), 10)
+    walk.assert_called_once()
+    assert mock.on_new_categorized_file.call_count == len(directory_tree.files_paths())
+    assert mock.on_new_file_category_size.call_count == 2
+    assert mock.on_new_large_file.call_count == 1
+
+
+def test_report_performs_only_requested_analyses():
+    mock = Mock()
+    directory_analizer(file_categorization_strategy=FileCategorizerByExtension(),
+                       directory_observer=mock).report({Analysis.CATEGORY_SIZES})
+    mock.on_new_categorized_file.assert_not_called()
+    mock.on_new_large_file.assert_not_called()
+    assert mock.on_new_file_category_size.call_count == 2
+
+
+def test_report_requires_size_to_identify_large_files():
+    mock = Mock()
+    directory_analizer(directory_observer=mock).report({Analysis.LARGE_FILES})
+    mock.on_invalid_input.assert_called_once()
+
+
+def test_report_gracefully_handle_file_not_found():
+    mock = Mock()
+    failing_strategy = FailingFileCategorizer(FileNotFoundError('mocked error'))
+    analizer = directory_analizer(file_categorization_strategy=failing_strategy, directory_observer=mock)
+    assert_no_exception_raised(lambda: analizer.report(set(Analysis), 10))
+    mock.on_file_not_found.assert_called()
+    mock.on_invalid_input.assert_not_called()
+
+
+def test_parallel_categorizing_gracefully_handle_file_not_found():
+    mock = Mock()
+    failing_strategy = ParallelFileCategorizer(FailingFileCategorizer(FileNotFoundError('mocked error')),
+                                               workers=2, use_processes=False)
+    assert_no_exception_raised(directory_analizer(file_categorization_strategy=failing_strategy,
+                                                  directory_observer=mock).categorize_files)
+    mock.on_file_not_found.assert_called()
@@ -0,0 +1,117 @@
+import errno
+import os
+import pytest
+import shutil
+from unittest.mock import Mock, call
+
+from fs_analyzer.model.directory_traversal import PathFilter, TraversalOptions
+from fs_analyzer.model.directory_watcher import INOTIFY_AVAILABLE, DirectoryWatcher, Inotify, WatchedFile
+from fs_analyzer.model.file_categorization_strategy import FileCategorizerByExtension
+from fs_analyzer.model.file_category import FileCategory
+from fs_analyzer.model.file_permission_reporting_strategy import LooserPermissionsReporting
+from fs_analyzer.model.file_permissions import UNUSUAL_PERMISSIONS
+from fs_analyzer.tests.fixtures import DirectoryTreeScenario
+from fs_analyzer.tests.utils import create_file, get_category, get_size
+from fs_analyzer.view_model.directory_analizer import Analysis, DirectoryAnalizer
+
+pytestmark = pytest.mark.skipif(not INOTIFY_AVAILABLE, reason="inotify is only available on Linux")
+
+TEST_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), 'testdir_watch'))
+directory_tree = DirectoryTreeScenario(TEST_PATH)
+
+
+def setup_module():
+    directory_tree.setup()
+
+
+def teardown_module():
+    directory_tree.remove()
+
+
+def changed_paths(changes):
+    return {change.path: (change.old_state and change.old_state.size, change.new_state and change.new_state.size)
+            for change in changes}
+
+
+def test_first_changes_list_all_the_files():
+    changes = DirectoryWatcher(TEST_PATH).yield_changes()
+    assert {change.path: change.new_state for change in next(changes)} == \
+        {path: WatchedFile(get_size(path), get_category(path), frozenset()) for path in directory_tree.files_paths()}
+    changes.close()
+
+
+def test_watching_a_missing_directory_raises_os_error(tmp_path):
+    with Inotify() as inotify, pytest.raises(OSError) as error:
+        inotify.add_watch(str(tmp_path / "missing"))
+    assert error.value.errno == errno.ENOENT
+
+
+def test_only_changed_files_are_returned(tmp_path):
+    create_file(tmp_path / "kept.txt")
+    create_file(tmp_path / "grown.txt")
+    create_file(tmp_path / "removed.txt")
+    os.mkdir(tmp_path / "moved")
+    create_file(tmp_path / "moved" / "file.txt")
+    changes = DirectoryWatcher(str(tmp_path), latency_seconds=0.05).yield_changes()
+    next(changes)
+    create_file(tmp_path / "grown.txt", contents="12345678")
+    os.remove(tmp_path / "removed.txt")
+    os.makedirs(tmp_path / "added" / "subdir")
+    create_file(tmp_path / "added" / "subdir" / "file.py")
+    os.rename(tmp_path / "moved", tmp_path / "renamed")
+    assert changed_paths(next(changes)) == {str(tmp_path / "grown.txt"): (4, 8),
+                                            str(tmp_path / "removed.txt"): (4, None),
+                                            str(tmp_path / "added" / "subdir" / "file.py"): (None, 4),
+                                            str(tmp_path / "moved" / "file.txt"): (4, None),
+                                            str(tmp_path / "renamed" / "file.txt"): (None, 4)}
+    # the moved directory is watched under its new path only
+    create_file(tmp_path / "renamed" / "file.txt", contents="123")
+    assert changed_paths(next(changes)) == {str(tmp_path / "renamed" / "file.txt"): (4, 3)}
+    changes.close()
+
+
+def test_excluded_directories_added_later_are_not_watched(tmp_path):
+    changes = DirectoryWatcher(str(tmp_path), latency_seconds=0.05,
+                               traversal_options=TraversalOptions(path_filter=PathFilter(["node_modules"]))).yield_changes()
+    assert next(changes) == []
+    os.mkdir(tmp_path / "node_modules")
+    create_file(tmp_path / "node_modules" / "x.js")
+    os.mkdir(tmp_path / "src")
+    create_file(tmp_path / "src" / "x.js")
+    assert changed_paths(next(changes)) == {str(tmp_path / "src" / "x.js"): (None, 4)}
+    create_file(tmp_path / "node_modules" / "x.js", contents="123")
+    create_file(tmp_path / "src" / "x.js", contents="123")
+    assert changed_paths(next(changes)) == {str(tmp_path / "src" / "x.js"): (4, 3)}
+    changes.close()
+
+
+def test_watch_ends_once_the_root_is_removed(tmp_path):
+    os.mkdir(tmp_path / "tree")
+    create_file(tmp_path / "tree" / "file.txt")
+    changes = DirectoryWatcher(str(tmp_path / "tree"), latency_seconds=0.05).yield_changes()
+    next(changes)
+    shutil.rmtree(tmp_path / "tree")
+    assert changed_paths(next(changes)) == {str(tmp_path / "tree" / "file.txt"): (4, None)}
+    assert next(changes, None) is None
+
+
+def test_analyzer_keeps_the_outcomes_of_the_analyses_up_to_date(tmp_path):
+    os.mkdir(tmp_path / "tree")
+    create_file(tmp_path / "tree" / "file.txt")
+    # each batch of changes is applied once the updates of the previous one are notified
+    changes_to_apply = [lambda: create_file(tmp_path / "tree" / "file.txt", contents="0" * 100),
+                        lambda: os.chmod(tmp_path / "tree" / "file.txt", 0o777),
+                        lambda: create_file(tmp_path / "tree" / "file.txt", contents="0"),
+                        lambda: shutil.rmtree(tmp_path / "tree")]
+    mock = Mock()
+    mock.on_updates_completed.side_effect = lambda: changes_to_apply.pop(0)()
+    DirectoryAnalizer(str(tmp_path / "tree"), FileCategorizerByExtension(), LooserPermissionsReporting(), mock)\
+        .watch(set(Analysis), file_size_in_bytes=10, latency_seconds=0.05)
+    file_path, text = str(tmp_path / "tree" / "file.txt"), FileCategory("text/plain")
+    assert mock.on_new_file_category_size.call_args_list == [call(text, 4), call(text, 100), call(text, 1), call(text, 0)]
+    mock.on_new_categorized_file.assert_called_once_with(file_path, text)
+    assert mock.on_new_large_file.call_args_list == [call(file_path, 100)]
+    mock.on_large_file_dropped.assert_called_once_with(file_path, 1)
+    assert mock.on_new_file_with_unusual_permission.call_args_list == \
+        [call(file_path, {UNUSUAL_PERMISSIONS["WORLD_WRITABLE"], UNUSUAL_PERMISSIONS["WORLD_EXECUTABLE"]}), call(file_path, set())]
+    assert changes_to_apply == []
@@ -1,11 +1,23 @@
+import gzip
+import io
+import mimetypes
 import os
 import pytest
+import random
+import tarfile
+import zipfile
+from unittest.mock import patch
 
-from fs_analyzer.model.file_categorization_strategy import FileCategorizerByExtension
+from fs_analyzer.model.caching_file_categorization import CacheStatistics, LruFileCategorizer
+from fs_analyzer.model.extension_table_categorization import ExtensionTable, FileCategorizerByExtensionTable
+from fs_analyzer.model.file_categorization_strategy import FileCategorizerByExtension, FileCategorizerBySignature, HybridFileCategorizer
 from fs_analyzer.model.file_category import *
 from fs_analyzer.model.file_listing_generators import *
+from fs_analyzer.model.header_file_categorization import FileCategorizerByHeader
+from fs_analyzer.model.directory_traversal import FileEntry, PathFilter, TraversalOptions, yield_directory_file_entries, yield_file_entries
+from fs_analyzer.model.parallel_file_categorization import ParallelFileCategorizer
 from fs_analyzer.tests.fixtures import DirectoryTreeScenario
-from fs_analyzer.tests.utils import get_category, get_size, get_unusual_permissions
+from fs_analyzer.tests.utils import create_file, get_category, get_size, get_unusual_permissions
 
 TEST_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), 'testdir'))
 directory_tree = DirectoryTreeScenario(TEST_PATH)
@@ -53,6 +65,46 @@ def test_permissions_report_returns_all_unusual_permissions():
     assert len(generated_files_permissions) == len(files_permissions)
   
   
+def test_largest_files_report_returns_largest_files_from_largest_one():
+    files_count = 3
+    largest_files_sizes = sorted(((get_size(fp), fp) for fp in directory_tree.files_paths()), reverse=True)[:files_count]
+    generated_files_sizes = list(yield_largest_files(directory_tree.root_path(), files_count))
+    assert generated_files_sizes == [(fp, size) for (size, fp) in largest_files_sizes]
+
+
+def test_largest_files_report_notifies_leaders_and_applies_threshold():
+    size_threshold_in_bytes = 10
+    leaders = []
+    generated_files_sizes = list(yield_largest_files(directory_tree.root_path(), len(directory_tree.files_paths()),
+                                                     threshold_in_bytes=size_threshold_in_bytes,
+                                                     on_new_leader=lambda fp, size: leaders.append((fp, size))))
+    assert sorted(generated_files_sizes) == sorted(yield_files_larger_than(directory_tree.root_path(), size_threshold_in_bytes))
+    assert sorted(leaders) == sorted(generated_files_sizes)
+
+
+def test_directories_sizes_report_returns_cumulative_sizes_bottom_up():
+    expected_directories_sizes = {dp: (0, 0) for (dp, _, _) in os.walk(directory_tree.root_path())}
+    for fp in directory_tree.files_paths():
+        directory_path = os.path.dirname(fp)
+        while True:
+            size, files_count = expected_directories_sizes[directory_path]
+            expected_directories_sizes[directory_path] = (size + get_size(fp), files_count + 1)
+            if directory_path == directory_tree.root_path():
+                break
+            directory_path = os.path.dirname(directory_path)
+    generated_directories_sizes = list(yield_directories_sizes(directory_tree.root_path()))
+    assert {dp: (size, files_count) for (dp, size, files_count) in generated_directories_sizes} \
+        == expected_directories_sizes
+    assert generated_directories_sizes[-1][0] == directory_tree.root_path()
+
+
+def test_directories_sizes_report_respects_max_depth():
+    generated_directories_sizes = list(yield_directories_sizes(directory_tree.root_path(), max_depth=0))
+    assert generated_directories_sizes == [(directory_tree.root_path(),
+                                            sum(get_size(fp) for fp in directory_tree.files_paths()),
+                                            len(directory_tree.files_paths()))]
+
+
 def test_large_files_report_returns_all_large_files():
     size_threshold_in_bytes = 10
     files_sizes = {fp: get_size(fp) for fp in directory_tree.files_paths() if get_size(fp) > size_threshold_in_bytes}
@@ -77,6 +129,56 @@ def test_category_sizes_report_returns_all_categories_sizes():
 empty_dir = os.path.join(TEST_PATH, 'emptydir')
 
 
+@pytest.mark.parametrize("permission_reporting_strategy", [StricterPermissionsReporting(), LooserPermissionsReporting()])
+def test_bulk_permissions_evaluation_matches_per_file_evaluation(permission_reporting_strategy):
+    modes = [0o100000 | permission_bits for permission_bits in range(0o10000)]
+    unusual_mode_masks = permission_reporting_strategy.report_unusual_modes(modes)
+    for (mode, unusual_mode_mask) in zip(modes, unusual_mode_masks):
+        unusual_permissions = permission_reporting_strategy.report_unusual_permissions(os.stat_result((mode,) + (0,) * 9))
+        assert bool(unusual_mode_mask) == bool(unusual_permissions)
+        assert permission_reporting_strategy.permissions_of(unusual_mode_mask) == unusual_permissions
+
+
+def test_bulk_permissions_report_returns_files_with_unusual_permissions():
+    os.chmod(directory_tree.files_paths()[0], 0o775)
+    try:
+        files_permissions = {fp: get_unusual_permissions(fp) for fp in directory_tree.files_paths()}
+        generated_files_permissions = dict(yield_unusual_permissions(directory_tree.root_path(), LooserPermissionsReporting()))
+    finally:
+        os.chmod(directory_tree.files_paths()[0], 0o644)
+    assert generated_files_permissions == {fp: permissions for (fp, permissions) in files_permissions.items() if permissions}
+
+
+def test_categories_sizes_snapshots_are_periodic_and_end_with_totals():
+    snapshots = list(yield_categories_sizes_snapshots(directory_tree.root_path(), files_interval=2))
+    files_count = len(directory_tree.files_paths())
+    assert [(count, completed) for (_, count, completed) in snapshots] \
+        == [(count, False) for count in range(2, files_count + 1, 2)] + [(files_count, True)]
+    assert snapshots[-1][0] == dict(yield_categories_sizes(directory_tree.root_path()))
+
+
+def test_categories_sizes_snapshots_are_periodic_in_time():
+    with patch('fs_analyzer.model.file_listing_generators.time.monotonic', side_effect=range(100)):
+        snapshots = list(yield_categories_sizes_snapshots(directory_tree.root_path(), seconds_interval=1))
+    assert [completed for (_, _, completed) in snapshots] == [False] * len(directory_tree.files_paths()) + [True]
+
+
+def test_files_batches_return_all_files_in_columnar_form():
+    files_batches = list(yield_files_batches(directory_tree.root_path(), FileCategorizerByExtension(), batch_size=2))
+    files_count = len(directory_tree.files_paths())
+    assert [len(files_batch) for files_batch in files_batches] == [2] * (files_count // 2) + [1] * (files_count % 2)
+    assert {file_path: (size, category) for files_batch in files_batches for (file_path, size, category) in files_batch} \
+        == {fp: (get_size(fp), get_category(fp)) for fp in directory_tree.files_paths()}
+    assert len(files_batches[0].category_table) == len({get_category(fp) for fp in directory_tree.files_paths()})
+    assert files_batches[0].inodes[0] == os.stat(files_batches[0].path(0)).st_ino
+
+
+def test_files_batches_do_not_store_categories_without_a_strategy():
+    files_batch = next(yield_files_batches(directory_tree.root_path()))
+    assert files_batch.category_table is None
+    assert set(files_batch.categories()) == {None}
+
+
 def test_no_files_sizes_if_empty_directory():
     with pytest.raises(StopIteration):
         next(yield_files_sizes(empty_dir))
@@ -95,3 +197,394 @@ def test_no_unusual_permissions_if_empty_directory():
 def test_no_categories_if_empty_directory():
     with pytest.raises(StopIteration):
         next(yield_categories_sizes(empty_dir))
+
+
+# check traversal engine
+def test_file_entries_returns_all_files_with_their_stat():
+    generated_entries = list(yield_file_entries(directory_tree.root_path()))
+    assert sorted(entry.path for entry in generated_entries) == sorted(directory_tree.files_paths())
+    assert {entry.path: entry.stat().st_size for entry in generated_entries} == \
+        {fp: get_size(fp) for fp in directory_tree.files_paths()}
+
+
+def test_file_entries_depth_is_relative_to_root():
+    depths = {entry.path: entry.depth for entry in yield_file_entries(directory_tree.root_path())}
+    assert depths[os.path.join(TEST_PATH, 'file1.txt')] == 0
+    assert depths[os.path.join(TEST_PATH, 'subdir', 'unidirƏ', 'file1.txt')] == 2
+
+
+def test_file_entries_ignore_symbolic_links():
+    link_path = os.path.join(TEST_PATH, 'subdir', 'link.txt')
+    os.symlink(directory_tree.files_paths()[0], link_path)
+    try:
+        generated_paths = {entry.path for entry in yield_file_entries(directory_tree.root_path())}
+    finally:
+        os.remove(link_path)
+    assert link_path not in generated_paths
+
+
+def test_file_entries_report_not_found_directory():
+    errors = []
+    assert list(yield_file_entries(TEST_PATH + "jsj", on_error=errors.append)) == []
+    assert isinstance(errors[0], FileNotFoundError)
+
+
+def test_parallel_file_entries_report_errors_met_after_a_batch_of_entries(tmp_path):
+    for i in range(600):
+        create_file(str(tmp_path / f'{i}.txt'))
+    def yield_entries_then_fail(*args, **kwargs):
+        yield from yield_directory_file_entries(*args, **kwargs)
+        args[3](PermissionError('mocked error'))
+    errors = []
+    with patch('fs_analyzer.model.directory_traversal.yield_directory_file_entries', yield_entries_then_fail):
+        generated_entries = list(yield_file_entries(str(tmp_path), on_error=errors.append, 
+                                                    traversal_options=TraversalOptions(workers=4)))
+    assert len(generated_entries) == 600
+    assert [type(error) for error in errors] == [PermissionError]
+
+
+def test_path_filter_matches_names_and_trailing_path_components():
+    path_filter = PathFilter(excludes=['.git', '*.tmp', 'build/cache', 'docs/**/old'], includes=['*.py'])
+    assert [path_filter.is_excluded(path) for path in ['/r/.git', '/r/a.git', '/r/s/t.tmp', '/r/t.tmp/s', 
+                                                        '/r/build/cache', '/r/rebuild/cache', 
+                                                        '/r/docs/old', '/r/docs/a/b/old']] \
+        == [True, False, True, False, True, False, True, True]
+    assert [path_filter.is_selected_file(path) for path in ['/r/a.py', '/r/a.pyc', '/r/x.tmp']] == [True, False, False]
+
+
+def test_path_filter_matches_paths_relative_to_the_root():
+    path_filter = PathFilter(excludes=['tmp/**', 'pt/*', 'src/*.c']).relative_to('/tmp/pt')
+    assert [path_filter.is_excluded(path) for path in ['/tmp/pt/a.txt', '/tmp/pt/tmp/a.txt', '/tmp/pt/pt/a.txt',
+                                                        '/tmp/pt/src/a.c', '/tmp/pt/lib/src/a.c']] \
+        == [False, True, True, True, True]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_patterns_with_a_slash_do_not_match_the_directories_above_the_root(tmp_path, workers):
+    root_path = tmp_path / 'pt'
+    os.makedirs(root_path / 'pt')
+    kept_path = create_file(str(root_path / 'a.txt'))
+    create_file(str(root_path / 'pt' / 'b.txt'))
+    path_filter = PathFilter([f'{tmp_path.name}/**', 'pt/*'])
+    generated_paths = [entry.path for entry in yield_file_entries(
+        str(root_path), traversal_options=TraversalOptions(workers=workers, path_filter=path_filter))]
+    assert generated_paths == [kept_path]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_file_entries_do_not_descend_into_excluded_directories(tmp_path, workers):
+    kept_paths = [create_file(str(tmp_path / 'kept.py')), create_file(str(tmp_path / 'kept.txt'))]
+    os.makedirs(tmp_path / 'node_modules' / 'package')
+    create_file(str(tmp_path / 'node_modules' / 'package' / 'index.js'))
+    create_file(str(tmp_path / 'skipped.tmp'))
+    # an unreadable directory reports an error if it is listed
+    os.chmod(tmp_path / 'node_modules', 0o000)
+    errors = []
+    try:
+        generated_paths = {entry.path for entry in yield_file_entries(
+            str(tmp_path), on_error=errors.append,
+            traversal_options=TraversalOptions(workers=workers, path_filter=PathFilter(['node_modules', '*.tmp'])))}
+    finally:
+        os.chmod(tmp_path / 'node_modules', 0o755)
+    assert generated_paths == set(kept_paths)
+    assert errors == []
+
+
+def test_generators_apply_path_filters():
+    path_filter = PathFilter(includes=['*.py'])
+    generated_paths = [file_path for (file_path, _) in yield_files_sizes(directory_tree.root_path(), 
+                                                                         traversal_options=TraversalOptions(path_filter=path_filter))]
+    assert generated_paths == [fp for fp in directory_tree.files_paths() if fp.endswith('.py')]
+    directories_sizes = {directory_path: size for (directory_path, size, _) in yield_directories_sizes(
+        directory_tree.root_path(), traversal_options=TraversalOptions(path_filter=PathFilter(['subdir'])))}
+    assert not any(os.path.basename(directory_path) == 'subdir' for directory_path in directories_sizes)
+    assert directories_sizes[directory_tree.root_path()] == sum(get_size(fp) for fp in directory_tree.files_paths()
+                                                                if 'subdir' not in fp)
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_hard_linked_files_are_counted_once(workers):
+    link_path = os.path.join(TEST_PATH, 'subdir', 'hardlink.bin')
+    linked_path = directory_tree.files_paths()[0]
+    os.link(linked_path, link_path)
+    try:
+        traversal_options = TraversalOptions(workers=workers, hard_links_once=True)
+        generated_paths = [file_path for (file_path, _) in yield_files_sizes(directory_tree.root_path(), 
+                                                                             traversal_options=traversal_options)]
+        categories_sizes = dict(yield_categories_sizes(directory_tree.root_path(), traversal_options=traversal_options))
+    finally:
+        os.remove(link_path)
+    assert len(generated_paths) == len(directory_tree.files_paths())
+    assert set(generated_paths) - {link_path, linked_path} == set(directory_tree.files_paths()) - {linked_path}
+    assert sum(categories_sizes.values()) == sum(get_size(fp) for fp in directory_tree.files_paths())
+
+
+def test_disk_usages_report_allocated_sizes_of_sparse_files(tmp_path):
+    sparse_path = tmp_path / 'image.img'
+    with open(sparse_path, 'wb') as sparse_file:
+        sparse_file.truncate(1 << 24)
+    dense_path = create_file(str(tmp_path / 'dense.txt'))
+    disk_usages = {file_path: (size, allocated) for (file_path, size, allocated) in yield_files_disk_usages(str(tmp_path))}
+    assert disk_usages == {str(sparse_path): (1 << 24, allocated_size(os.stat(sparse_path))), 
+                           dense_path: (get_size(dense_path), allocated_size(os.stat(dense_path)))}
+    assert disk_usages[str(sparse_path)][1] < 1 << 24
+    assert [file_path for (file_path, _, _) in yield_large_files_disk_usages(str(tmp_path), 1 << 20)] == []
+    assert [file_path for (file_path, _, _) in yield_large_files_disk_usages(str(tmp_path), 1 << 20, 
+                                                                             by_allocated_size=False)] == [str(sparse_path)]
+    categories_disk_usages = list(yield_categories_disk_usages(str(tmp_path)))
+    assert sum(size for (_, size, _) in categories_disk_usages) == sum(size for (size, _) in disk_usages.values())
+    assert sum(allocated for (_, _, allocated) in categories_disk_usages) == sum(allocated for (_, allocated) in disk_usages.values())
+
+
+def test_allocated_size_defaults_to_apparent_size_without_blocks():
+    assert allocated_size(os.stat_result((0o100644, 0, 0, 1, 0, 0, 1000, 0, 0, 0))) == 1000
+
+
+def test_one_file_system_traversal_skips_directories_on_other_devices():
+    subdirectories = []
+    list(yield_directory_file_entries(directory_tree.root_path(), 0, subdirectories, root_device=-1))
+    assert subdirectories == []
+    generated_paths = [file_path for (file_path, _) in yield_files_sizes(directory_tree.root_path(), 
+                                                                         traversal_options=TraversalOptions(one_file_system=True))]
+    assert sorted(generated_paths) == sorted(directory_tree.files_paths())
+
+
+def test_one_file_system_traversal_takes_devices_from_the_listing():
+    with patch('os.lstat', wraps=os.lstat) as lstat:
+        generated_paths = [entry.path for entry in yield_file_entries(directory_tree.root_path(), 
+                                                                      traversal_options=TraversalOptions(one_file_system=True))]
+    lstat.assert_not_called()
+    assert sorted(generated_paths) == sorted(directory_tree.files_paths())
+
+
+def test_files_analyses_returns_outcomes_of_all_requested_analyses():
+    generated_analyses = {fp: (size, cat, perms) for (fp, size, cat, perms) in
+                          yield_files_analyses(directory_tree.root_path(),
+                                               file_categorization_strategy=FileCategorizerByExtension(),
+                                               permission_reporting_strategy=LooserPermissionsReporting())}
+    assert generated_analyses == {fp: (get_size(fp), get_category(fp), get_unusual_permissions(fp))
+                                  for fp in directory_tree.files_paths()}
+
+
+def test_files_analyses_skips_not_requested_analyses():
+    for (_, size, cat, perms) in yield_files_analyses(directory_tree.root_path(), with_size=False):
+        assert size is None and cat is None and perms is None
+
+
+# check parallel traversal
+def test_parallel_file_entries_returns_same_files_as_sequential_traversal():
+    generated_paths = [entry.path for entry in yield_file_entries(directory_tree.root_path(),
+                                                                  traversal_options=TraversalOptions(workers=4))]
+    assert sorted(generated_paths) == sorted(directory_tree.files_paths())
+
+
+def test_parallel_file_entries_with_full_queues_returns_all_files():
+    with patch('fs_analyzer.model.directory_traversal._PENDING_DIRECTORIES_PER_WORKER', 1), \
+            patch('fs_analyzer.model.directory_traversal._RESULTS_PER_WORKER', 1), \
+            patch('fs_analyzer.model.directory_traversal._RESULTS_BATCH_SIZE', 1):
+        generated_paths = [entry.path for entry in yield_file_entries(directory_tree.root_path(),
+                                                                      traversal_options=TraversalOptions(workers=2))]
+    assert sorted(generated_paths) == sorted(directory_tree.files_paths())
+
+
+def test_parallel_file_entries_can_be_closed_before_completion():
+    entries = yield_file_entries(directory_tree.root_path(), traversal_options=TraversalOptions(workers=2))
+    next(entries)
+    entries.close()
+
+
+def test_parallel_file_entries_report_not_found_directory():
+    errors = []
+    assert list(yield_file_entries(TEST_PATH + "jsj", on_error=errors.append,
+                                   traversal_options=TraversalOptions(workers=2))) == []
+    assert isinstance(errors[0], FileNotFoundError)
+
+
+def test_parallel_size_report_returns_all_files_sizes():
+    generated_files_sizes = dict(yield_files_sizes(directory_tree.root_path(),
+                                                   traversal_options=TraversalOptions(workers=3)))
+    assert generated_files_sizes == {fp: get_size(fp) for fp in directory_tree.files_paths()}
+
+
+# check parallel categorization
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_parallel_categorization_returns_all_categorized_files(use_processes):
+    strategy = ParallelFileCategorizer(FileCategorizerByExtension(), workers=2, use_processes=use_processes, chunk_size=2)
+    generated_files_categories = dict(yield_file_categories(directory_path=directory_tree.root_path(),
+                                                            file_categorization_strategy=strategy))
+    assert generated_files_categories == {fp: get_category(fp) for fp in directory_tree.files_paths()}
+
+
+def test_parallel_categorization_returns_all_categories_sizes():
+    strategy = ParallelFileCategorizer(FileCategorizerByExtension(), workers=2, use_processes=False, chunk_size=1)
+    assert dict(yield_categories_sizes(TEST_PATH, strategy)) == \
+        dict(yield_categories_sizes(TEST_PATH, FileCategorizerByExtension()))
+
+
+# check caching categorization
+def test_lru_categorization_memoizes_categories_by_extension():
+    strategy = LruFileCategorizer(FileCategorizerByExtension())
+    generated_files_categories = dict(yield_file_categories(directory_tree.root_path(), strategy))
+    assert generated_files_categories == {fp: get_category(fp) for fp in directory_tree.files_paths()}
+    distinct_extensions = len({os.path.splitext(fp)[1] for fp in directory_tree.files_paths()})
+    assert strategy.cache_statistics == CacheStatistics(hits=len(directory_tree.files_paths()) - distinct_extensions,
+                                                        misses=distinct_extensions,
+                                                        evictions=0,
+                                                        size=distinct_extensions)
+
+
+def test_lru_categorization_evicts_least_recently_used_categories():
+    strategy = LruFileCategorizer(FileCategorizerByExtension(), max_size=1)
+    generated_files_categories = dict(yield_file_categories(directory_tree.root_path(), strategy))
+    assert generated_files_categories == {fp: get_category(fp) for fp in directory_tree.files_paths()}
+    assert strategy.cache_statistics.size == 1
+    assert strategy.cache_statistics.evictions == strategy.cache_statistics.misses - 1
+
+
+def test_lru_categorization_memoizes_hard_links_by_inode():
+    link_path = os.path.join(TEST_PATH, 'subdir', 'hardlink.bin')
+    os.link(directory_tree.files_paths()[0], link_path)
+    try:
+        strategy = LruFileCategorizer(FileCategorizerBySignature())
+        list(yield_file_categories(directory_tree.root_path(), strategy))
+    finally:
+        os.remove(link_path)
+    assert strategy.cache_statistics.hits == 1
+
+
+def test_lru_categorization_classifies_the_files_sharing_the_key_of_a_failed_one():
+    class FailingOnFirstFileCategorizer(FileCategorizerByExtension):
+        def categorize_file(self, file_path):
+            if file_path.endswith("first.txt"):
+                raise PermissionError("mocked error")
+            return super().categorize_file(file_path)
+    errors = []
+    file_entries = [FileEntry("first.txt"), FileEntry("second.txt"), FileEntry("third.txt")]
+    generated_files_categories = dict(LruFileCategorizer(FailingOnFirstFileCategorizer())
+                                      .categorize_files(file_entries, errors.append))
+    assert {file_entry.path: category for (file_entry, category) in generated_files_categories.items()} \
+        == {"second.txt": FileCategory("text/plain"), "third.txt": FileCategory("text/plain")}
+    assert len(errors) == 1
+
+
+def test_extension_cache_key_accounts_for_compressed_files():
+    strategy = FileCategorizerByExtension()
+    assert strategy.cache_key(FileEntry("a/b.txt")) == strategy.cache_key(FileEntry("c.txt"))
+    assert strategy.cache_key(FileEntry("a/b.tar.gz")) != strategy.cache_key(FileEntry("a/b.txt.gz"))
+
+
+# check hybrid categorization
+PNG_HEADER = b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR"
+
+
+@pytest.mark.parametrize("file_name", ["image", "image.bin", "image.BIN", "image.unknownext"])
+def test_hybrid_categorization_sniffs_signature_of_ambiguous_extensions(tmp_path, file_name):
+    file_path = tmp_path / file_name
+    file_path.write_bytes(PNG_HEADER)
+    assert HybridFileCategorizer().categorize_file(str(file_path)) == FileCategory("image/png")
+
+
+def test_hybrid_categorization_trusts_known_extensions_without_reading_files(tmp_path):
+    assert HybridFileCategorizer().categorize_file(str(tmp_path / "missing.txt")) == FileCategory("text/plain")
+
+
+def test_hybrid_categorization_falls_back_to_untrusted_extension(tmp_path):
+    file_path = tmp_path / "notes.txt"
+    file_path.write_text("not an image")
+    strategy = HybridFileCategorizer(untrusted_extensions=["txt"])
+    assert strategy.categorize_file(str(file_path)) == FileCategory("text/plain")
+
+
+# check header categorization
+def _zipped_document(entry_name: str) -> bytes:
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zipped_document:
+        zipped_document.writestr("[Content_Types].xml", "<Types/>")
+        zipped_document.writestr(entry_name, "<document/>")
+    return archive.getvalue()
+
+
+def _tar_archive() -> bytes:
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode="w") as tar:
+        tar.addfile(tarfile.TarInfo("empty.txt"))
+    return archive.getvalue()
+
+
+HEADERS = {"empty": b"",
+           "text": b"just some text",
+           "png": PNG_HEADER + bytes(300),
+           "apng": PNG_HEADER + bytes(17) + b"\x00\x00\x00\x08acTL" + bytes(300),
+           "jpeg": b"\xff\xd8\xff\xe0\x00\x10JFIF" + bytes(300),
+           "gif": b"GIF89a" + bytes(10),
+           "pdf": b"%PDF-1.7\n",
+           "zip": _zipped_document("data.txt"),
+           "docx": _zipped_document("word/document.xml"),
+           "gz": gzip.compress(b"data"),
+           "tar": _tar_archive(),
+           "mp4": b"\x00\x00\x00\x18ftypisom\x00\x00\x02\x00isomiso2" + bytes(300),
+           # the brand identifying the type of the file is past the first HEADER_SIZE bytes
+           "heic": b"\x00\x00\x01\x30ftypmif1\x00\x00\x00\x00" + b"mif1" * 71 + b"heic",
+           "short_mp4": b"\x00\x00\x00\x18ftypisom",
+           "elf": b"\x7fELF" + bytes(60),
+           **{f"random{i}": random.Random(i).randbytes(1000) for i in range(20)}}
+
+
+@pytest.mark.parametrize("header", HEADERS.values(), ids=HEADERS.keys())
+def test_header_categorization_returns_same_categories_as_signature_categorization(tmp_path, header):
+    file_path = tmp_path / "file"
+    file_path.write_bytes(header)
+    assert FileCategorizerByHeader().categorize_file(str(file_path)) \
+        == FileCategorizerBySignature().categorize_file(str(file_path))
+
+
+def test_header_categorization_raises_if_file_cannot_be_read(tmp_path):
+    with pytest.raises(OSError):
+        FileCategorizerByHeader().categorize_file(str(tmp_path / "missing"))
+
+
+FILES_NAMES = ["file.txt", "photo.JPG", "dir.d/Makefile", ".bashrc", "..txt", "a..json", "file.", "archive.tar.gz",
+               "archive.TGZ", "archive.tar.Z", "archive.tar.GZ", "image.svgz", "data:image/png;base64,AAAA",
+               "data:,text", "C:file.txt", "http://host/page.html", "unknown.extension"]
+
+
+@pytest.mark.parametrize("file_name", FILES_NAMES)
+def test_extension_table_categorization_returns_same_categories_as_extension_categorization(file_name):
+    file_path = file_name if ":" in file_name else os.path.join(TEST_PATH, file_name)
+    assert FileCategorizerByExtensionTable().categorize_file(file_path) \
+        == FileCategorizerByExtension().categorize_file(file_path)
+
+
+@pytest.mark.parametrize("exact_case_first", [False, True])
+def test_extension_table_categorization_looks_up_extensions_as_mimetypes_does(exact_case_first):
+    extension_table = ExtensionTable.from_mime_types({".fx": "text/x-fx", ".Fx": "application/x-fx"}, {}, {})
+    with patch('fs_analyzer.model.extension_table_categorization._looks_up_exact_case_first',
+               return_value=exact_case_first):
+        categorizer = FileCategorizerByExtensionTable(extension_table)
+        assert [categorizer.categorize_file(file_path).name for file_path in ["a.fx", "a.Fx", "a.FX"]] \
+            == ["text/x-fx", "application/x-fx" if exact_case_first else "text/x-fx", "text/x-fx"]
+
+
+def test_extension_table_categorization_agrees_with_mimetypes_on_extensions_not_in_lower_case():
+    FileCategorizerByExtension._init_mimetypes()
+    with patch.dict(mimetypes.types_map, {".fx": "text/x-fx", ".Fx": "application/x-fx"}):
+        categorizer = FileCategorizerByExtensionTable(ExtensionTable.from_mimetypes())
+        for file_path in ["a.fx", "a.Fx", "a.FX"]:
+            assert categorizer.categorize_file(file_path) == FileCategorizerByExtension().categorize_file(file_path)
+
+
+def test_extension_table_interns_categories():
+    categories_by_extension = ExtensionTable.from_mimetypes().categories_by_extension
+    assert categories_by_extension[".jpg"] is categories_by_extension[".jpeg"]
+    assert FileCategorizerByExtensionTable().categorize_file("a.jpg") is FileCategorizerByExtensionTable().categorize_file("b.JPEG")
+
+
+def test_extension_table_is_cached_to_file(tmp_path):
+    cache_path = tmp_path / "extensions.json"
+    extension_table = ExtensionTable.from_cache(str(cache_path))
+    assert cache_path.exists()
+    with patch.object(ExtensionTable, 'from_mimetypes') as from_mimetypes:
+        assert ExtensionTable.from_cache(str(cache_path)) == extension_table
+    from_mimetypes.assert_not_called()
+    cache_path.write_text("not a cache")
+    assert ExtensionTable.from_cache(str(cache_path)) == extension_table
@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+import os
+import pytest
+
+from fs_analyzer.model.file_category import FileCategory
+from fs_analyzer.view.output_writers import OutputFormat, create_output_writer, read_binary_records
+
+
+COLUMNS = ("filepath", "size (B)")
+ROWS = [("dir/a.txt", 10), ("dir/tab\there,\"quoted\"\nnewline.txt", 0), ("dir/unicodƏ.py", 2**40)]
+
+
+def write(output_format, rows=ROWS, buffer_size=1 << 20):
+    stream = io.BytesIO()
+    writer = create_output_writer(output_format, stream, buffer_size)
+    writer.write_header(COLUMNS)
+    writer.write_rows(rows[:1])
+    for row in rows[1:]:
+        writer.write_row(*row)
+    writer.flush()
+    return stream.getvalue()
+
+
+def test_text_format_writes_rows_as_printed_by_the_cli():
+    assert write(OutputFormat.TEXT, ROWS[:1]).decode() == \
+        "filepath\t| size (B)\n------------------------------\ndir/a.txt\t| 10\n"
+
+
+def test_tsv_format_escapes_tabs_and_newlines():
+    lines = write(OutputFormat.TSV).decode().splitlines()
+    assert len(lines) == len(ROWS) + 1
+    assert lines[2] == "dir/tab\\there,\"quoted\"\\nnewline.txt\t0"
+
+
+def test_csv_format_round_trips():
+    assert list(csv.reader(io.StringIO(write(OutputFormat.CSV).decode()))) == \
+        [list(COLUMNS)] + [[path, str(size)] for (path, size) in ROWS]
+
+
+def test_ndjson_format_writes_an_object_per_row():
+    assert [json.loads(line) for line in write(OutputFormat.NDJSON).decode().splitlines()] == \
+        [{"filepath": path, "size_b": size} for (path, size) in ROWS]
+
+
+def test_ndjson_format_writes_categories_and_sets():
+    stream = io.BytesIO()
+    writer = create_output_writer(OutputFormat.NDJSON, stream)
+    writer.write_header(("category", "permissions"))
+    writer.write_row(FileCategory("text/plain"), {"IS_SUID_ENABLED", "IS_GROUP_WRITABLE"})
+    writer.flush()
+    assert json.loads(stream.getvalue()) == {"category": "text/plain",
+                                             "permissions": ["IS_GROUP_WRITABLE", "IS_SUID_ENABLED"]}
+
+
+def test_ndjson_format_writes_valid_utf8_for_undecodable_file_names():
+    file_path = os.fsdecode(b"dir/caf\xe9.txt")
+    [line] = write(OutputFormat.NDJSON, [(file_path, 1)]).decode("utf-8").splitlines()
+    assert os.fsencode(json.loads(line)["filepath"]) == b"dir/caf\xe9.txt"
+
+
+def test_binary_format_round_trips():
+    assert list(read_binary_records(io.BytesIO(write(OutputFormat.BINARY)))) == [COLUMNS] + ROWS
+
+
+def test_binary_reader_rejects_other_formats():
+    with pytest.raises(ValueError):
+        list(read_binary_records(io.BytesIO(write(OutputFormat.TSV))))
+
+
+@pytest.mark.parametrize("output_format", list(OutputFormat))
+def test_small_buffers_write_the_same_bytes(output_format):
+    assert write(output_format, buffer_size=1) == write(output_format)
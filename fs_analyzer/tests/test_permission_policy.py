@@ -0,0 +1,78 @@
+import json
+import os
+import pytest
+import stat
+
+from fs_analyzer.model.file_listing_generators import yield_unusual_permissions
+from fs_analyzer.model.file_permissions import UNUSUAL_PERMISSIONS, FilePermission
+from fs_analyzer.model.permission_policy import PermissionRule, PolicyPermissionsReporting
+from fs_analyzer.tests.utils import create_file
+
+
+def file_stat(mode, uid=1000, gid=1000):
+    return os.stat_result((stat.S_IFREG | mode, 0, 0, 0, uid, gid, 0, 0, 0, 0))
+
+
+def write_policy(tmp_path, file_name, contents):
+    policy_path = tmp_path / file_name
+    policy_path.write_text(contents)
+    return str(policy_path)
+
+
+def test_policy_rules_naming_known_permissions_default_to_their_checks(tmp_path):
+    policy = PolicyPermissionsReporting.from_file(write_policy(tmp_path, "policy.toml", """
+[[rules]]
+permission = "IS_SUID_ENABLED"
+
+[[rules]]
+permission = "IS_GUID_ENABLED"
+
+[[rules]]
+permission = "WITH_ANY_OWNER_PERMISSIONS"
+"""))
+    assert policy.report_unusual_permissions(file_stat(0o644)) == set()
+    assert policy.report_unusual_permissions(file_stat(0o4755)) == {UNUSUAL_PERMISSIONS["IS_SUID_ENABLED"]}
+    assert policy.report_unusual_permissions(file_stat(0o2055)) == {UNUSUAL_PERMISSIONS["IS_GUID_ENABLED"],
+                                                                    UNUSUAL_PERMISSIONS["WITH_ANY_OWNER_PERMISSIONS"]}
+
+
+def test_policy_rules_compare_masked_mode_bits_and_owner(tmp_path):
+    policy = PolicyPermissionsReporting.from_file(write_policy(tmp_path, "policy.json", json.dumps({"rules": [
+        {"permission": "ROOT_OWNED_WORLD_WRITABLE", "mode_mask": "0o002", "uid": 0},
+        {"permission": "GROUP_READ_ONLY", "mode_mask": "060", "mode_value": "040", "gid": 20}]})))
+    assert policy.report_unusual_permissions(file_stat(0o646, uid=0)) == {FilePermission("ROOT_OWNED_WORLD_WRITABLE")}
+    assert policy.report_unusual_permissions(file_stat(0o646, uid=1)) == set()
+    assert policy.report_unusual_permissions(file_stat(0o640, gid=20)) == {FilePermission("GROUP_READ_ONLY")}
+    assert policy.report_unusual_permissions(file_stat(0o660, gid=20)) == set()
+
+
+def test_policy_rules_over_paths_match_globs(tmp_path):
+    policy = PolicyPermissionsReporting([PermissionRule(FilePermission("EXECUTABLE_SCRIPT"), 0o111, 0o111,
+                                                        path_globs=("*.sh", "*/bin/*"))])
+    assert policy.report_file_unusual_permissions("/opt/run.sh", file_stat(0o755)) == {FilePermission("EXECUTABLE_SCRIPT")}
+    assert policy.report_file_unusual_permissions("/usr/bin/tool", file_stat(0o755)) == {FilePermission("EXECUTABLE_SCRIPT")}
+    assert policy.report_file_unusual_permissions("/opt/run.py", file_stat(0o755)) == set()
+    assert policy.report_unusual_permissions(file_stat(0o755)) == set()
+
+
+def test_unusual_permissions_report_applies_policy_to_paths(tmp_path):
+    script_path = create_file(str(tmp_path / "run.sh"))
+    os.chmod(script_path, 0o755)
+    os.chmod(create_file(str(tmp_path / "run.py")), 0o755)
+    policy = PolicyPermissionsReporting([PermissionRule(FilePermission("EXECUTABLE_SCRIPT"), 0o100, 0o100,
+                                                        path_globs=("*.sh",))])
+    assert list(yield_unusual_permissions(str(tmp_path), policy)) == [(script_path, {FilePermission("EXECUTABLE_SCRIPT")})]
+
+
+@pytest.mark.parametrize("file_name, contents", [
+    ("policy.yaml", "rules: []"),
+    ("policy.toml", "[rules]"),
+    ("policy.toml", "[[rules]]\nmode_mask = 1"),
+    ("policy.toml", "[[rules]]\npermission = 'X'\nmode_mask = 'rwx'"),
+    ("policy.toml", "[[rules]]\npermission = 'X'\nmode_mask = 0o100\nmode_value = 0o200"),
+    ("policy.toml", "[[rules]]\npermission = 'X'\nowner = 0"),
+    ("policy.json", "{\"rules\": "),
+])
+def test_invalid_policies_are_rejected(tmp_path, file_name, contents):
+    with pytest.raises(ValueError):
+        PolicyPermissionsReporting.from_file(write_policy(tmp_path, file_name, contents))
@@ -0,0 +1,104 @@
+import json
+import os
+import pytest
+from unittest.mock import patch
+
+from fs_analyzer.model.directory_traversal import TraversalOptions
+from fs_analyzer.model.file_categorization_strategy import FileCategorizerByExtension
+from fs_analyzer.model.file_listing_generators import yield_categories_sizes, yield_categories_sizes_snapshots
+from fs_analyzer.model.parallel_file_categorization import ParallelFileCategorizer
+from fs_analyzer.model.scan_checkpoint import ScanCheckpoint, ScanCheckpointer
+from fs_analyzer.model.file_category import FileCategory
+from fs_analyzer.tests.fixtures import DirectoryTreeScenario
+
+
+TEST_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), 'testdir_checkpoint'))
+directory_tree = DirectoryTreeScenario(TEST_PATH)
+
+
+def setup_module():
+    directory_tree.setup()
+
+
+def teardown_module():
+    directory_tree.remove()
+
+
+def interrupt_after_first_checkpoint(checkpoint_path, directory_path=TEST_PATH, traversal_options=TraversalOptions()):
+    # a checkpoint is due at every directory boundary
+    snapshots = yield_categories_sizes_snapshots(directory_path, files_interval=1, traversal_options=traversal_options,
+                                                 checkpointer=ScanCheckpointer(checkpoint_path, seconds_interval=0))
+    for _ in snapshots:
+        if os.path.exists(checkpoint_path):
+            snapshots.close()
+            return
+    pytest.fail("no checkpoint was saved.")
+
+
+def test_checkpoint_is_saved_and_loaded(tmp_path):
+    checkpointer = ScanCheckpointer(str(tmp_path / "checkpoint.json"))
+    assert checkpointer.load() is None
+    checkpoint = ScanCheckpoint(TEST_PATH, ((os.path.join(TEST_PATH, 'subdir'), 1),), {FileCategory('text/plain'): 10}, 2)
+    checkpointer.save(checkpoint)
+    assert checkpointer.load() == checkpoint
+    checkpointer.remove()
+    assert checkpointer.load() is None
+
+
+def test_resumed_scan_aggregates_the_same_sizes_of_an_uninterrupted_one(tmp_path):
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    interrupt_after_first_checkpoint(checkpoint_path)
+    checkpoint = ScanCheckpointer(checkpoint_path).load()
+    assert 0 < checkpoint.files_count < len(directory_tree.files_paths())
+    resumed_sizes = dict(yield_categories_sizes(TEST_PATH, checkpointer=ScanCheckpointer(checkpoint_path, resume=True)))
+    assert resumed_sizes == dict(yield_categories_sizes(TEST_PATH))
+    assert not os.path.exists(checkpoint_path)
+
+
+def test_resumed_scan_does_not_visit_completed_directories_again(tmp_path):
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    interrupt_after_first_checkpoint(checkpoint_path)
+    checkpoint = ScanCheckpointer(checkpoint_path).load()
+    with patch('os.scandir', wraps=os.scandir) as scandir:
+        list(yield_categories_sizes(TEST_PATH, checkpointer=ScanCheckpointer(checkpoint_path, resume=True)))
+    visited_directories = {call.args[0] for call in scandir.call_args_list}
+    assert TEST_PATH not in visited_directories
+    assert {path for (path, _) in checkpoint.pending_directories} <= visited_directories
+
+
+def test_resumed_scan_accounts_hard_links_met_before_the_checkpoint_once(tmp_path):
+    tree_path = tmp_path / "tree"
+    os.makedirs(tree_path / "subdir")
+    (tree_path / "file.txt").write_text("1234")
+    os.link(tree_path / "file.txt", tree_path / "subdir" / "link.txt")
+    (tree_path / "subdir" / "other.txt").write_text("12")
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    traversal_options = TraversalOptions(hard_links_once=True)
+    interrupt_after_first_checkpoint(checkpoint_path, str(tree_path), traversal_options)
+    assert ScanCheckpointer(checkpoint_path).load().hard_links
+    resumed_sizes = dict(yield_categories_sizes(str(tree_path), traversal_options=traversal_options,
+                                                checkpointer=ScanCheckpointer(checkpoint_path, resume=True)))
+    assert resumed_sizes == {FileCategory('text/plain'): 6}
+
+
+def test_parallel_categorization_starts_a_single_pool_for_a_checkpointed_scan(tmp_path):
+    strategy = ParallelFileCategorizer(FileCategorizerByExtension(), workers=2, use_processes=False)
+    with strategy, patch.object(strategy, '_create_executor', wraps=strategy._create_executor) as create_executor:
+        sizes = dict(yield_categories_sizes(TEST_PATH, strategy,
+                                            checkpointer=ScanCheckpointer(str(tmp_path / "checkpoint.json"), seconds_interval=0)))
+    assert sizes == dict(yield_categories_sizes(TEST_PATH))
+    assert create_executor.call_count == 1
+
+
+def test_scan_cannot_resume_from_checkpoint_of_another_directory(tmp_path):
+    checkpointer = ScanCheckpointer(str(tmp_path / "checkpoint.json"), resume=True)
+    checkpointer.save(ScanCheckpoint(str(tmp_path), (), {}, 0))
+    with pytest.raises(ValueError):
+        list(yield_categories_sizes(TEST_PATH, checkpointer=checkpointer))
+
+
+def test_invalid_checkpoint_file_is_reported(tmp_path):
+    checkpoint_path = tmp_path / "checkpoint.json"
+    checkpoint_path.write_text(json.dumps({"version": 1, "directory_path": TEST_PATH}))
+    with pytest.raises(ValueError):
+        ScanCheckpointer(str(checkpoint_path)).load()
@@ -0,0 +1,114 @@
+import os
+from unittest.mock import patch
+
+from fs_analyzer.model.directory_traversal import PathFilter, TraversalOptions, yield_file_entries
+from fs_analyzer.model.file_categorization_strategy import FileCategorizerByExtension, FileCategorizerBySignature
+from fs_analyzer.model.file_category import UNKNOWN_FILE_CATEGORY
+from fs_analyzer.model.file_listing_generators import yield_file_categories
+from fs_analyzer.model.scan_index import IndexedFileCategorizer, ScanIndex
+from fs_analyzer.tests.fixtures import DirectoryTreeScenario
+from fs_analyzer.tests.utils import create_file, get_category
+
+
+TEST_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), 'testdir_index'))
+directory_tree = DirectoryTreeScenario(TEST_PATH)
+# a time far enough in the past for directories to be safely recorded by the index
+PAST_TIME = 1_000_000_000
+
+
+def setup_module():
+    directory_tree.setup()
+
+
+def teardown_module():
+    directory_tree.remove()
+
+
+def set_directories_mtime_in_the_past():
+    for (root, _, _) in os.walk(TEST_PATH):
+        os.utime(root, (PAST_TIME, PAST_TIME))
+
+
+def indexed_categories(scan_index, strategy):
+    return dict(yield_file_categories(TEST_PATH, IndexedFileCategorizer(strategy, scan_index),
+                                      traversal_options=TraversalOptions(scan_index=scan_index)))
+
+
+def test_warm_scan_does_not_categorize_unchanged_files(tmp_path):
+    with ScanIndex(str(tmp_path / "index.db")) as scan_index:
+        cold_categories = indexed_categories(scan_index, FileCategorizerByExtension())
+        with patch.object(FileCategorizerByExtension, 'categorize_file') as categorize_file:
+            warm_categories = indexed_categories(scan_index, FileCategorizerByExtension())
+    categorize_file.assert_not_called()
+    assert cold_categories == warm_categories == {fp: get_category(fp) for fp in directory_tree.files_paths()}
+
+
+def test_warm_scan_categorizes_changed_files_again(tmp_path):
+    changed_file_path = directory_tree.files_paths()[0]
+    with ScanIndex(str(tmp_path / "index.db")) as scan_index:
+        indexed_categories(scan_index, FileCategorizerByExtension())
+        create_file(changed_file_path, contents='changed contents')
+        with patch.object(FileCategorizerByExtension, 'categorize_file', return_value=get_category(changed_file_path)) as categorize_file:
+            indexed_categories(scan_index, FileCategorizerByExtension())
+    categorize_file.assert_called_once_with(changed_file_path)
+
+
+def test_removed_directories_are_forgotten_along_with_their_subtrees(tmp_path):
+    os.utime(tmp_path, (PAST_TIME, PAST_TIME))
+    directory_stat = os.stat(tmp_path)
+    (root_path, subdirectory_path, nested_path, sibling_path) = \
+        (str(tmp_path), str(tmp_path / "sub"), str(tmp_path / "sub" / "nested"), str(tmp_path / "sub2"))
+    with ScanIndex(str(tmp_path / "index.db")) as scan_index:
+        scan_index.record_directory_listing(root_path, directory_stat, [], ["sub", "sub2"])
+        scan_index.record_directory_listing(subdirectory_path, directory_stat, ["file"], ["nested"])
+        scan_index.record_directory_listing(nested_path, directory_stat, ["file"], [])
+        scan_index.record_directory_listing(sibling_path, directory_stat, ["file"], [])
+        scan_index.record_directory_listing(root_path, directory_stat, [], ["sub2"])
+        assert scan_index.directory_listing(nested_path, directory_stat) is None
+        assert scan_index.directory_listing(sibling_path, directory_stat) == (["file"], [])
+        # the directory is listed again as empty, since its former files were forgotten
+        scan_index.record_directory_listing(nested_path, directory_stat, [], [])
+        assert scan_index.directory_listing(nested_path, directory_stat) == ([], [])
+
+
+def test_categories_of_another_strategy_are_not_reused(tmp_path):
+    with ScanIndex(str(tmp_path / "index.db")) as scan_index:
+        indexed_categories(scan_index, FileCategorizerByExtension())
+        with patch.object(FileCategorizerBySignature, 'categorize_file', return_value=UNKNOWN_FILE_CATEGORY) as categorize_file:
+            indexed_categories(scan_index, FileCategorizerBySignature())
+    assert categorize_file.call_count == len(directory_tree.files_paths())
+
+
+def test_warm_scan_does_not_list_unchanged_directories(tmp_path):
+    set_directories_mtime_in_the_past()
+    with ScanIndex(str(tmp_path / "index.db")) as scan_index:
+        traversal_options = TraversalOptions(scan_index=scan_index)
+        cold_paths = sorted(entry.path for entry in yield_file_entries(TEST_PATH, traversal_options=traversal_options))
+        with patch('os.scandir', wraps=os.scandir) as scandir:
+            warm_paths = sorted(entry.path for entry in yield_file_entries(TEST_PATH, traversal_options=traversal_options))
+    scandir.assert_not_called()
+    assert cold_paths == warm_paths == sorted(directory_tree.files_paths())
+
+
+def test_warm_scan_lists_changed_directories_again(tmp_path):
+    set_directories_mtime_in_the_past()
+    new_file_path = os.path.join(TEST_PATH, 'subdir', 'new.txt')
+    with ScanIndex(str(tmp_path / "index.db")) as scan_index:
+        traversal_options = TraversalOptions(scan_index=scan_index)
+        list(yield_file_entries(TEST_PATH, traversal_options=traversal_options))
+        create_file(new_file_path)
+        try:
+            warm_paths = {entry.path for entry in yield_file_entries(TEST_PATH, traversal_options=traversal_options)}
+        finally:
+            os.remove(new_file_path)
+    assert warm_paths == set(directory_tree.files_paths()) | {new_file_path}
+
+
+def test_filtered_scan_records_unfiltered_listings(tmp_path):
+    set_directories_mtime_in_the_past()
+    with ScanIndex(str(tmp_path / "index.db")) as scan_index:
+        filtered_paths = {entry.path for entry in yield_file_entries(
+            TEST_PATH, traversal_options=TraversalOptions(scan_index=scan_index, path_filter=PathFilter(['*.py'])))}
+        warm_paths = {entry.path for entry in yield_file_entries(TEST_PATH, traversal_options=TraversalOptions(scan_index=scan_index))}
+    assert filtered_paths == {fp for fp in directory_tree.files_paths() if not fp.endswith('.py')}
+    assert warm_paths == set(directory_tree.files_paths())
@@ -0,0 +1,85 @@
+import os
+import pytest
+
+from fs_analyzer.model.file_category import FileCategory
+from fs_analyzer.model.scan_snapshot import (Change, ScanSnapshotReader, ScanSnapshotWriter, SnapshotDifference, SnapshotEntry,
+                                             snapshot_path_key, write_snapshot, yield_snapshots_differences)
+from fs_analyzer.tests.fixtures import DirectoryTreeScenario
+from fs_analyzer.tests.utils import create_file, get_category, get_size
+
+
+TEST_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), 'testdir_snapshot'))
+directory_tree = DirectoryTreeScenario(TEST_PATH)
+
+
+def setup_module():
+    directory_tree.setup()
+
+
+def teardown_module():
+    directory_tree.remove()
+
+
+def read_snapshot(snapshot_path):
+    with ScanSnapshotReader(snapshot_path) as snapshot:
+        return list(snapshot)
+
+
+def entry(path, size, category=FileCategory("text/plain")):
+    return SnapshotEntry(path, size, 0o100644, 0, category)
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 1000])
+def test_snapshot_lists_all_the_files_sorted_by_path(tmp_path, block_size):
+    snapshot_path = str(tmp_path / "tree.snapshot")
+    assert write_snapshot(TEST_PATH, snapshot_path, block_size=block_size) == len(directory_tree.files_paths())
+    entries = read_snapshot(snapshot_path)
+    assert [snapshot_path_key(e.path) for e in entries] == sorted(snapshot_path_key(e.path) for e in entries)
+    assert {(os.path.join(TEST_PATH, e.path), e.size, e.category) for e in entries} == \
+        {(path, get_size(path), get_category(path)) for path in directory_tree.files_paths()}
+    assert all(e.mtime_ns == os.stat(os.path.join(TEST_PATH, e.path)).st_mtime_ns for e in entries)
+
+
+def test_files_of_a_directory_come_right_after_it(tmp_path):
+    for path in ["a-b.txt", "a.txt", os.path.join("a", "b", "c.txt"), os.path.join("a", "d.txt")]:
+        os.makedirs(os.path.dirname(tmp_path / "tree" / path), exist_ok=True)
+        create_file(tmp_path / "tree" / path)
+    write_snapshot(str(tmp_path / "tree"), str(tmp_path / "tree.snapshot"))
+    assert [e.path for e in read_snapshot(str(tmp_path / "tree.snapshot"))] == \
+        [os.path.join("a", "b", "c.txt"), os.path.join("a", "d.txt"), "a-b.txt", "a.txt"]
+
+
+def test_interrupted_snapshot_leaves_the_previous_one(tmp_path):
+    snapshot_path = str(tmp_path / "tree.snapshot")
+    write_snapshot(TEST_PATH, snapshot_path)
+    with pytest.raises(KeyboardInterrupt):
+        with ScanSnapshotWriter(snapshot_path, TEST_PATH) as snapshot_writer:
+            snapshot_writer.append("file.txt", os.stat(directory_tree.files_paths()[0]), FileCategory("text/plain"))
+            raise KeyboardInterrupt()
+    assert len(read_snapshot(snapshot_path)) == len(directory_tree.files_paths())
+    assert os.listdir(tmp_path) == ["tree.snapshot"]
+
+
+def test_truncated_snapshot_is_reported(tmp_path):
+    snapshot_path = tmp_path / "tree.snapshot"
+    write_snapshot(TEST_PATH, str(snapshot_path))
+    snapshot_path.write_bytes(snapshot_path.read_bytes()[:-10])
+    with pytest.raises(ValueError):
+        read_snapshot(str(snapshot_path))
+
+
+def test_differences_between_snapshots_are_merge_joined():
+    old_entries = [entry("a", 10), entry(os.path.join("b", "c"), 5), entry("d", 7), entry("e", 1)]
+    new_entries = [entry("a", 10, FileCategory("image/png")), entry(os.path.join("b", "c"), 8), entry("d", 3), entry("f", 2)]
+    sizes_by_categories = {}
+    assert list(yield_snapshots_differences(old_entries, new_entries, sizes_by_categories)) == \
+        [SnapshotDifference(Change.GROWN, os.path.join("b", "c"), 5, 8),
+         SnapshotDifference(Change.SHRUNK, "d", 7, 3),
+         SnapshotDifference(Change.REMOVED, "e", 1, 0),
+         SnapshotDifference(Change.ADDED, "f", 0, 2)]
+    assert sizes_by_categories == {FileCategory("text/plain"): [23, 13], FileCategory("image/png"): [0, 10]}
+
+
+def test_unsorted_snapshots_cannot_be_compared():
+    with pytest.raises(ValueError):
+        list(yield_snapshots_differences([entry("b", 1), entry("a", 1)], []))
@@ -0,0 +1,82 @@
+import os
+import pytest
+from unittest.mock import Mock
+
+np = pytest.importorskip("numpy")
+
+from fs_analyzer.model.file_categorization_strategy import FileCategorizerByExtension
+from fs_analyzer.model.file_listing_generators import yield_categories_sizes, yield_files_larger_than
+from fs_analyzer.model.scan_table import ScanTable
+from fs_analyzer.tests.fixtures import DirectoryTreeScenario
+from fs_analyzer.tests.utils import get_category, get_size
+from fs_analyzer.view_model.directory_analizer import DirectoryAnalizer
+
+TEST_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), 'testdir'))
+directory_tree = DirectoryTreeScenario(TEST_PATH)
+
+
+def setup_module():
+    directory_tree.setup()
+
+
+def teardown_module():
+    directory_tree.remove()
+
+
+def test_scan_table_records_all_files():
+    scan_table = ScanTable.from_directory(directory_tree.root_path())
+    assert len(scan_table) == len(directory_tree.files_paths())
+    assert {file_path: (int(size), scan_table.category_table[code]) 
+            for (file_path, size, code) in zip(scan_table.paths, scan_table.sizes, scan_table.category_codes)} \
+        == {fp: (get_size(fp), get_category(fp)) for fp in directory_tree.files_paths()}
+
+
+def test_scan_table_counts_files_above_many_thresholds_like_walking_for_each():
+    scan_table = ScanTable.from_directory(directory_tree.root_path())
+    thresholds = [0, 1, 2, 4, 1000]
+    assert scan_table.count_larger_than(thresholds) == \
+        [len(list(yield_files_larger_than(directory_tree.root_path(), threshold))) for threshold in thresholds]
+    assert sorted(scan_table.files_larger_than(2)) == sorted(yield_files_larger_than(directory_tree.root_path(), 2))
+
+
+def test_scan_table_histograms_account_all_sizes_of_each_category():
+    scan_table = ScanTable.from_directory(directory_tree.root_path())
+    bin_edges, counts_by_categories = scan_table.sizes_histograms([0, 2, 1024])
+    assert bin_edges == [0, 2, 1024]
+    files_by_categories = {}
+    for fp in directory_tree.files_paths():
+        files_by_categories.setdefault(get_category(fp), []).append(get_size(fp))
+    assert {category: sum(counts) for (category, counts) in counts_by_categories.items()} == \
+        {category: len(sizes) for (category, sizes) in files_by_categories.items()}
+    assert {category: counts[0] for (category, counts) in counts_by_categories.items()} == \
+        {category: sum(size < 2 for size in sizes) for (category, sizes) in files_by_categories.items()}
+
+
+def test_scan_table_percentiles_are_sizes_of_each_category():
+    scan_table = ScanTable.from_directory(directory_tree.root_path())
+    sizes_by_categories = dict(yield_categories_sizes(directory_tree.root_path()))
+    for (category, (smallest, largest)) in scan_table.sizes_percentiles([0, 100]).items():
+        assert 0 <= smallest <= largest <= sizes_by_categories[category]
+
+
+def test_scan_table_filters_by_permission_bits():
+    file_path = directory_tree.files_paths()[0]
+    os.chmod(file_path, 0o646)
+    try:
+        scan_table = ScanTable.from_directory(directory_tree.root_path())
+        world_writable = scan_table.with_permission_bits(0o002)
+    finally:
+        os.chmod(file_path, 0o644)
+    assert world_writable.paths == [file_path]
+    assert world_writable.category_table is scan_table.category_table
+
+
+def test_analyzer_notifies_sizes_statistics():
+    mock = Mock()
+    DirectoryAnalizer(directory_tree.root_path(), FileCategorizerByExtension(), Mock(), mock)\
+        .analize_sizes_statistics([0, 1000], [50], histograms=True)
+    assert [call.args for call in mock.on_new_large_files_count.call_args_list] == \
+        [(0, len(list(yield_files_larger_than(directory_tree.root_path(), 0)))), (1000, 0)]
+    assert mock.on_new_category_sizes_percentiles.call_count == \
+        mock.on_new_category_sizes_histogram.call_count == \
+        len({get_category(fp) for fp in directory_tree.files_paths()})
@@ -2,8 +2,9 @@ import os
 from typing import Callable
 from pytest import fail
 
+from fs_analyzer.model.file_categorization_strategy import FileCategorizationStrategy
 from fs_analyzer.model.file_category import UNKNOWN_FILE_CATEGORY, FileCategory
-from fs_analyzer.model.file_permission_reporting_strategy import LooserPermissionsReporting
+from fs_analyzer.model.file_permission_reporting_strategy import FilePermissionsReportingStrategy, LooserPermissionsReporting
 
 
 def get_size(filepath):
@@ -26,6 +27,22 @@ def get_unusual_permissions(filepath):
     return permission_strategy.report_unusual_permissions(os.stat(filepath))
 
 
+class FailingFileCategorizer(FileCategorizationStrategy):
+    def __init__(self, error: Exception):
+        self._error = error
+
+    def categorize_file(self, file_path: str) -> FileCategory:
+        raise self._error
+
+
+class FailingPermissionsReporting(FilePermissionsReportingStrategy):
+    def __init__(self, error: Exception):
+        self._error = error
+
+    def report_unusual_permissions(self, stat: os.stat_result):
+        raise self._error
+
+
 def create_file(path, contents='1234'):
     with open(path, 'w') as f:
         f.write(contents)
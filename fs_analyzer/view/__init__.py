@@ -8,6 +8,8 @@ In particular,
 Modules:
 * cli_view.py: containing the implementation of a basic command line UI accessing the features
     of the fs_analyzer app.
+* output_writers.py: containing the buffered writers of the outcomes of the commands of the CLI,
+    in human-readable and machine-readable (TSV, CSV, NDJSON and binary) formats.
 * view.py: containing the definition of the class representing the abstraction of view for the 
     fs_analyzer app, which is general enough to accomodate for any other UI, both command line
     or graphical ones, possibly to be implemented in the future. 
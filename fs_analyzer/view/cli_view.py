@@ -1,10 +1,67 @@
 import typer
-from typing import Set
+from contextlib import contextmanager, nullcontext
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Set
+import sys
 
 from fs_analyzer.model import file_permissions, file_category
-from fs_analyzer.view_model.directory_analizer_factory import ExtensionDirectoryAnalizerFactory, LoosePermAnalyzerFactory
+from fs_analyzer.model.directory_traversal import PathFilter, TraversalOptions
+from fs_analyzer.model.file_categorization_strategy import DEFAULT_UNTRUSTED_EXTENSIONS
+from fs_analyzer.model.files_batch import FilesBatch
+from fs_analyzer.model.scan_checkpoint import ScanCheckpointer
+from fs_analyzer.view_model.directory_analizer import Analysis
+from fs_analyzer.view_model.directory_analizer_factory import *
+from fs_analyzer.view.output_writers import OutputFormat, OutputWriter, create_output_writer
 from fs_analyzer.view.view import View
 
+if TYPE_CHECKING:
+    # imported by the commands needing them only, since their dependencies (e.g., sqlite3
+    # and zlib) slow down the start of the CLI
+    from fs_analyzer.model.scan_snapshot import Change
+
+
+class Categorizer(str, Enum):
+    """Enumerates the ways files can be classified by the commands of the CLI."""
+    EXTENSION = "extension"
+    SIGNATURE = "signature"
+    HYBRID = "hybrid"
+
+
+class CategorizationPool(str, Enum):
+    """Enumerates the kinds of pools files can be classified in parallel by."""
+    PROCESS = "process"
+    THREAD = "thread"
+
+
+# the options shared by all the commands
+_WORKERS_OPTION = typer.Option(1, "--workers", min=1, help="The number of threads walking the directory tree.")
+_INDEX_OPTION = typer.Option(None, "--index", 
+                             help="The file of an index of past scans, to skip unchanged directories and files (created if missing).")
+_EXCLUDE_OPTION = typer.Option(None, "--exclude", 
+                               help="A glob pattern (e.g., node_modules or *.tmp) of the files and directories to skip, without descending into them (repeatable).")
+_INCLUDE_OPTION = typer.Option(None, "--include", 
+                               help="A glob pattern (e.g., *.py) of the files to analyze, the others being skipped (repeatable).")
+_EXCLUDE_FROM_OPTION = typer.Option(None, "--exclude-from", 
+                                    help="A file listing the patterns of the files and directories to skip, one per line.")
+_ONE_FILE_SYSTEM_OPTION = typer.Option(False, "--one-file-system", 
+                                       help="Do not descend into the directories on other file systems (e.g., mount points like /proc).")
+_HARD_LINKS_ONCE_OPTION = typer.Option(False, "--hard-links-once", 
+                                       help="Analyze the files with many hard links only once (through the first path met).")
+_FORMAT_OPTION = typer.Option(OutputFormat.TEXT, "--format", 
+                              help="The format of the outcomes (the machine-readable ones write errors and progress to the standard error).")
+_OUTPUT_OPTION = typer.Option(None, "--output", 
+                              help="The file to write the outcomes to, instead of the standard output.")
+# the options shared by the commands classifying files
+_CATEGORIZER_OPTION = typer.Option(Categorizer.EXTENSION, "--categorizer", 
+                                   help="How files are classified (hybrid reads only the files whose extension is missing, unknown or untrusted).")
+_UNTRUSTED_EXTENSION_OPTION = typer.Option(None, "--untrusted-extension", 
+                                           help="An extension (e.g., .bin) of the files to classify by signature with the hybrid categorizer (repeatable). "
+                                           "Defaults to " + ", ".join(sorted(DEFAULT_UNTRUSTED_EXTENSIONS)) + ".")
+_CATEGORIZATION_WORKERS_OPTION = typer.Option(1, "--categorization-workers", min=1, 
+                                              help="The number of workers classifying files in parallel.")
+_CATEGORIZATION_POOL_OPTION = typer.Option(CategorizationPool.PROCESS, "--categorization-pool", 
+                                           help="The kind of pool classifying files in parallel (threads suit network mounts).")
+
 
 class CliView(View):
     """Represents a command line interface (CLI) application for accessing the file-system 
@@ -12,6 +69,10 @@ class CliView(View):
     """
 
     def __init__(self):
+        # whether rows start with the analysis they are the outcome of, if many are performed at once (see report)
+        self._analysis_column = False
+        # the writer of the outcomes of the command being run
+        self._writer: OutputWriter = None
         self.app = typer.Typer()
         self.app.command(name = "categorize", 
                          help="Classify files into mime/types (e.g., image/jpeg).")(self.categorize_files)
@@ -21,6 +82,18 @@ class CliView(View):
                          help="Display the total size per category of files.")(self.analize_category_sizes)
         self.app.command(name = "bigfiles", 
                          help="List the files above SIZE.")(self.identify_large_files)
+        self.app.command(name = "dirsizes", 
+                         help="Display the cumulative size and number of files per directory.")(self.analize_directories_sizes)
+        self.app.command(name = "sizestats", 
+                         help="Display statistics on the sizes of files, from a single scan (requires NumPy).")(self.analize_sizes_statistics)
+        self.app.command(name = "report", 
+                         help="Perform many analyses in a single traversal.")(self.report)
+        self.app.command(name = "snapshot", 
+                         help="Save a compressed snapshot of the files (paths, sizes, modes, mtimes and categories) to SNAPSHOT_PATH.")(self.save_snapshot)
+        self.app.command(name = "diff", 
+                         help="List the files added, removed, grown or shrunk between two snapshots, and the size deltas per category.")(self.diff_snapshots)
+        self.app.command(name = "watch", 
+                         help="Perform many analyses, and then keep them up to date by watching the directory tree (requires Linux).")(self.watch)
 
         
     def show(self):
@@ -28,82 +101,626 @@ class CliView(View):
         self.app()
 
            
-    def categorize_files(self, directory_path: str):
+    def categorize_files(self, directory_path: str, 
+                         workers: int = _WORKERS_OPTION,
+                         index: Optional[str] = _INDEX_OPTION,
+                         excludes: Optional[List[str]] = _EXCLUDE_OPTION,
+                         includes: Optional[List[str]] = _INCLUDE_OPTION,
+                         exclude_from: Optional[str] = _EXCLUDE_FROM_OPTION,
+                         one_file_system: bool = _ONE_FILE_SYSTEM_OPTION,
+                         hard_links_once: bool = _HARD_LINKS_ONCE_OPTION,
+                         output_format: OutputFormat = _FORMAT_OPTION,
+                         output: Optional[str] = _OUTPUT_OPTION,
+                         categorizer: Categorizer = _CATEGORIZER_OPTION,
+                         untrusted_extensions: Optional[List[str]] = _UNTRUSTED_EXTENSION_OPTION,
+                         categorization_workers: int = _CATEGORIZATION_WORKERS_OPTION,
+                         categorization_pool: CategorizationPool = _CATEGORIZATION_POOL_OPTION,
+                         batch_size: Optional[int] = typer.Option(None, "--batch-size", min=1, 
+                                                                  help="Collect files in columnar batches of this size, printing each batch at once.")):
         """Triggers the classification of the files contained in directory_path provided.
         
         Args:
             directory_path (str): the path where the directory root of the tree to be analyzed
                 resides.
+            workers (int): the number of threads walking the directory tree.
+            index (str, optional): the file of the index of past scans.
+            excludes (List[str], optional): the patterns of the files and directories to skip.
+            includes (List[str], optional): the patterns of the files to analyze.
+            exclude_from (str, optional): the file listing the patterns to skip.
+            one_file_system (bool): whether to stay on the file system of directory_path.
+            hard_links_once (bool): whether to analyze the files with many hard links only once.
+            output_format (OutputFormat): the format the outcomes are written in.
+            output (str, optional): the file the outcomes are written to.
+            categorizer (Categorizer): how files are classified.
+            untrusted_extensions (List[str], optional): the extensions of the files to classify by
+                signature with the hybrid categorizer.
+            categorization_workers (int): the number of workers classifying files in parallel.
+            categorization_pool (CategorizationPool): the kind of pool classifying files in parallel.
+            batch_size (int, optional): the max number of files of a batch, if files are to be
+                collected in batches.
         """
-        print("filepath\t| category")
-        print("------------------------------")
-        ExtensionDirectoryAnalizerFactory().create(directory_path, self).categorize_files()
+        path_filter = self._path_filter(excludes, includes, exclude_from)
+        with self._open_output(output_format, output, ("filepath", "category")), self._open_scan_index(index) as scan_index:
+            self._categorizing_analizer_factory(categorizer, untrusted_extensions, categorization_workers, categorization_pool)\
+                .create(directory_path, self, TraversalOptions(workers=workers, scan_index=scan_index, path_filter=path_filter,
+                                                               one_file_system=one_file_system, hard_links_once=hard_links_once)).categorize_files(batch_size)
 
         
-    def report_permissions(self, directory_path: str):
+    def report_permissions(self, directory_path: str, 
+                           policy: Optional[str] = typer.Option(None, "--policy", 
+                                                                help="A TOML or JSON file with the rules of the unusual permissions (over mode bits, owner and path)."),
+                           workers: int = _WORKERS_OPTION,
+                           index: Optional[str] = _INDEX_OPTION,
+                           excludes: Optional[List[str]] = _EXCLUDE_OPTION,
+                           includes: Optional[List[str]] = _INCLUDE_OPTION,
+                           exclude_from: Optional[str] = _EXCLUDE_FROM_OPTION,
+                           one_file_system: bool = _ONE_FILE_SYSTEM_OPTION,
+                           hard_links_once: bool = _HARD_LINKS_ONCE_OPTION,
+                           output_format: OutputFormat = _FORMAT_OPTION,
+                           output: Optional[str] = _OUTPUT_OPTION):
         """ Triggers the permissions settings report generation for the files contained in `directory_path`.
         
         Args:
             directory_path (str): the path where the directory root of the tree to be analyzed
                 resides.
+            policy (str, optional): the file of the policy of the unusual permissions.
+            workers (int): the number of threads walking the directory tree.
+            index (str, optional): the file of the index of past scans.
+            excludes (List[str], optional): the patterns of the files and directories to skip.
+            includes (List[str], optional): the patterns of the files to analyze.
+            exclude_from (str, optional): the file listing the patterns to skip.
+            one_file_system (bool): whether to stay on the file system of directory_path.
+            hard_links_once (bool): whether to analyze the files with many hard links only once.
+            output_format (OutputFormat): the format the outcomes are written in.
+            output (str, optional): the file the outcomes are written to.
         """
-        
-        print("filepath\t| permissions")
-        print("------------------------------")
-        LoosePermAnalyzerFactory().create(directory_path, self).report_permissions()
+        factory = LoosePermAnalyzerFactory()
+        if policy is not None:
+            from fs_analyzer.model.permission_policy import PolicyPermissionsReporting
+            try:
+                factory = PolicyPermAnalyzerFactory(factory, PolicyPermissionsReporting.from_file(policy))
+            except (OSError, ValueError) as e:
+                self.on_invalid_input("invalid policy: " + str(e))
+        path_filter = self._path_filter(excludes, includes, exclude_from)
+        with self._open_output(output_format, output, ("filepath", "permissions")), self._open_scan_index(index) as scan_index:
+            factory.create(directory_path, self, TraversalOptions(workers=workers, scan_index=scan_index, path_filter=path_filter,
+                                                                  one_file_system=one_file_system, hard_links_once=hard_links_once)).report_permissions()
 
         
-    def analize_category_sizes(self, directory_path:str):
+    def analize_category_sizes(self, directory_path:str, 
+                               progress_files: Optional[int] = typer.Option(None, "--progress-files", min=1,
+                                                                            help="Also display the sizes aggregated so far every N files."),
+                               progress_seconds: Optional[float] = typer.Option(None, "--progress-seconds", min=0.001,
+                                                                                help="Also display the sizes aggregated so far every T seconds."),
+                               allocated: bool = typer.Option(False, "--allocated", 
+                                                              help="Also display the bytes allocated on disk (lower for sparse files), from the same stat."),
+                               checkpoint: Optional[str] = typer.Option(None, "--checkpoint", 
+                                                                        help="A file to periodically save the progress of the scan to, so that it can be resumed (with --resume)."),
+                               checkpoint_seconds: float = typer.Option(60.0, "--checkpoint-seconds", min=0.001, 
+                                                                        help="The number of seconds between two checkpoints."),
+                               resume: bool = typer.Option(False, "--resume", 
+                                                           help="Resume the scan from the last checkpoint saved to the --checkpoint file, if any."),
+                               workers: int = _WORKERS_OPTION,
+                               index: Optional[str] = _INDEX_OPTION,
+                               excludes: Optional[List[str]] = _EXCLUDE_OPTION,
+                               includes: Optional[List[str]] = _INCLUDE_OPTION,
+                               exclude_from: Optional[str] = _EXCLUDE_FROM_OPTION,
+                               one_file_system: bool = _ONE_FILE_SYSTEM_OPTION,
+                               hard_links_once: bool = _HARD_LINKS_ONCE_OPTION,
+                               output_format: OutputFormat = _FORMAT_OPTION,
+                               output: Optional[str] = _OUTPUT_OPTION,
+                               categorizer: Categorizer = _CATEGORIZER_OPTION,
+                               untrusted_extensions: Optional[List[str]] = _UNTRUSTED_EXTENSION_OPTION,
+                               categorization_workers: int = _CATEGORIZATION_WORKERS_OPTION,
+                               categorization_pool: CategorizationPool = _CATEGORIZATION_POOL_OPTION):
         """ Triggers the analysis of the category sizes.
         
         Args:
             directory_path (str): the path where the directory root of the tree to be analyzed
                 resides.
+            progress_files (int, optional): the number of files after which the partial sizes are displayed.
+            progress_seconds (float, optional): the number of seconds after which the partial sizes are displayed.
+            allocated (bool): whether to display the bytes allocated on disk too.
+            checkpoint (str, optional): the file the progress of the scan is saved to.
+            checkpoint_seconds (float): the number of seconds between two checkpoints.
+            resume (bool): whether to resume the scan from the last checkpoint.
+            workers (int): the number of threads walking the directory tree.
+            index (str, optional): the file of the index of past scans.
+            excludes (List[str], optional): the patterns of the files and directories to skip.
+            includes (List[str], optional): the patterns of the files to analyze.
+            exclude_from (str, optional): the file listing the patterns to skip.
+            one_file_system (bool): whether to stay on the file system of directory_path.
+            hard_links_once (bool): whether to analyze the files with many hard links only once.
+            output_format (OutputFormat): the format the outcomes are written in.
+            output (str, optional): the file the outcomes are written to.
+            categorizer (Categorizer): how files are classified.
+            untrusted_extensions (List[str], optional): the extensions of the files to classify by
+                signature with the hybrid categorizer.
+            categorization_workers (int): the number of workers classifying files in parallel.
+            categorization_pool (CategorizationPool): the kind of pool classifying files in parallel.
         """
-        print("category\t| size (B)")
-        print("------------------------------")
-        ExtensionDirectoryAnalizerFactory().create(directory_path, self).analize_category_sizes()
+        if allocated and (progress_files is not None or progress_seconds is not None):
+            self.on_invalid_input("the sizes aggregated so far cannot be displayed along with the allocated ones.")
+        checkpointer = self._checkpointer(checkpoint, checkpoint_seconds, resume)
+        if allocated and checkpointer is not None:
+            self.on_invalid_input("the scans of the allocated sizes cannot be resumed.")
+        path_filter = self._path_filter(excludes, includes, exclude_from)
+        with self._open_output(output_format, output, ("category", "size (B)") + (("allocated (B)",) if allocated else ())), self._open_scan_index(index) as scan_index:
+            analizer = self._categorizing_analizer_factory(categorizer, untrusted_extensions, categorization_workers, categorization_pool)\
+                .create(directory_path, self, TraversalOptions(workers=workers, scan_index=scan_index, path_filter=path_filter,
+                                                               one_file_system=one_file_system, hard_links_once=hard_links_once))
+            if allocated:
+                analizer.analize_category_disk_usages()
+            else:
+                analizer.analize_category_sizes(progress_files, progress_seconds, checkpointer)
 
-    def identify_large_files(self, directory_path:str, size:int):
+    def identify_large_files(self, directory_path:str, size:int, 
+                             top: Optional[int] = typer.Option(None, "--top", min=1, 
+                                                               help="List only the K largest files above SIZE, from the largest one."),
+                             stream_leaders: bool = typer.Option(False, "--stream-leaders", 
+                                                                 help="With --top, also show the largest files found so far while walking."),
+                             allocated: bool = typer.Option(False, "--allocated", 
+                                                            help="Compare SIZE with the bytes allocated on disk (lower for sparse files), and display both sizes."),
+                             workers: int = _WORKERS_OPTION,
+                             index: Optional[str] = _INDEX_OPTION,
+                             excludes: Optional[List[str]] = _EXCLUDE_OPTION,
+                             includes: Optional[List[str]] = _INCLUDE_OPTION,
+                             exclude_from: Optional[str] = _EXCLUDE_FROM_OPTION,
+                             one_file_system: bool = _ONE_FILE_SYSTEM_OPTION,
+                             hard_links_once: bool = _HARD_LINKS_ONCE_OPTION,
+                             output_format: OutputFormat = _FORMAT_OPTION,
+                             output: Optional[str] = _OUTPUT_OPTION):
         """ Triggers the identification of the files larger than size.
         
         Args:
             directory_path (str): the path where the directory root of the tree to be analyzed
                 resides.
+            top (int, optional): the number of largest files to identify, if only those are wanted.
+            stream_leaders (bool): whether to show the largest files found so far while walking.
+            allocated (bool): whether to identify files by the bytes allocated on disk.
+            workers (int): the number of threads walking the directory tree.
+            index (str, optional): the file of the index of past scans.
+            excludes (List[str], optional): the patterns of the files and directories to skip.
+            includes (List[str], optional): the patterns of the files to analyze.
+            exclude_from (str, optional): the file listing the patterns to skip.
+            one_file_system (bool): whether to stay on the file system of directory_path.
+            hard_links_once (bool): whether to analyze the files with many hard links only once.
+            output_format (OutputFormat): the format the outcomes are written in.
+            output (str, optional): the file the outcomes are written to.
+        """
+        if allocated and top is not None:
+            self.on_invalid_input("the largest files cannot be identified by the allocated size.")
+        path_filter = self._path_filter(excludes, includes, exclude_from)
+        with self._open_output(output_format, output, ("filepath", "size (B)") + (("allocated (B)",) if allocated else ())), self._open_scan_index(index) as scan_index:
+            analizer = ExtensionDirectoryAnalizerFactory().create(directory_path, self, TraversalOptions(workers=workers, scan_index=scan_index, path_filter=path_filter,
+                                                                                                         one_file_system=one_file_system, hard_links_once=hard_links_once))
+            if allocated:
+                analizer.identify_large_files_disk_usages(size)
+            elif top is None:
+                analizer.identify_large_files(size)
+            elif size < 0:
+                self.on_invalid_input("the provided size must be >=0.")
+            else:
+                analizer.identify_largest_files(top, size, stream_leaders)
+
+    def analize_directories_sizes(self, directory_path:str,
+                                  max_depth: Optional[int] = typer.Option(None, "--max-depth", min=0, 
+                                                                          help="Display only the directories up to this depth (the root has depth 0)."),
+                                  top: Optional[int] = typer.Option(None, "--top", min=1, 
+                                                                    help="Display only the N largest directories, from the largest one."),
+                                  index: Optional[str] = _INDEX_OPTION,
+                                  excludes: Optional[List[str]] = _EXCLUDE_OPTION,
+                                  includes: Optional[List[str]] = _INCLUDE_OPTION,
+                                  exclude_from: Optional[str] = _EXCLUDE_FROM_OPTION,
+                                  one_file_system: bool = _ONE_FILE_SYSTEM_OPTION,
+                                  hard_links_once: bool = _HARD_LINKS_ONCE_OPTION,
+                                  output_format: OutputFormat = _FORMAT_OPTION,
+                                  output: Optional[str] = _OUTPUT_OPTION):
+        """ Triggers the analysis of the directories sizes.
+        
+        Args:
+            directory_path (str): the path where the directory root of the tree to be analyzed
+                resides.
+            max_depth (int, optional): the max depth of the displayed directories.
+            top (int, optional): the number of largest directories to display, if only those are wanted.
+            index (str, optional): the file of the index of past scans.
+            excludes (List[str], optional): the patterns of the files and directories to skip.
+            includes (List[str], optional): the patterns of the files to analyze.
+            exclude_from (str, optional): the file listing the patterns to skip.
+            one_file_system (bool): whether to stay on the file system of directory_path.
+            hard_links_once (bool): whether to analyze the files with many hard links only once.
+            output_format (OutputFormat): the format the outcomes are written in.
+            output (str, optional): the file the outcomes are written to.
+        """
+        path_filter = self._path_filter(excludes, includes, exclude_from)
+        with self._open_output(output_format, output, ("directory", "size (B)", "files")), self._open_scan_index(index) as scan_index:
+            ExtensionDirectoryAnalizerFactory().create(directory_path, self, TraversalOptions(scan_index=scan_index, path_filter=path_filter,
+                                                                                              one_file_system=one_file_system, hard_links_once=hard_links_once))\
+                .analize_directories_sizes(max_depth, top)
+
+    def analize_sizes_statistics(self, directory_path:str,
+                                 thresholds: Optional[List[int]] = typer.Option(None, "--threshold", 
+                                                                                help="Count the files above this size (repeatable)."),
+                                 percentiles: Optional[List[float]] = typer.Option(None, "--percentile", 
+                                                                                   help="Display this percentile of the sizes of each category (repeatable)."),
+                                 histogram: bool = typer.Option(False, "--histogram", 
+                                                                help="Display the histogram of the sizes of each category (power-of-2 bins)."),
+                                 perm_bits: Optional[str] = typer.Option(None, "--perm-bits", 
+                                                                         help="Analyze only the files with all these octal permission bits set (e.g., 002)."),
+                                 workers: int = _WORKERS_OPTION,
+                                 index: Optional[str] = _INDEX_OPTION,
+                                 excludes: Optional[List[str]] = _EXCLUDE_OPTION,
+                                 includes: Optional[List[str]] = _INCLUDE_OPTION,
+                                 exclude_from: Optional[str] = _EXCLUDE_FROM_OPTION,
+                                 one_file_system: bool = _ONE_FILE_SYSTEM_OPTION,
+                                 hard_links_once: bool = _HARD_LINKS_ONCE_OPTION,
+                                 output_format: OutputFormat = _FORMAT_OPTION,
+                                 output: Optional[str] = _OUTPUT_OPTION,
+                                 categorizer: Categorizer = _CATEGORIZER_OPTION,
+                                 untrusted_extensions: Optional[List[str]] = _UNTRUSTED_EXTENSION_OPTION,
+                                 categorization_workers: int = _CATEGORIZATION_WORKERS_OPTION,
+                                 categorization_pool: CategorizationPool = _CATEGORIZATION_POOL_OPTION):
+        """ Triggers the analysis of the statistics of the sizes of files.
+        
+        Args:
+            directory_path (str): the path where the directory root of the tree to be analyzed
+                resides.
+            thresholds (List[int], optional): the sizes to count the files above of.
+            percentiles (List[float], optional): the percentiles of the sizes to display.
+            histogram (bool): whether to display the histograms of the sizes.
+            perm_bits (str, optional): the octal permission bits of the files to analyze.
+            workers (int): the number of threads walking the directory tree.
+            index (str, optional): the file of the index of past scans.
+            excludes (List[str], optional): the patterns of the files and directories to skip.
+            includes (List[str], optional): the patterns of the files to analyze.
+            exclude_from (str, optional): the file listing the patterns to skip.
+            one_file_system (bool): whether to stay on the file system of directory_path.
+            hard_links_once (bool): whether to analyze the files with many hard links only once.
+            output_format (OutputFormat): the format the outcomes are written in.
+            output (str, optional): the file the outcomes are written to.
+            categorizer (Categorizer): how files are classified.
+            untrusted_extensions (List[str], optional): the extensions of the files to classify by
+                signature with the hybrid categorizer.
+            categorization_workers (int): the number of workers classifying files in parallel.
+            categorization_pool (CategorizationPool): the kind of pool classifying files in parallel.
+        """
+        try:
+            permission_bits = int(perm_bits, 8) if perm_bits is not None else None
+        except ValueError:
+            self.on_invalid_input("the provided permission bits must be octal.")
+        path_filter = self._path_filter(excludes, includes, exclude_from)
+        with self._open_output(output_format, output, ("statistic", "threshold, category or bin", "files or size (B)")), self._open_scan_index(index) as scan_index:
+            self._categorizing_analizer_factory(categorizer, untrusted_extensions, categorization_workers, categorization_pool)\
+                .create(directory_path, self, TraversalOptions(workers=workers, scan_index=scan_index, path_filter=path_filter,
+                                                               one_file_system=one_file_system, hard_links_once=hard_links_once))\
+                .analize_sizes_statistics(thresholds, percentiles, histogram, permission_bits)
+
+    def report(self, directory_path:str, 
+               analyses: Optional[List[Analysis]] = typer.Option(None, "--analysis", "-a",
+                                                                 help="An analysis to perform (repeatable). Defaults to all "
+                                                                 "(bigfiles only if --size is provided)."),
+               size: Optional[int] = typer.Option(None, help="The SIZE threshold of the bigfiles analysis."),
+               workers: int = _WORKERS_OPTION,
+               index: Optional[str] = _INDEX_OPTION,
+               excludes: Optional[List[str]] = _EXCLUDE_OPTION,
+               includes: Optional[List[str]] = _INCLUDE_OPTION,
+               exclude_from: Optional[str] = _EXCLUDE_FROM_OPTION,
+               one_file_system: bool = _ONE_FILE_SYSTEM_OPTION,
+               hard_links_once: bool = _HARD_LINKS_ONCE_OPTION,
+               output_format: OutputFormat = _FORMAT_OPTION,
+               output: Optional[str] = _OUTPUT_OPTION,
+               categorizer: Categorizer = _CATEGORIZER_OPTION,
+               untrusted_extensions: Optional[List[str]] = _UNTRUSTED_EXTENSION_OPTION,
+               categorization_workers: int = _CATEGORIZATION_WORKERS_OPTION,
+               categorization_pool: CategorizationPool = _CATEGORIZATION_POOL_OPTION):
+        """ Triggers many analyses at once, by walking the directory tree only once.
+        
+        Args:
+            directory_path (str): the path where the directory root of the tree to be analyzed
+                resides.
+            analyses (List[Analysis], optional): the analyses to perform.
+            size (int, optional): the size threshold for the large files identification.
+            workers (int): the number of threads walking the directory tree.
+            index (str, optional): the file of the index of past scans.
+            excludes (List[str], optional): the patterns of the files and directories to skip.
+            includes (List[str], optional): the patterns of the files to analyze.
+            exclude_from (str, optional): the file listing the patterns to skip.
+            one_file_system (bool): whether to stay on the file system of directory_path.
+            hard_links_once (bool): whether to analyze the files with many hard links only once.
+            output_format (OutputFormat): the format the outcomes are written in.
+            output (str, optional): the file the outcomes are written to.
+            categorizer (Categorizer): how files are classified.
+            untrusted_extensions (List[str], optional): the extensions of the files to classify by
+                signature with the hybrid categorizer.
+            categorization_workers (int): the number of workers classifying files in parallel.
+            categorization_pool (CategorizationPool): the kind of pool classifying files in parallel.
+        """
+        if not analyses:
+            analyses = [analysis for analysis in Analysis if analysis != Analysis.LARGE_FILES or size is not None]
+        path_filter = self._path_filter(excludes, includes, exclude_from)
+        with self._open_output(output_format, output, ("analysis", "filepath or category", "category, permissions or size (B)")), self._open_scan_index(index) as scan_index:
+            self._analysis_column = True
+            self._categorizing_analizer_factory(categorizer, untrusted_extensions, categorization_workers, categorization_pool, loose_permissions=True)\
+                .create(directory_path, self, TraversalOptions(workers=workers, scan_index=scan_index, path_filter=path_filter,
+                                                               one_file_system=one_file_system, hard_links_once=hard_links_once)).report(set(analyses), size)
+
+    def watch(self, directory_path:str, 
+              analyses: Optional[List[Analysis]] = typer.Option(None, "--analysis", "-a",
+                                                                help="An analysis to perform (repeatable). Defaults to all "
+                                                                "(bigfiles only if --size is provided)."),
+              size: Optional[int] = typer.Option(None, help="The SIZE threshold of the bigfiles analysis."),
+              latency: float = typer.Option(1.0, "--latency", min=0, 
+                                            help="The number of seconds changes are coalesced over before being displayed."),
+              excludes: Optional[List[str]] = _EXCLUDE_OPTION,
+              includes: Optional[List[str]] = _INCLUDE_OPTION,
+              exclude_from: Optional[str] = _EXCLUDE_FROM_OPTION,
+              one_file_system: bool = _ONE_FILE_SYSTEM_OPTION,
+              output_format: OutputFormat = _FORMAT_OPTION,
+              output: Optional[str] = _OUTPUT_OPTION,
+              categorizer: Categorizer = _CATEGORIZER_OPTION,
+              untrusted_extensions: Optional[List[str]] = _UNTRUSTED_EXTENSION_OPTION,
+              categorization_workers: int = _CATEGORIZATION_WORKERS_OPTION,
+              categorization_pool: CategorizationPool = _CATEGORIZATION_POOL_OPTION):
+        """ Triggers many analyses at once, and then keeps them up to date until interrupted.
+        
+        Args:
+            directory_path (str): the path where the directory root of the tree to be analyzed
+                resides.
+            analyses (List[Analysis], optional): the analyses to perform.
+            size (int, optional): the size threshold for the large files identification.
+            latency (float): the number of seconds changes are coalesced over.
+            excludes (List[str], optional): the patterns of the files and directories to skip.
+            includes (List[str], optional): the patterns of the files to analyze.
+            exclude_from (str, optional): the file listing the patterns to skip.
+            one_file_system (bool): whether to stay on the file system of directory_path.
+            output_format (OutputFormat): the format the outcomes are written in.
+            output (str, optional): the file the outcomes are written to.
+            categorizer (Categorizer): how files are classified.
+            untrusted_extensions (List[str], optional): the extensions of the files to classify by
+                signature with the hybrid categorizer.
+            categorization_workers (int): the number of workers classifying files in parallel.
+            categorization_pool (CategorizationPool): the kind of pool classifying files in parallel.
+        """
+        if not analyses:
+            analyses = [analysis for analysis in Analysis if analysis != Analysis.LARGE_FILES or size is not None]
+        path_filter = self._path_filter(excludes, includes, exclude_from)
+        with self._open_output(output_format, output, ("analysis", "filepath or category", "category, permissions or size (B)")):
+            self._analysis_column = True
+            self._categorizing_analizer_factory(categorizer, untrusted_extensions, categorization_workers, categorization_pool, loose_permissions=True)\
+                .create(directory_path, self, TraversalOptions(path_filter=path_filter, one_file_system=one_file_system))\
+                .watch(set(analyses), size, latency)
+
+    def save_snapshot(self, directory_path:str, snapshot_path:str,
+                      index: Optional[str] = _INDEX_OPTION,
+                      excludes: Optional[List[str]] = _EXCLUDE_OPTION,
+                      includes: Optional[List[str]] = _INCLUDE_OPTION,
+                      exclude_from: Optional[str] = _EXCLUDE_FROM_OPTION,
+                      one_file_system: bool = _ONE_FILE_SYSTEM_OPTION,
+                      hard_links_once: bool = _HARD_LINKS_ONCE_OPTION,
+                      output_format: OutputFormat = _FORMAT_OPTION,
+                      output: Optional[str] = _OUTPUT_OPTION,
+                      categorizer: Categorizer = _CATEGORIZER_OPTION,
+                      untrusted_extensions: Optional[List[str]] = _UNTRUSTED_EXTENSION_OPTION,
+                      categorization_workers: int = _CATEGORIZATION_WORKERS_OPTION,
+                      categorization_pool: CategorizationPool = _CATEGORIZATION_POOL_OPTION):
+        """ Triggers the snapshot of the directory tree.
+        
+        Args:
+            directory_path (str): the path where the directory root of the tree to be analyzed
+                resides.
+            snapshot_path (str): the path of the snapshot file.
+            index (str, optional): the file of the index of past scans.
+            excludes (List[str], optional): the patterns of the files and directories to skip.
+            includes (List[str], optional): the patterns of the files to analyze.
+            exclude_from (str, optional): the file listing the patterns to skip.
+            one_file_system (bool): whether to stay on the file system of directory_path.
+            hard_links_once (bool): whether to analyze the files with many hard links only once.
+            output_format (OutputFormat): the format the outcomes are written in.
+            output (str, optional): the file the outcomes are written to.
+            categorizer (Categorizer): how files are classified.
+            untrusted_extensions (List[str], optional): the extensions of the files to classify by
+                signature with the hybrid categorizer.
+            categorization_workers (int): the number of workers classifying files in parallel.
+            categorization_pool (CategorizationPool): the kind of pool classifying files in parallel.
+        """
+        path_filter = self._path_filter(excludes, includes, exclude_from)
+        with self._open_output(output_format, output, ("snapshot", "files")), self._open_scan_index(index) as scan_index:
+            self._categorizing_analizer_factory(categorizer, untrusted_extensions, categorization_workers, categorization_pool)\
+                .create(directory_path, self, TraversalOptions(scan_index=scan_index, path_filter=path_filter,
+                                                               one_file_system=one_file_system, hard_links_once=hard_links_once)).save_snapshot(snapshot_path)
+
+    def diff_snapshots(self, old_snapshot_path:str, new_snapshot_path:str,
+                       output_format: OutputFormat = _FORMAT_OPTION,
+                       output: Optional[str] = _OUTPUT_OPTION):
+        """ Triggers the comparison of two snapshots.
+        
+        Args:
+            old_snapshot_path (str): the path of the old snapshot file.
+            new_snapshot_path (str): the path of the new snapshot file.
+            output_format (OutputFormat): the format the outcomes are written in.
+            output (str, optional): the file the outcomes are written to.
         """
-        print("filepath\t| size (B)")
-        print("------------------------------")
-        ExtensionDirectoryAnalizerFactory().create(directory_path, self).identify_large_files(size)
+        from fs_analyzer.view_model.snapshot_differ import SnapshotDiffer
+        with self._open_output(output_format, output, ("change", "filepath or category", "old size (B)", "new size (B)", "delta (B)")):
+            SnapshotDiffer(old_snapshot_path, new_snapshot_path, self).diff()
+
+    def _categorizing_analizer_factory(self, categorizer: Categorizer, 
+                                       untrusted_extensions: Optional[List[str]],
+                                       categorization_workers: int,
+                                       categorization_pool: CategorizationPool,
+                                       loose_permissions: bool = False)->DirectoryAnalizerFactory:
+        if categorizer == Categorizer.HYBRID:
+            factory = (HybridLoosePermAnalyzerFactory if loose_permissions else HybridDirectoryAnalizerFactory)(
+                untrusted_extensions or DEFAULT_UNTRUSTED_EXTENSIONS)
+        elif loose_permissions:
+            factory = {Categorizer.EXTENSION: ExtensionLoosePermAnalyzerFactory, 
+                       Categorizer.SIGNATURE: LoosePermAnalyzerFactory}[categorizer]()
+        else:
+            factory = {Categorizer.EXTENSION: ExtensionDirectoryAnalizerFactory, 
+                       Categorizer.SIGNATURE: SignatureDirectoryAnalizerFactory}[categorizer]()
+        if categorization_workers > 1:
+            factory = ParallelCategorizationAnalizerFactory(factory, 
+                                                            categorization_workers, 
+                                                            use_processes=categorization_pool == CategorizationPool.PROCESS)
+        return factory
+
+    def _path_filter(self, excludes: Optional[List[str]], 
+                     includes: Optional[List[str]], 
+                     exclude_from: Optional[str])->Optional[PathFilter]:
+        if not excludes and not includes and exclude_from is None:
+            return None
+        if exclude_from is not None:
+            try:
+                excludes = list(excludes or []) + list(PathFilter.from_file(exclude_from).excludes)
+            except OSError as e:
+                self.on_invalid_input("invalid exclude file: " + str(e))
+        return PathFilter(excludes or [], includes or [])
+
+    def _checkpointer(self, checkpoint: Optional[str], 
+                      checkpoint_seconds: float, 
+                      resume: bool)->Optional[ScanCheckpointer]:
+        if checkpoint is None:
+            if resume:
+                self.on_invalid_input("a --checkpoint file must be provided to resume a scan.")
+            return None
+        checkpointer = ScanCheckpointer(checkpoint, checkpoint_seconds, resume)
+        if resume:
+            try:
+                checkpointer.load()
+            except (OSError, ValueError) as e:
+                self.on_invalid_input("invalid checkpoint: " + str(e))
+        return checkpointer
+
+    def _open_scan_index(self, index_path: Optional[str]):
+        """Opens the scan index stored at the provided path, if any."""
+        if index_path is None:
+            return nullcontext(None)
+        # imported here, since sqlite3 slows down the start of the CLI
+        import sqlite3
+        from fs_analyzer.model.scan_index import ScanIndex
+        try:
+            return ScanIndex(index_path)
+        except (sqlite3.Error, OSError) as e:
+            self.on_invalid_input("invalid index: " + str(e))
+
+    @contextmanager
+    def _open_output(self, output_format: OutputFormat, 
+                     output: Optional[str], 
+                     columns: Sequence[str])->Iterator[OutputWriter]:
+        """Opens the writer of the outcomes of a command, writing its header, and flushes it once
+        the command is completed (even if aborted)."""
+        if output is not None:
+            try:
+                stream = open(output, "wb")
+            except OSError as e:
+                self.on_invalid_input("invalid output file: " + str(e))
+        else:
+            # what was printed so far must precede the buffered outcomes
+            sys.stdout.flush()
+            stream = nullcontext(sys.stdout.buffer)
+        with stream as output_stream:
+            self._writer = create_output_writer(output_format, output_stream)
+            try:
+                self._writer.write_header(columns)
+                yield self._writer
+            finally:
+                self._writer.flush()
+                self._writer = None
+                self._analysis_column = False
+
+    def _write_row(self, analysis: Analysis, *values: Any)->None:
+        if self._analysis_column:
+            self._writer.write_row(analysis.value, *values)
+        else:
+            self._writer.write_row(*values)
+
+    def _write_note(self, message: str)->None:
+        if self._writer is not None:
+            self._writer.write_note(message)
+        else:
+            print(message)
 
-    # notes for future developements: f-strings are more efficient than + operator for concatenating
     def on_new_categorized_file(self, file_path:str, 
                                 file_category: file_category.FileCategory)->None:
-        print(file_path + "\t| " + str(file_category.name))
+        self._write_row(Analysis.CATEGORIES, file_path, file_category.name)
+        
+    def on_new_files_batch(self, files_batch: FilesBatch)->None:
+        rows = zip(files_batch.paths(), (file_category.name for file_category in files_batch.categories()))
+        if self._analysis_column:
+            rows = ((Analysis.CATEGORIES.value, file_path, category_name) for (file_path, category_name) in rows)
+        self._writer.write_rows(rows)
         
     def on_new_file_category_size(self, files_category: file_category.FileCategory, 
                                   category_size:int)->None:
-        print(str(files_category) + "\t| " + str(category_size))
+        self._write_row(Analysis.CATEGORY_SIZES, files_category, category_size)
+
+    def on_partial_file_categories_sizes(self, sizes_by_categories: Dict[file_category.FileCategory, int],
+                                         files_count:int)->None:
+        for (files_category, category_size) in sizes_by_categories.items():
+            self._write_note("(partial, " + str(files_count) + " files) " + str(files_category) + "\t| " + str(category_size))
 
     def on_new_file_with_unusual_permission(self, filepath:str, 
                                             permissions: Set[file_permissions.FilePermission])->None:
-        print(filepath + "\t| " + str(set(map(lambda fp:fp.name, permissions))))
+        self._write_row(Analysis.PERMISSIONS, filepath, set(map(lambda fp:fp.name, permissions)))
         
     def on_new_large_file(self, file_path:str, file_size:int)->None:
-        print(file_path + "\t| " + str(file_size))
+        self._write_row(Analysis.LARGE_FILES, file_path, file_size)
+
+    def on_new_file_category_disk_usage(self, files_category: file_category.FileCategory, 
+                                        category_size:int, category_allocated_size:int)->None:
+        self._writer.write_row(files_category, category_size, category_allocated_size)
+
+    def on_new_large_file_disk_usage(self, file_path:str, file_size:int, file_allocated_size:int)->None:
+        self._writer.write_row(file_path, file_size, file_allocated_size)
+
+    def on_new_large_file_leader(self, file_path:str, file_size:int)->None:
+        self._write_note("(leader) " + file_path + "\t| " + str(file_size))
+
+    def on_new_directory_size(self, directory_path:str, directory_size:int, files_count:int)->None:
+        self._writer.write_row(directory_path, directory_size, files_count)
+
+    def on_new_large_files_count(self, threshold_in_bytes:int, files_count:int)->None:
+        self._writer.write_row("files above", threshold_in_bytes, files_count)
+
+    def on_new_category_sizes_percentiles(self, files_category: file_category.FileCategory,
+                                          sizes_by_percentiles: Dict[float, int])->None:
+        for (percentile, size) in sizes_by_percentiles.items():
+            self._writer.write_row("p" + format(percentile, "g"), files_category.name, size)
+
+    def on_new_category_sizes_histogram(self, files_category: file_category.FileCategory,
+                                        files_counts_by_bins: Dict[int, int])->None:
+        for (bin_lower_edge, files_count) in files_counts_by_bins.items():
+            if files_count > 0:
+                self._writer.write_row("histogram", files_category.name + " >=" + str(bin_lower_edge), files_count)
+
+    def on_large_file_dropped(self, file_path:str, file_size:int)->None:
+        self._writer.write_row(Analysis.LARGE_FILES.value + " (dropped)", file_path, file_size)
+
+    def on_updates_completed(self)->None:
+        self._writer.flush()
+
+    def on_new_snapshot(self, snapshot_path:str, files_count:int)->None:
+        self._writer.write_row(snapshot_path, files_count)
+
+    def on_new_snapshot_difference(self, change: "Change", file_path:str, old_size:int, new_size:int)->None:
+        self._writer.write_row(change.value, file_path, old_size, new_size, new_size - old_size)
 
+    def on_new_category_size_delta(self, files_category: file_category.FileCategory, 
+                                   old_size:int, new_size:int)->None:
+        self._writer.write_row("category", files_category.name, old_size, new_size, new_size - old_size)
 
     def on_file_not_found(self)->None:
-        print("ERROR: a file was not found")
+        self._write_note("ERROR: a file was not found")
         
     def on_directory_not_found(self)->None:
-        print("ERROR: directory not found.")
+        self._write_note("ERROR: directory not found.")
         
     def on_permission_error(self)->None:
-        print("ERROR: a file was not found")
+        self._write_note("ERROR: a file was not found")
         
     def on_unknown_error(self)->None:
-        print("ERROR: an unknown error occurred.")
+        self._write_note("ERROR: an unknown error occurred.")
 
     def on_invalid_input(self, msg)->None:
-        print("ERROR:" + msg)
+        self._write_note("ERROR:" + msg)
         raise typer.Abort()
@@ -0,0 +1,271 @@
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Any, BinaryIO, Iterable, Iterator, List, Sequence
+import csv
+import io
+import json
+import re
+import struct
+import sys
+
+from fs_analyzer.model.file_category import FileCategory
+
+
+class OutputFormat(str, Enum):
+    """Enumerates the formats the outcomes of the commands of the CLI can be written in."""
+    TEXT = "text"
+    TSV = "tsv"
+    CSV = "csv"
+    NDJSON = "ndjson"
+    BINARY = "binary"
+
+
+# the number of bytes buffered before writing them at once
+DEFAULT_BUFFER_SIZE = 1 << 20
+# the errors handler encoding file names, so that their undecodable bytes are written as they are
+_ENCODING_ERRORS = "surrogateescape"
+
+
+class OutputWriter(ABC):
+    """Represents the writer of the outcomes of a command of the CLI, as rows of fields under
+    a header. Rows are encoded into a large buffer, which is written to the stream in blocks
+    of (at least) buffer_size bytes, so that writing millions of rows takes a few syscalls
+    rather than one per row (as printing to a line-buffered terminal does). Notes (e.g.,
+    errors and progress messages) are not rows: they are written to the standard error,
+    unless the format is a human-readable one.
+    It is modeled through the so-called "Template method" design pattern: concrete writers
+    only define how the header and the rows are encoded.
+
+    Note that:
+    - the values of the fields are either strings, integers, file categories (written by
+        name) or sets of strings (e.g., the names of the unusual permissions of a file).
+    - the stream is not closed by the writer, while flush must be called once done.
+
+    Args:
+        stream (BinaryIO): the stream the rows are written to.
+        buffer_size (int, optional): the number of bytes buffered before writing them.
+            Defaults to DEFAULT_BUFFER_SIZE (1 MiB).
+    """
+    def __init__(self, stream: BinaryIO, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        self._stream = stream
+        self._buffer_size = buffer_size
+        self._chunks: List[bytes] = []
+        self._buffered_bytes = 0
+        self.columns: Sequence[str] = ()
+
+    def write_header(self, columns: Sequence[str]) -> None:
+        """Writes the header, i.e. the names of the fields of the rows."""
+        self.columns = tuple(columns)
+        self._write(self._encode_header(self.columns))
+
+    def write_row(self, *values: Any) -> None:
+        """Writes a row, made of the provided values."""
+        self._write(self._encode_row(values))
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> None:
+        """Writes many rows at once."""
+        encode_row = self._encode_row
+        self._write(b"".join([encode_row(row) for row in rows]))
+
+    def write_note(self, message: str) -> None:
+        """Writes a message which is not a row (e.g., an error)."""
+        print(message, file=sys.stderr)
+
+    def flush(self) -> None:
+        """Writes the buffered bytes to the stream, and flushes it."""
+        if self._chunks:
+            self._stream.write(b"".join(self._chunks))
+            self._chunks.clear()
+            self._buffered_bytes = 0
+        self._stream.flush()
+
+    def _write(self, data: bytes) -> None:
+        self._chunks.append(data)
+        self._buffered_bytes += len(data)
+        if self._buffered_bytes >= self._buffer_size:
+            self.flush()
+
+    @abstractmethod
+    def _encode_header(self, columns: Sequence[str]) -> bytes:
+        pass
+
+    @abstractmethod
+    def _encode_row(self, values: Sequence[Any]) -> bytes:
+        pass
+
+
+class TextOutputWriter(OutputWriter):
+    """A concrete implementation of OutputWriter writing human-readable rows, whose fields
+    are separated by tabs and pipes, under an underlined header. Notes are written inline.
+    """
+    def _encode_header(self, columns: Sequence[str]) -> bytes:
+        return ("\t| ".join(columns) + "\n------------------------------\n").encode("utf-8", _ENCODING_ERRORS)
+
+    def _encode_row(self, values: Sequence[Any]) -> bytes:
+        return ("\t| ".join(map(str, values)) + "\n").encode("utf-8", _ENCODING_ERRORS)
+
+    def write_note(self, message: str) -> None:
+        self._write((message + "\n").encode("utf-8", _ENCODING_ERRORS))
+
+
+class TsvOutputWriter(OutputWriter):
+    """A concrete implementation of OutputWriter writing tab-separated values, with a line
+    per row, escaping the backslashes, tabs and newlines of the fields (as \\\\, \\t and \\n).
+    """
+    def _encode_header(self, columns: Sequence[str]) -> bytes:
+        return self._encode_row(columns)
+
+    def _encode_row(self, values: Sequence[Any]) -> bytes:
+        return ("\t".join([_escape_tsv_field(_field_as_string(value)) for value in values]) + "\n")\
+            .encode("utf-8", _ENCODING_ERRORS)
+
+
+class CsvOutputWriter(OutputWriter):
+    """A concrete implementation of OutputWriter writing comma-separated values, quoted as
+    the csv module does by default (i.e. only the fields needing it).
+    """
+    def __init__(self, stream: BinaryIO, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        super().__init__(stream, buffer_size)
+        self._text = io.StringIO()
+        self._csv_writer = csv.writer(self._text, lineterminator="\n")
+
+    def _encode_header(self, columns: Sequence[str]) -> bytes:
+        return self._encode_rows([columns])
+
+    def _encode_row(self, values: Sequence[Any]) -> bytes:
+        return self._encode_rows([values])
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> None:
+        self._write(self._encode_rows(rows))
+
+    def _encode_rows(self, rows: Iterable[Sequence[Any]]) -> bytes:
+        self._csv_writer.writerows([_field_as_string(value) for value in row] for row in rows)
+        encoded_rows = self._text.getvalue().encode("utf-8", _ENCODING_ERRORS)
+        self._text.seek(0)
+        self._text.truncate()
+        return encoded_rows
+
+
+class NdjsonOutputWriter(OutputWriter):
+    """A concrete implementation of OutputWriter writing newline-delimited JSON, i.e. a JSON
+    object per row, whose keys are the names of the columns in snake case (e.g., 'size_b' for
+    'size (B)'), while the header itself is not written. Sets are written as sorted arrays.
+
+    Note that non-ASCII characters are escaped, so that the output is valid UTF-8 even for file
+    names which are not (their undecodable bytes are written as lone surrogates, e.g. '\\udce9',
+    which os.fsencode turns back into the original bytes).
+    """
+    def __init__(self, stream: BinaryIO, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        super().__init__(stream, buffer_size)
+        self._keys: Sequence[str] = ()
+        self._encoder = json.JSONEncoder(ensure_ascii=True, default=_json_default)
+
+    def _encode_header(self, columns: Sequence[str]) -> bytes:
+        self._keys = [_json_key(column) for column in columns]
+        return b""
+
+    def _encode_row(self, values: Sequence[Any]) -> bytes:
+        return (self._encoder.encode(dict(zip(self._keys, values))) + "\n").encode("ascii")
+
+
+# the header of the binary format, i.e. its magic number and version
+BINARY_FORMAT_MAGIC = b"FSAR\x01"
+_FIELDS_COUNT = struct.Struct("<H")
+_STRING_LENGTH = struct.Struct("<I")
+_INTEGER = struct.Struct("<q")
+
+
+class BinaryOutputWriter(OutputWriter):
+    """A concrete implementation of OutputWriter writing a compact, length-prefixed binary
+    format (readable through read_binary_records): BINARY_FORMAT_MAGIC followed by a record
+    for the header and one per row. Each record is the number of its fields (as an unsigned
+    16-bit integer) followed by its fields, each one tagged by a byte: b"i" for integers
+    (followed by a signed 64-bit integer) and b"s" for strings (followed by their length, as
+    an unsigned 32-bit integer, and their UTF-8 bytes). All integers are little-endian.
+    """
+    def __init__(self, stream: BinaryIO, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        super().__init__(stream, buffer_size)
+        self._write(BINARY_FORMAT_MAGIC)
+
+    def _encode_header(self, columns: Sequence[str]) -> bytes:
+        return self._encode_row(columns)
+
+    def _encode_row(self, values: Sequence[Any]) -> bytes:
+        encoded_fields = [_FIELDS_COUNT.pack(len(values))]
+        for value in values:
+            if isinstance(value, int):
+                encoded_fields.append(b"i" + _INTEGER.pack(value))
+            else:
+                encoded_string = _field_as_string(value).encode("utf-8", _ENCODING_ERRORS)
+                encoded_fields.append(b"s" + _STRING_LENGTH.pack(len(encoded_string)) + encoded_string)
+        return b"".join(encoded_fields)
+
+
+def read_binary_records(stream: BinaryIO) -> Iterator[tuple]:
+    """Reads the records (i.e. the header and then the rows) written by a BinaryOutputWriter.
+
+    Raises:
+        ValueError: if the stream is not in the binary format.
+
+    Yields:
+        Iterator[tuple]: the generator of the records, as tuples of strings and integers.
+    """
+    if stream.read(len(BINARY_FORMAT_MAGIC)) != BINARY_FORMAT_MAGIC:
+        raise ValueError("the stream is not in the binary format of fs_analyzer.")
+    while fields_count_bytes := stream.read(_FIELDS_COUNT.size):
+        record = []
+        for _ in range(_FIELDS_COUNT.unpack(fields_count_bytes)[0]):
+            tag = stream.read(1)
+            if tag == b"i":
+                record.append(_INTEGER.unpack(stream.read(_INTEGER.size))[0])
+            elif tag == b"s":
+                length = _STRING_LENGTH.unpack(stream.read(_STRING_LENGTH.size))[0]
+                record.append(stream.read(length).decode("utf-8", _ENCODING_ERRORS))
+            else:
+                raise ValueError(f"unknown field tag {tag!r}.")
+        yield tuple(record)
+
+
+_WRITERS_BY_FORMAT = {OutputFormat.TEXT: TextOutputWriter,
+                      OutputFormat.TSV: TsvOutputWriter,
+                      OutputFormat.CSV: CsvOutputWriter,
+                      OutputFormat.NDJSON: NdjsonOutputWriter,
+                      OutputFormat.BINARY: BinaryOutputWriter}
+
+
+def create_output_writer(output_format: OutputFormat,
+                         stream: BinaryIO,
+                         buffer_size: int = DEFAULT_BUFFER_SIZE) -> OutputWriter:
+    """Creates the writer of the provided format (see OutputFormat), writing to the provided stream."""
+    return _WRITERS_BY_FORMAT[OutputFormat(output_format)](stream, buffer_size)
+
+
+def _field_as_string(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, FileCategory):
+        return value.name
+    if isinstance(value, (set, frozenset)):
+        return ",".join(sorted(value))
+    return str(value)
+
+
+_TSV_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+_TSV_SPECIAL_CHARACTERS = re.compile(r"[\\\t\n\r]")
+
+
+def _escape_tsv_field(field: str) -> str:
+    # translating is slow, while almost no field needs it
+    return field.translate(_TSV_ESCAPES) if _TSV_SPECIAL_CHARACTERS.search(field) else field
+
+
+def _json_key(column: str) -> str:
+    return re.sub(r"[^0-9a-z]+", "_", column.lower()).strip("_")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, FileCategory):
+        return value.name
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"{type(value).__name__} values cannot be written as JSON.")
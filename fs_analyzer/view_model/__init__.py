@@ -9,12 +9,18 @@ of it.
 In particular,
 
 Modules:
+* async_directory_analizer.py: contains the asyncio counterpart of the class in 
+    directory_analizer.py, walking the directory tree in an executor.
+* async_directory_observer.py: contains the class defining the abstraction of asynchronous
+    observer of the analysis outcomes of directory traversal.
 * directory_analyzer_factory.py: contains some factories for creating the analyzer most
     suited to the app user.
 * directory_analyzer.py: contains the class responsible for interaction between the
     directory tree domain and who is interested in it (like, but not necessarily, the view).
 * directory_observer.py: contains the class defining the abstraction of observer of
     the analysis outcomes of directory traversal.
+* snapshot_differ.py: contains the class comparing two snapshots of a directory tree,
+    notifying what changed in between.
 
 Besides typing and fs_analyzer's model and view modules, the package does not depend
 on third-party modules.
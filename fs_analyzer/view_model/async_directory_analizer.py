@@ -0,0 +1,198 @@
+from concurrent.futures import Executor
+import functools
+import heapq
+import os
+
+from fs_analyzer.view_model.async_directory_observer import AsyncDirectoryObserver
+from fs_analyzer.model.async_file_listing_generators import *
+from fs_analyzer.model.scan_index import IndexedFileCategorizer
+
+
+class AsyncDirectoryAnalizer():
+    """Represents the high-level features of the fs_analyzer app (see DirectoryAnalizer), for
+    applications based on asyncio: the directory tree is walked (and files are stat-ed and read)
+    in an executor, so that the event loop is never blocked, while the outcomes are notified
+    to an asynchronous observer, from the event loop.
+    Cancelling the task awaiting an analysis stops the traversal of the tree.
+
+        Note that:
+            - Symbolic links are ignored.
+            - Directories names and sizes are not reported (only those of files).
+            - For files at the same depth level of the tree, no assumptions are made 
+                regarding the order by which observer method are called.
+            - Exceptions during walk are handled through observer methods.
+    """
+
+    def __init__(self,
+                 directory_path:str,
+                 file_categorization_strategy: FileCategorizationStrategy, 
+                 permission_reporting_strategy: FilePermissionsReportingStrategy,
+                 observer: AsyncDirectoryObserver,
+                 traversal_options: TraversalOptions = TraversalOptions(),
+                 executor: Executor = None) -> None:
+        """Configures the analyzer.
+
+        Args:
+            directory_path (str): the path where the directory root of the tree to be analyzed
+                resides.
+            file_categorization_strategy (FileCategorizationStrategy): the strategy by
+            which to classify files. 
+            permission_reporting_strategy (FilePermissionsReportingStrategy): the strategy by
+            which to identify unusual permissions. 
+            observer (AsyncDirectoryObserver): the observer to be notified of the file analysis
+                events during traversal.
+            traversal_options (TraversalOptions, optional): the settings of the directory tree
+                traversal. If a scan index is provided, it is used as a cache of the categories 
+                of files, too.
+                Defaults to TraversalOptions().
+            executor (Executor, optional): the executor walking the directory tree, bounding
+                the number of analyses performed concurrently.
+                Defaults to None (i.e. a thread pool shared by all the analyzers).
+        """
+        self._directory_path = directory_path
+        self._file_categorization_strategy = file_categorization_strategy
+        if traversal_options.scan_index is not None:
+            self._file_categorization_strategy = IndexedFileCategorizer(file_categorization_strategy, 
+                                                                        traversal_options.scan_index)
+        self._permission_reporting_strategy = permission_reporting_strategy
+        self._observer = observer
+        self._traversal_options = traversal_options
+        self._executor = executor
+
+    async def _walk_error_handler(self, exception_instance):
+        match exception_instance:
+            case FileNotFoundError():
+                await self._observer.on_file_not_found()
+            case PermissionError(): 
+                await self._observer.on_permission_error()
+            case  _:
+                await self._observer.on_unknown_error()
+
+    def _generic_error_handler(func):
+        @functools.wraps(func)
+        async def inner_function(self, *args, **kwargs):
+            if not os.path.isdir(self._directory_path):
+                await self._observer.on_invalid_input("The provided path does not point to a directory.")
+                return
+            try:
+                await func(self, *args, **kwargs)
+            except Exception as e:
+                print(e)
+                await self._observer.on_unknown_error()
+        return inner_function
+
+    @_generic_error_handler
+    async def categorize_files(self, batch_size:int = None)->None:
+        """Walks the directory tree classifying files (see DirectoryAnalizer.categorize_files).
+        """
+        if batch_size is not None:
+            if batch_size <= 0:
+                await self._observer.on_invalid_input("the provided batch size must be >0.")
+                return
+            async for files_batch in async_yield_files_batches(directory_path=self._directory_path,
+                                                               file_categorization_strategy = self._file_categorization_strategy,
+                                                               batch_size = batch_size,
+                                                               on_error = self._walk_error_handler,
+                                                               traversal_options = self._traversal_options,
+                                                               executor = self._executor):
+                await self._observer.on_new_files_batch(files_batch)
+            return
+        async for (filepath, category) in async_yield_file_categories(directory_path=self._directory_path, 
+                                                                      file_categorization_strategy = self._file_categorization_strategy,
+                                                                      on_error = self._walk_error_handler,
+                                                                      traversal_options = self._traversal_options,
+                                                                      executor = self._executor):
+            await self._observer.on_new_categorized_file(filepath, category)
+
+    @_generic_error_handler
+    async def analize_category_sizes(self, files_interval:int = None, seconds_interval:float = None)->None:
+        """"Walks the directory tree reporting files categories' sizes (see 
+        DirectoryAnalizer.analize_category_sizes).
+        """
+        if (files_interval is not None and files_interval <= 0) or (seconds_interval is not None and seconds_interval <= 0):
+            await self._observer.on_invalid_input("the provided intervals must be >0.")
+            return
+        sizes_by_categories = {}
+        async for (sizes_by_categories, files_count, completed) in async_yield_categories_sizes_snapshots(
+                directory_path = self._directory_path, 
+                file_categorization_strategy = self._file_categorization_strategy,
+                files_interval = files_interval,
+                seconds_interval = seconds_interval,
+                on_error = self._walk_error_handler,
+                traversal_options = self._traversal_options,
+                executor = self._executor):
+            if not completed:
+                await self._observer.on_partial_file_categories_sizes(sizes_by_categories, files_count)
+        for (category, size) in sizes_by_categories.items():
+            await self._observer.on_new_file_category_size(category, size)
+
+    @_generic_error_handler
+    async def report_permissions(self)->None:
+        """"Walks the directory tree by reporting files with unusual permissions settings.
+        """
+        async for (filepath, permissions) in async_yield_unusual_permissions(directory_path=self._directory_path,
+                                                                             permission_reporting_strategy = self._permission_reporting_strategy,
+                                                                             on_error = self._walk_error_handler,
+                                                                             traversal_options = self._traversal_options,
+                                                                             executor = self._executor):
+            await self._observer.on_new_file_with_unusual_permission(filepath, permissions)
+
+    @_generic_error_handler
+    async def identify_large_files(self, file_size_in_bytes:int)->None:
+        """Walks the directory tree by identifying files with size greater than the provided
+        threshold (see DirectoryAnalizer.identify_large_files).
+        """
+        if file_size_in_bytes < 0:
+            await self._observer.on_invalid_input("the provided size must be >=0.")
+            return
+        async for (filepath, size) in async_yield_files_larger_than(directory_path=self._directory_path, 
+                                                                    threshold_in_bytes=file_size_in_bytes,
+                                                                    on_error = self._walk_error_handler,
+                                                                    traversal_options = self._traversal_options,
+                                                                    executor = self._executor):
+            await self._observer.on_new_large_file(filepath, size)
+
+    @_generic_error_handler
+    async def identify_largest_files(self, files_count:int, file_size_in_bytes:int = -1, stream_leaders:bool = False)->None:
+        """Walks the directory tree by identifying the files_count largest files (see 
+        DirectoryAnalizer.identify_largest_files).
+        """
+        if files_count <= 0:
+            await self._observer.on_invalid_input("the provided number of files must be >0.")
+            return
+        async for (filepath, size) in async_yield_largest_files(directory_path=self._directory_path,
+                                                                files_count=files_count,
+                                                                threshold_in_bytes=file_size_in_bytes,
+                                                                on_new_leader=self._observer.on_new_large_file_leader if stream_leaders else None,
+                                                                on_error=self._walk_error_handler,
+                                                                traversal_options=self._traversal_options,
+                                                                executor = self._executor):
+            await self._observer.on_new_large_file(filepath, size)
+
+    @_generic_error_handler
+    async def analize_directories_sizes(self, max_depth:int = None, directories_count:int = None)->None:
+        """Walks the directory tree reporting the cumulative size and number of files of each
+        directory (see DirectoryAnalizer.analize_directories_sizes).
+        """
+        if max_depth is not None and max_depth < 0:
+            await self._observer.on_invalid_input("the provided depth must be >=0.")
+            return
+        if directories_count is not None and directories_count <= 0:
+            await self._observer.on_invalid_input("the provided number of directories must be >0.")
+            return
+        directories_sizes = async_yield_directories_sizes(directory_path=self._directory_path,
+                                                          max_depth=max_depth,
+                                                          on_error=self._walk_error_handler,
+                                                          traversal_options=self._traversal_options,
+                                                          executor = self._executor)
+        if directories_count is None:
+            async for (directory_path, size, files_count) in directories_sizes:
+                await self._observer.on_new_directory_size(directory_path, size, files_count)
+            return
+        # a bounded min-heap keeps only the largest directories found so far
+        largest_directories = []
+        async for directory_size in directories_sizes:
+            (heapq.heappush if len(largest_directories) < directories_count else heapq.heappushpop)(
+                largest_directories, (directory_size[1], directory_size))
+        for (_, (directory_path, size, files_count)) in sorted(largest_directories, reverse=True):
+            await self._observer.on_new_directory_size(directory_path, size, files_count)
@@ -0,0 +1,71 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Set
+
+from fs_analyzer.model import file_permissions, file_category
+from fs_analyzer.model.files_batch import FilesBatch
+
+class AsyncDirectoryObserver(ABC):
+    """An abstract observer for asynchronous directory analyzer's analysis intermediate outcomes
+    during traversal, i.e. the asynchronous counterpart of DirectoryObserver (see it for the 
+    meaning of each notification), whose methods are coroutines awaited by the analyzer, 
+    so that they can perform asynchronous I/O without blocking the event loop.
+    """
+
+    @abstractmethod
+    async def on_new_categorized_file(self, 
+                                      file_path:str, 
+                                      filecategory: file_category.FileCategory)->None:
+        pass
+
+    @abstractmethod
+    async def on_new_file_category_size(self, 
+                                        files_category: file_category.FileCategory, 
+                                        category_size:int)->None:
+        pass
+
+    @abstractmethod
+    async def on_new_file_with_unusual_permission(self, 
+                                                  file_path:str, 
+                                                  file_permissions: Set[file_permissions.FilePermission])->None:
+        pass
+
+    @abstractmethod
+    async def on_new_large_file(self, 
+                                file_path:str, 
+                                file_size:int)->None:
+        pass
+
+    async def on_partial_file_categories_sizes(self, 
+                                               sizes_by_categories: Dict[file_category.FileCategory, int],
+                                               files_count:int)->None:
+        pass
+
+    async def on_new_files_batch(self, 
+                                 files_batch: FilesBatch)->None:
+        pass
+
+    async def on_new_large_file_leader(self, 
+                                       file_path:str, 
+                                       file_size:int)->None:
+        pass
+
+    async def on_new_directory_size(self, 
+                                    directory_path:str, 
+                                    directory_size:int,
+                                    files_count:int)->None:
+        pass
+
+    async def on_file_not_found(self)->None:
+        pass
+
+    async def on_directory_not_found(self)->None:
+        pass
+
+    async def on_permission_error(self)->None:
+        pass
+
+    async def on_unknown_error(self)->None:
+        pass
+
+    async def on_invalid_input(self, msg:str)->None:
+        pass
@@ -1,6 +1,24 @@
+from enum import Enum
+import heapq
+
 from fs_analyzer.view_model.directory_observer import DirectoryObserver
 from fs_analyzer.model.file_categorization_strategy import FileCategorizationStrategy
 from fs_analyzer.model.file_listing_generators import *
+from fs_analyzer.model.scan_checkpoint import ScanCheckpointer
+from fs_analyzer.model.scan_table import NUMPY_AVAILABLE, ScanTable
+# the modules serving a few methods only (i.e. the scan index, the snapshots and the watcher)
+# are imported by those methods, since their dependencies (e.g., sqlite3) slow down the start
+# of the CLI
+
+
+class Analysis(str, Enum):
+    """Enumerates the analyses that DirectoryAnalizer can perform in a single traversal 
+    of the directory tree (see DirectoryAnalizer.report).
+    """
+    CATEGORIES = "categorize"
+    CATEGORY_SIZES = "catsizes"
+    PERMISSIONS = "fileperms"
+    LARGE_FILES = "bigfiles"
 
 
 class DirectoryAnalizer():
@@ -27,7 +45,8 @@ class DirectoryAnalizer():
                  directory_path:str,
                  file_categorization_strategy: FileCategorizationStrategy, 
                  permission_reporting_strategy: FilePermissionsReportingStrategy,
-                 observer: DirectoryObserver) -> None:
+                 observer: DirectoryObserver,
+                 traversal_options: TraversalOptions = TraversalOptions()) -> None:
         """Configures the analyzer.
 
         Args:
@@ -39,11 +58,20 @@ class DirectoryAnalizer():
             which to identify unusual permissions. 
             observer (DirectoryObserver): the observer to be notified of the file analysis
                 events during traversal.
+            traversal_options (TraversalOptions, optional): the settings of the directory tree
+                traversal (e.g., the number of workers walking it in parallel). If a scan index is
+                provided, it is used as a cache of the categories of files, too.
+                Defaults to TraversalOptions().
         """
         self._directory_path = directory_path
         self._file_categorization_strategy = file_categorization_strategy
+        if traversal_options.scan_index is not None:
+            from fs_analyzer.model.scan_index import IndexedFileCategorizer
+            self._file_categorization_strategy = IndexedFileCategorizer(file_categorization_strategy, 
+                                                                        traversal_options.scan_index)
         self._permission_reporting_strategy = permission_reporting_strategy
         self._observer = observer
+        self._traversal_options = traversal_options
         if not os.path.isdir(self._directory_path):
             self._observer.on_invalid_input("The provided path does not point to a directory.")
     
@@ -68,30 +96,85 @@ class DirectoryAnalizer():
 
 
     @_generic_error_handler
-    def categorize_files(self)->None:
-        """Walks the directory tree classifying files.
+    def categorize_files(self, batch_size:int = None)->None:
+        """Walks the directory tree classifying files. If a batch size is provided, files are
+        notified in batches stored in columnar form (through on_new_files_batch), which is
+        much lighter than notifying them one by one when exporting huge trees.
+        Args:
+            batch_size (int, optional): the max number of files of a batch.
+            Defaults to None (i.e. files are notified one by one).
         """
+        if batch_size is not None:
+            if batch_size <= 0:
+                self._observer.on_invalid_input("the provided batch size must be >0.")
+                return
+            for files_batch in yield_files_batches(directory_path=self._directory_path,
+                                                   file_categorization_strategy = self._file_categorization_strategy,
+                                                   batch_size = batch_size,
+                                                   on_error = self._walk_error_handler,
+                                                   traversal_options = self._traversal_options):
+                self._observer.on_new_files_batch(files_batch)
+            return
         for (filepath, category) in yield_file_categories(directory_path=self._directory_path, 
                                                           file_categorization_strategy = self._file_categorization_strategy,
-                                                          on_error = self._walk_error_handler):
+                                                          on_error = self._walk_error_handler,
+                                                          traversal_options = self._traversal_options):
             self._observer.on_new_categorized_file(filepath, category)
 
     @_generic_error_handler
-    def analize_category_sizes(self)->None:
-        """"Walks the directory tree reporting files categories' sizes.
+    def analize_category_sizes(self, files_interval:int = None, seconds_interval:float = None, 
+                               checkpointer:ScanCheckpointer = None)->None:
+        """"Walks the directory tree reporting files categories' sizes. If an interval is 
+        provided, the sizes aggregated so far are periodically reported during the traversal too
+        (through on_partial_file_categories_sizes). If a checkpointer is provided, the traversal
+        is resumable (see yield_categories_sizes_snapshots).
+        Args:
+            files_interval (int, optional): the number of files after which the sizes aggregated
+            so far are reported.
+            Defaults to None.
+            seconds_interval (float, optional): the number of seconds after which the sizes 
+            aggregated so far are reported.
+            Defaults to None.
+            checkpointer (ScanCheckpointer, optional): the checkpointer of the traversal.
+            Defaults to None.
         """
-        for (category, size) in yield_categories_sizes(directory_path = self._directory_path, 
-                                                       file_categorization_strategy = self._file_categorization_strategy,
-                                                       on_error = self._walk_error_handler):
+        if (files_interval is not None and files_interval <= 0) or (seconds_interval is not None and seconds_interval <= 0):
+            self._observer.on_invalid_input("the provided intervals must be >0.")
+            return
+        for (sizes_by_categories, files_count, completed) in yield_categories_sizes_snapshots(
+                directory_path = self._directory_path, 
+                file_categorization_strategy = self._file_categorization_strategy,
+                files_interval = files_interval,
+                seconds_interval = seconds_interval,
+                on_error = self._walk_error_handler,
+                traversal_options = self._traversal_options,
+                checkpointer = checkpointer):
+            if not completed:
+                self._observer.on_partial_file_categories_sizes(sizes_by_categories, files_count)
+        for (category, size) in sizes_by_categories.items():
             self._observer.on_new_file_category_size(category, size)
 
+    @_generic_error_handler
+    def analize_category_disk_usages(self)->None:
+        """"Walks the directory tree reporting both the apparent size and the bytes allocated
+        on disk of each files category (which are lower for sparse files, e.g. virtual 
+        machine images), both of them from the same stat of each file.
+        """
+        for (category, size, category_allocated_size) in yield_categories_disk_usages(
+                directory_path = self._directory_path, 
+                file_categorization_strategy = self._file_categorization_strategy,
+                on_error = self._walk_error_handler,
+                traversal_options = self._traversal_options):
+            self._observer.on_new_file_category_disk_usage(category, size, category_allocated_size)
+
     @_generic_error_handler
     def report_permissions(self)->None:
         """"Walks the directory tree by reporting files with unusual permissions settings.
         """
         for (filepath, permissions) in yield_unusual_permissions(directory_path=self._directory_path,
                                                                  permission_reporting_strategy = self._permission_reporting_strategy,
-                                                                 on_error = self._walk_error_handler):
+                                                                 on_error = self._walk_error_handler,
+                                                                 traversal_options = self._traversal_options):
             self._observer.on_new_file_with_unusual_permission(filepath, permissions)
 
     @_generic_error_handler
@@ -107,6 +190,253 @@ class DirectoryAnalizer():
         else:
             for (filepath, size) in yield_files_larger_than(directory_path=self._directory_path, 
                                                             threshold_in_bytes=file_size_in_bytes,
-                                                            on_error = self._walk_error_handler):
+                                                            on_error = self._walk_error_handler,
+                                                            traversal_options = self._traversal_options):
+                self._observer.on_new_large_file(filepath, size)
+
+    @_generic_error_handler
+    def identify_large_files_disk_usages(self, file_size_in_bytes:int, by_allocated_size:bool = True)->None:
+        """Walks the directory tree by identifying files with size greater than the provided
+        threshold, reporting both their apparent size and the bytes allocated to them on disk.
+        Args:
+            file_size_in_bytes (int): The size threshold in bytes.
+            by_allocated_size (bool, optional): whether the threshold applies to the bytes 
+            allocated to the files, rather than to their apparent size.
+            Defaults to True.
+        """
+        if file_size_in_bytes < 0:
+            self._observer.on_invalid_input("the provided size must be >=0.")
+        else:
+            for (filepath, size, file_allocated_size) in yield_large_files_disk_usages(directory_path=self._directory_path, 
+                                                                                       threshold_in_bytes=file_size_in_bytes,
+                                                                                       by_allocated_size=by_allocated_size,
+                                                                                       on_error = self._walk_error_handler,
+                                                                                       traversal_options = self._traversal_options):
+                self._observer.on_new_large_file_disk_usage(filepath, size, file_allocated_size)
+
+    @_generic_error_handler
+    def identify_largest_files(self, files_count:int, file_size_in_bytes:int = -1, stream_leaders:bool = False)->None:
+        """Walks the directory tree by identifying the files_count largest files, which are 
+        notified once the traversal is completed, from the largest one.
+        Args:
+            files_count (int): the number of files to identify.
+            file_size_in_bytes (int, optional): The size threshold in bytes. Only files with 
+            sizes greater than this threshold will be included in the results.
+            Defaults to -1 (i.e. no threshold).
+            stream_leaders (bool, optional): whether or not to notify the largest files found
+            so far during the traversal, too (through on_new_large_file_leader).
+            Defaults to False.
+        """
+        if files_count <= 0:
+            self._observer.on_invalid_input("the provided number of files must be >0.")
+        else:
+            for (filepath, size) in yield_largest_files(directory_path=self._directory_path,
+                                                        files_count=files_count,
+                                                        threshold_in_bytes=file_size_in_bytes,
+                                                        on_new_leader=self._observer.on_new_large_file_leader if stream_leaders else None,
+                                                        on_error=self._walk_error_handler,
+                                                        traversal_options=self._traversal_options):
                 self._observer.on_new_large_file(filepath, size)
 
+    @_generic_error_handler
+    def analize_directories_sizes(self, max_depth:int = None, directories_count:int = None)->None:
+        """Walks the directory tree reporting the cumulative size and number of files of each
+        directory (including the root), bottom-up.
+        Args:
+            max_depth (int, optional): the max depth (the root having depth 0) of the directories
+            to report. Deeper directories are accounted in the sizes of their ancestors anyway.
+            Defaults to None (i.e. no limit).
+            directories_count (int, optional): if provided, only the directories_count largest
+            directories are reported, from the largest one, once the traversal is completed.
+            Defaults to None.
+        """
+        if max_depth is not None and max_depth < 0:
+            self._observer.on_invalid_input("the provided depth must be >=0.")
+            return
+        if directories_count is not None and directories_count <= 0:
+            self._observer.on_invalid_input("the provided number of directories must be >0.")
+            return
+        directories_sizes = yield_directories_sizes(directory_path=self._directory_path,
+                                                    max_depth=max_depth,
+                                                    on_error=self._walk_error_handler,
+                                                    traversal_options=self._traversal_options)
+        if directories_count is not None:
+            # a bounded heap keeps only the largest directories found so far
+            directories_sizes = heapq.nlargest(directories_count, directories_sizes, key=lambda d: d[1])
+        for (directory_path, size, files_count) in directories_sizes:
+            self._observer.on_new_directory_size(directory_path, size, files_count)
+
+    @_generic_error_handler
+    def analize_sizes_statistics(self, 
+                                 thresholds_in_bytes: List[int] = None, 
+                                 percentiles: List[float] = None,
+                                 histograms: bool = False,
+                                 permission_bits: int = None)->None:
+        """Walks the directory tree only once, collecting the files into a ScanTable, and then
+        answers through vectorized operations over it (i.e. without walking the tree again) 
+        the provided queries: the number of files larger than each threshold, the percentiles 
+        of the sizes of the files of each category, and the histograms of those sizes. 
+        It requires NumPy, which is an optional dependency.
+        Args:
+            thresholds_in_bytes (List[int], optional): the size thresholds to count the files above of.
+            Defaults to None.
+            percentiles (List[float], optional): the percentiles (in [0, 100]) of the sizes to compute.
+            Defaults to None.
+            histograms (bool, optional): whether to compute the histograms of the sizes (with 
+            power-of-2 bins).
+            Defaults to False.
+            permission_bits (int, optional): if provided, only the files whose mode has all these
+            bits set (e.g., 0o002 for world-writable files) are analyzed.
+            Defaults to None.
+        """
+        if not NUMPY_AVAILABLE:
+            self._observer.on_invalid_input("NumPy is required: install it with 'pip install fs_analyzer[analytics]'.")
+            return
+        if any(threshold < 0 for threshold in thresholds_in_bytes or []):
+            self._observer.on_invalid_input("the provided sizes must be >=0.")
+            return
+        if any(not 0 <= percentile <= 100 for percentile in percentiles or []):
+            self._observer.on_invalid_input("the provided percentiles must be in [0, 100].")
+            return
+        scan_table = ScanTable.from_directory(directory_path=self._directory_path,
+                                              file_categorization_strategy=self._file_categorization_strategy,
+                                              on_error=self._walk_error_handler,
+                                              traversal_options=self._traversal_options)
+        if permission_bits is not None:
+            scan_table = scan_table.with_permission_bits(permission_bits)
+        if thresholds_in_bytes:
+            for (threshold, files_count) in zip(thresholds_in_bytes, scan_table.count_larger_than(thresholds_in_bytes)):
+                self._observer.on_new_large_files_count(threshold, files_count)
+        if percentiles:
+            for (category, sizes) in scan_table.sizes_percentiles(percentiles).items():
+                self._observer.on_new_category_sizes_percentiles(category, dict(zip(percentiles, sizes)))
+        if histograms:
+            bin_edges, counts_by_categories = scan_table.sizes_histograms()
+            for (category, counts) in counts_by_categories.items():
+                self._observer.on_new_category_sizes_histogram(category, dict(zip(bin_edges, counts)))
+
+    @_generic_error_handler
+    def watch(self, analyses: Set[Analysis], file_size_in_bytes: int = None, latency_seconds: float = 1.0)->None:
+        """Walks the directory tree performing the provided analyses, like report does, and then
+        keeps their outcomes up to date by watching the tree through inotify (see DirectoryWatcher):
+        only the files affected by each batch of changes are analyzed again, and the outcomes 
+        which changed are notified through the same observer methods, namely:
+            - the new categorized files, and those whose category changed.
+            - the new sizes of the categories whose size changed.
+            - the files with unusual permissions which changed (with no permissions, if they
+                became usual or were removed).
+            - the new large files, and those whose size changed, while those which are not 
+                large anymore are notified through on_large_file_dropped.
+        After each batch, on_updates_completed is notified. The watch lasts until the root of
+        the tree is removed (or the process interrupted). It requires Linux.
+        Args:
+            analyses (Set[Analysis]): the analyses to perform.
+            file_size_in_bytes (int, optional): The size threshold in bytes for the large 
+            files identification. Required only if Analysis.LARGE_FILES is requested.
+            Defaults to None.
+            latency_seconds (float, optional): the number of seconds changes are coalesced over.
+            Defaults to 1.
+        """
+        from fs_analyzer.model.directory_watcher import INOTIFY_AVAILABLE, DirectoryWatcher
+        if not INOTIFY_AVAILABLE:
+            self._observer.on_invalid_input("watching directories requires inotify, which is only available on Linux.")
+            return
+        if Analysis.LARGE_FILES in analyses and (file_size_in_bytes is None or file_size_in_bytes < 0):
+            self._observer.on_invalid_input("a size >=0 must be provided to identify large files.")
+            return
+        if latency_seconds < 0:
+            self._observer.on_invalid_input("the provided latency must be >=0.")
+            return
+        with_categories = Analysis.CATEGORIES in analyses or Analysis.CATEGORY_SIZES in analyses
+        watcher = DirectoryWatcher(directory_path=self._directory_path,
+                                   file_categorization_strategy=self._file_categorization_strategy if with_categories else None,
+                                   permission_reporting_strategy=self._permission_reporting_strategy if Analysis.PERMISSIONS in analyses else None,
+                                   on_error=self._walk_error_handler,
+                                   traversal_options=self._traversal_options,
+                                   latency_seconds=latency_seconds)
+        sizes_by_categories = {}
+        for changes in watcher.yield_changes():
+            # the sizes of the categories changed by the batch, before it (None if new)
+            former_sizes_by_categories = {}
+            for change in changes:
+                old_state, new_state = change.old_state, change.new_state
+                if Analysis.CATEGORIES in analyses and new_state is not None \
+                        and (old_state is None or old_state.category != new_state.category):
+                    self._observer.on_new_categorized_file(change.path, new_state.category)
+                if Analysis.CATEGORY_SIZES in analyses:
+                    for (state, sign) in [(old_state, -1), (new_state, 1)]:
+                        if state is not None:
+                            former_sizes_by_categories.setdefault(state.category, sizes_by_categories.get(state.category))
+                            sizes_by_categories[state.category] = sizes_by_categories.get(state.category, 0) + sign * state.size
+                if Analysis.PERMISSIONS in analyses:
+                    old_permissions = old_state.permissions if old_state is not None else frozenset()
+                    new_permissions = new_state.permissions if new_state is not None else frozenset()
+                    if old_permissions != new_permissions:
+                        self._observer.on_new_file_with_unusual_permission(change.path, set(new_permissions))
+                if Analysis.LARGE_FILES in analyses:
+                    was_large = old_state is not None and old_state.size > file_size_in_bytes
+                    new_size = new_state.size if new_state is not None else 0
+                    if new_size > file_size_in_bytes and (not was_large or old_state.size != new_size):
+                        self._observer.on_new_large_file(change.path, new_size)
+                    elif was_large and new_size <= file_size_in_bytes:
+                        self._observer.on_large_file_dropped(change.path, new_size)
+            # categories whose files changed are notified only if their size did as well
+            for (category, former_size) in former_sizes_by_categories.items():
+                if sizes_by_categories[category] != former_size:
+                    self._observer.on_new_file_category_size(category, sizes_by_categories[category])
+            self._observer.on_updates_completed()
+
+    @_generic_error_handler
+    def save_snapshot(self, snapshot_path:str)->None:
+        """Walks the directory tree sorted by path, writing the snapshot of its files (i.e.
+        their paths, sizes, modes, mtimes and categories) to a compressed, column-oriented file,
+        in a streaming fashion (see write_snapshot), so that it can be compared to later ones
+        (see SnapshotDiffer).
+        Args:
+            snapshot_path (str): the path of the snapshot file (replaced once completed).
+        """
+        from fs_analyzer.model.scan_snapshot import write_snapshot
+        try:
+            files_count = write_snapshot(directory_path=self._directory_path,
+                                         snapshot_path=snapshot_path,
+                                         file_categorization_strategy=self._file_categorization_strategy,
+                                         on_error=self._walk_error_handler,
+                                         traversal_options=self._traversal_options)
+        except OSError as e:
+            self._observer.on_invalid_input("the snapshot cannot be written: " + str(e))
+            return
+        self._observer.on_new_snapshot(snapshot_path, files_count)
+
+    @_generic_error_handler
+    def report(self, analyses: Set[Analysis], file_size_in_bytes: int = None)->None:
+        """Walks the directory tree only once, performing all the provided analyses at the same
+        time: each file is fanned out to the selected analyses, whose outcomes are notified 
+        through the same observer methods of the corresponding single-analysis methods.
+        Args:
+            analyses (Set[Analysis]): the analyses to perform.
+            file_size_in_bytes (int, optional): The size threshold in bytes for the large 
+            files identification. Required only if Analysis.LARGE_FILES is requested.
+            Defaults to None.
+        """
+        if Analysis.LARGE_FILES in analyses and (file_size_in_bytes is None or file_size_in_bytes < 0):
+            self._observer.on_invalid_input("a size >=0 must be provided to identify large files.")
+            return
+        with_categories = Analysis.CATEGORIES in analyses or Analysis.CATEGORY_SIZES in analyses
+        sizes_by_categories = {}
+        for (filepath, size, category, permissions) in yield_files_analyses(
+                directory_path=self._directory_path,
+                file_categorization_strategy=self._file_categorization_strategy if with_categories else None,
+                permission_reporting_strategy=self._permission_reporting_strategy if Analysis.PERMISSIONS in analyses else None,
+                with_size=Analysis.CATEGORY_SIZES in analyses or Analysis.LARGE_FILES in analyses,
+                on_error=self._walk_error_handler,
+                traversal_options=self._traversal_options):
+            if Analysis.CATEGORIES in analyses:
+                self._observer.on_new_categorized_file(filepath, category)
+            if Analysis.CATEGORY_SIZES in analyses:
+                sizes_by_categories[category] = sizes_by_categories.get(category, 0) + size
+            if Analysis.PERMISSIONS in analyses and len(permissions) > 0:
+                self._observer.on_new_file_with_unusual_permission(filepath, permissions)
+            if Analysis.LARGE_FILES in analyses and size > file_size_in_bytes:
+                self._observer.on_new_large_file(filepath, size)
+        for (category, size) in sizes_by_categories.items():
+            self._observer.on_new_file_category_size(category, size)
@@ -1,19 +1,57 @@
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Iterable
 
 from fs_analyzer.view_model.directory_observer import DirectoryObserver
+from fs_analyzer.model.directory_traversal import TraversalOptions
 from fs_analyzer.view_model.directory_analizer import DirectoryAnalizer
-from fs_analyzer.model.file_categorization_strategy import FileCategorizerByExtension, FileCategorizerBySignature
-from fs_analyzer.model.file_permission_reporting_strategy import LooserPermissionsReporting, StricterPermissionsReporting
+from fs_analyzer.model.file_categorization_strategy import DEFAULT_UNTRUSTED_EXTENSIONS, FileCategorizationStrategy, FileCategorizerByExtension, FileCategorizerBySignature, HybridFileCategorizer
+from fs_analyzer.model.file_permission_reporting_strategy import FilePermissionsReportingStrategy, LooserPermissionsReporting, StricterPermissionsReporting
+from fs_analyzer.model.caching_file_categorization import LruFileCategorizer
+from fs_analyzer.model.extension_table_categorization import FileCategorizerByExtensionTable
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+    # imported by the factories needing them only, since their dependencies (e.g., asyncio
+    # and multiprocessing) slow down the start of the CLI
+    from fs_analyzer.view_model.async_directory_analizer import AsyncDirectoryAnalizer
+    from fs_analyzer.view_model.async_directory_observer import AsyncDirectoryObserver
+    from fs_analyzer.model.permission_policy import PolicyPermissionsReporting
 
 
 class DirectoryAnalizerFactory(ABC):
     """An abstract factory for creating the most suitable directory analyzer 
     according to user needs, by leveraging the creational "Abstract Factory" 
     Object-Oriented design pattern.
+    The strategies the analyzer is configured with are provided by the "Factory Method"s 
+    implemented by concrete factories.
     """
-    @abstractmethod
     def create(self, directory_path:str, 
-               directory_observer: DirectoryObserver)->DirectoryAnalizer:
+               directory_observer: DirectoryObserver,
+               traversal_options: TraversalOptions = TraversalOptions())->DirectoryAnalizer:
+        return DirectoryAnalizer(directory_path, 
+                                 self.create_file_categorization_strategy(), 
+                                 self.create_permission_reporting_strategy(), 
+                                 directory_observer,
+                                 traversal_options)
+
+    def create_async(self, directory_path:str, 
+                     directory_observer: "AsyncDirectoryObserver",
+                     traversal_options: TraversalOptions = TraversalOptions(),
+                     executor: "Executor" = None)->"AsyncDirectoryAnalizer":
+        from fs_analyzer.view_model.async_directory_analizer import AsyncDirectoryAnalizer
+        return AsyncDirectoryAnalizer(directory_path, 
+                                      self.create_file_categorization_strategy(), 
+                                      self.create_permission_reporting_strategy(), 
+                                      directory_observer,
+                                      traversal_options,
+                                      executor)
+
+    @abstractmethod
+    def create_file_categorization_strategy(self)->FileCategorizationStrategy:
+        pass
+
+    @abstractmethod
+    def create_permission_reporting_strategy(self)->FilePermissionsReportingStrategy:
         pass
 
 
@@ -22,45 +60,153 @@ class ExtensionDirectoryAnalizerFactory(DirectoryAnalizerFactory):
     to their extension (e.g., txt, jpeg). It inherits from 
     fs_analyzer.viewmodel.directory_analizer_factory.DirectoryAnalizerFactory.
     """
-    def create(self, directory_path:str, 
-               directory_observer: DirectoryObserver)->DirectoryAnalizer:
-        return DirectoryAnalizer(directory_path, 
-                                 FileCategorizerByExtension(), 
-                                 StricterPermissionsReporting(), 
-                                 directory_observer)
+    def create_file_categorization_strategy(self)->FileCategorizationStrategy:
+        return FileCategorizerByExtensionTable()
+
+    def create_permission_reporting_strategy(self)->FilePermissionsReportingStrategy:
+        return StricterPermissionsReporting()
 
 class SignatureDirectoryAnalizerFactory(DirectoryAnalizerFactory):
     """A concrete factory for creating directory analyzers that classify files according
     to their file signature. It inherits from 
     fs_analyzer.viewmodel.directory_analizer_factory.DirectoryAnalizerFactory.
     """
-    def create(self, directory_path:str, 
-               directory_observer: DirectoryObserver)->DirectoryAnalizer:
-        return DirectoryAnalizer(directory_path, 
-                                 FileCategorizerBySignature(), 
-                                 StricterPermissionsReporting(), 
-                                 directory_observer)
+    def create_file_categorization_strategy(self)->FileCategorizationStrategy:
+        return FileCategorizerBySignature()
+
+    def create_permission_reporting_strategy(self)->FilePermissionsReportingStrategy:
+        return StricterPermissionsReporting()
     
 class LoosePermAnalyzerFactory(DirectoryAnalizerFactory):
     """A concrete factory for creating directory analyzers that identify unusual
     file permissions setting with a loose policy. It inherits from 
     fs_analyzer.viewmodel.directory_analizer_factory.DirectoryAnalizerFactory.
     """
-    def create(self, directory_path:str, 
-               directory_observer: DirectoryObserver)->DirectoryAnalizer:
-        return DirectoryAnalizer(directory_path, 
-                                 FileCategorizerBySignature(), 
-                                 LooserPermissionsReporting(), 
-                                 directory_observer) 
+    def create_file_categorization_strategy(self)->FileCategorizationStrategy:
+        return FileCategorizerBySignature()
+
+    def create_permission_reporting_strategy(self)->FilePermissionsReportingStrategy:
+        return LooserPermissionsReporting()
     
 class StrictPermAnalyzerFactory(DirectoryAnalizerFactory):
     """A concrete factory for creating directory analyzers that identify unusual
     file permissions setting with a strict policy. It inherits from 
     fs_analyzer.viewmodel.directory_analizer_factory.DirectoryAnalizerFactory.
     """
-    def create(self, directory_path:str, 
-               directory_observer: DirectoryObserver)->DirectoryAnalizer:
-        return DirectoryAnalizer(directory_path, 
-                                 FileCategorizerBySignature(), 
-                                 StricterPermissionsReporting(), 
-                                 directory_observer) 
\ No newline at end of file
+    def create_file_categorization_strategy(self)->FileCategorizationStrategy:
+        return FileCategorizerBySignature()
+
+    def create_permission_reporting_strategy(self)->FilePermissionsReportingStrategy:
+        return StricterPermissionsReporting()
+
+class ExtensionLoosePermAnalyzerFactory(DirectoryAnalizerFactory):
+    """A concrete factory for creating directory analyzers that classify files according
+    to their extension and identify unusual file permissions setting with a loose policy,
+    suitable for performing many analyses at once. It inherits from 
+    fs_analyzer.viewmodel.directory_analizer_factory.DirectoryAnalizerFactory.
+    """
+    def create_file_categorization_strategy(self)->FileCategorizationStrategy:
+        return FileCategorizerByExtensionTable()
+
+    def create_permission_reporting_strategy(self)->FilePermissionsReportingStrategy:
+        return LooserPermissionsReporting()
+
+class HybridDirectoryAnalizerFactory(DirectoryAnalizerFactory):
+    """A concrete factory for creating directory analyzers that classify files according
+    to their extension, unless it is missing, unknown or untrusted, and otherwise according 
+    to their file signature. It inherits from 
+    fs_analyzer.viewmodel.directory_analizer_factory.DirectoryAnalizerFactory.
+
+    Args:
+        untrusted_extensions (Iterable[str], optional): the extensions of the files to be 
+            classified by signature even if they are known.
+            Defaults to DEFAULT_UNTRUSTED_EXTENSIONS.
+    """
+    def __init__(self, untrusted_extensions: Iterable[str] = DEFAULT_UNTRUSTED_EXTENSIONS):
+        self._untrusted_extensions = untrusted_extensions
+
+    def create_file_categorization_strategy(self)->FileCategorizationStrategy:
+        return HybridFileCategorizer(self._untrusted_extensions)
+
+    def create_permission_reporting_strategy(self)->FilePermissionsReportingStrategy:
+        return StricterPermissionsReporting()
+
+class HybridLoosePermAnalyzerFactory(HybridDirectoryAnalizerFactory):
+    """A concrete factory for creating directory analyzers that classify files like those
+    created by HybridDirectoryAnalizerFactory and identify unusual file permissions setting
+    with a loose policy, suitable for performing many analyses at once. It inherits from 
+    fs_analyzer.viewmodel.directory_analizer_factory.HybridDirectoryAnalizerFactory.
+    """
+    def create_permission_reporting_strategy(self)->FilePermissionsReportingStrategy:
+        return LooserPermissionsReporting()
+
+class ParallelCategorizationAnalizerFactory(DirectoryAnalizerFactory):
+    """A concrete factory decorating another factory, so that the directory analyzers it
+    creates classify files in parallel, through a pool of workers, with the strategy
+    of the decorated factory. It inherits from 
+    fs_analyzer.viewmodel.directory_analizer_factory.DirectoryAnalizerFactory.
+
+    Args:
+        directory_analizer_factory (DirectoryAnalizerFactory): the decorated factory.
+        workers (int): the number of workers classifying files.
+        use_processes (bool, optional): whether to use a process pool rather than a thread pool.
+            Defaults to True.
+    """
+    def __init__(self, directory_analizer_factory: DirectoryAnalizerFactory,
+                 workers: int, 
+                 use_processes: bool = True):
+        self._directory_analizer_factory = directory_analizer_factory
+        self._workers = workers
+        self._use_processes = use_processes
+
+    def create_file_categorization_strategy(self)->FileCategorizationStrategy:
+        from fs_analyzer.model.parallel_file_categorization import ParallelFileCategorizer
+        return ParallelFileCategorizer(self._directory_analizer_factory.create_file_categorization_strategy(),
+                                       self._workers,
+                                       self._use_processes)
+
+    def create_permission_reporting_strategy(self)->FilePermissionsReportingStrategy:
+        return self._directory_analizer_factory.create_permission_reporting_strategy()
+
+class CachingCategorizationAnalizerFactory(DirectoryAnalizerFactory):
+    """A concrete factory decorating another factory, so that the directory analyzers it
+    creates memoize the categories computed by the strategy of the decorated factory in a 
+    bounded LRU cache. It inherits from 
+    fs_analyzer.viewmodel.directory_analizer_factory.DirectoryAnalizerFactory.
+
+    Args:
+        directory_analizer_factory (DirectoryAnalizerFactory): the decorated factory.
+        max_size (int, optional): the max number of categories cached.
+            Defaults to 65536.
+    """
+    def __init__(self, directory_analizer_factory: DirectoryAnalizerFactory,
+                 max_size: int = 65536):
+        self._directory_analizer_factory = directory_analizer_factory
+        self._max_size = max_size
+
+    def create_file_categorization_strategy(self)->FileCategorizationStrategy:
+        return LruFileCategorizer(self._directory_analizer_factory.create_file_categorization_strategy(),
+                                  self._max_size)
+
+    def create_permission_reporting_strategy(self)->FilePermissionsReportingStrategy:
+        return self._directory_analizer_factory.create_permission_reporting_strategy()
+
+class PolicyPermAnalyzerFactory(DirectoryAnalizerFactory):
+    """A concrete factory for creating directory analyzers that classify files like those 
+    created by the decorated factory do, while they report the unusual permissions of a
+    declarative policy (e.g., loaded from a configuration file).
+
+    Args:
+        directory_analizer_factory (DirectoryAnalizerFactory): the decorated factory.
+        policy (PolicyPermissionsReporting): the policy of the unusual permissions.
+    """
+    def __init__(self, directory_analizer_factory: DirectoryAnalizerFactory,
+                 policy: "PolicyPermissionsReporting"):
+        self._directory_analizer_factory = directory_analizer_factory
+        self._policy = policy
+
+    def create_file_categorization_strategy(self)->FileCategorizationStrategy:
+        return self._directory_analizer_factory.create_file_categorization_strategy()
+
+    def create_permission_reporting_strategy(self)->FilePermissionsReportingStrategy:
+        return self._policy
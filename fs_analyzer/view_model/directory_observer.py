@@ -1,7 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import Set
+from typing import TYPE_CHECKING, Dict, Set
 
 from fs_analyzer.model import file_permissions, file_category
+from fs_analyzer.model.files_batch import FilesBatch
+
+if TYPE_CHECKING:
+    from fs_analyzer.model.scan_snapshot import Change
+
 
 class DirectoryObserver(ABC):
     """An abstract observer for directory analyzer's analysis intermediate outcomes 
@@ -65,6 +70,188 @@ class DirectoryObserver(ABC):
         """
         pass
 
+    def on_partial_file_categories_sizes(self, 
+                                         sizes_by_categories: Dict[file_category.FileCategory, int],
+                                         files_count:int)->None:
+        """Defines how to handle the notification, during the directory tree traversal, of the
+        sizes of the categories of the files aggregated so far (see 
+        DirectoryAnalizer.analize_category_sizes). By default, it is ignored.
+
+        Args:
+            sizes_by_categories (Dict[file_category.FileCategory, int]): the sizes of the 
+                categories aggregated so far.
+            files_count (int): the number of files aggregated so far.
+        """
+        pass
+
+    def on_new_files_batch(self, 
+                           files_batch: FilesBatch)->None:
+        """Defines how to handle the discovery, during the directory tree traversal, of a new 
+        batch of files, stored in columnar form, with their categories (see 
+        DirectoryAnalizer.categorize_files). By default, it is ignored.
+
+        Args:
+            files_batch (FilesBatch): the batch of files.
+        """
+        pass
+
+    def on_new_large_file_leader(self, 
+                                 file_path:str, 
+                                 file_size:int)->None:
+        """Defines how to handle the notification, during the directory tree traversal, 
+        of a file becoming one of the largest files found so far (see 
+        DirectoryAnalizer.identify_largest_files). By default, it is ignored.
+
+        Args:
+            file_path (str): the path in which the file resides.
+            file_size (int): the size of the file.
+        """
+        pass
+
+    def on_new_directory_size(self, 
+                              directory_path:str, 
+                              directory_size:int,
+                              files_count:int)->None:
+        """Defines how to handle the notification, during the directory tree traversal, of the
+        cumulative size of a directory (see DirectoryAnalizer.analize_directories_sizes). 
+        By default, it is ignored.
+
+        Args:
+            directory_path (str): the path of the directory.
+            directory_size (int): the size given by the sum of the files of its subtree.
+            files_count (int): the number of the files of its subtree.
+        """
+        pass
+
+    def on_new_file_category_disk_usage(self, 
+                                        files_category: file_category.FileCategory, 
+                                        category_size:int,
+                                        category_allocated_size:int)->None:
+        """Defines how to handle the notification of both the apparent size and the bytes 
+        allocated on disk of a category of files (see DirectoryAnalizer.analize_category_disk_usages).
+        By default, it is ignored.
+
+        Args:
+            files_category (file_category.FileCategory): the file category.
+            category_size (int): the sum of the apparent sizes of its files.
+            category_allocated_size (int): the sum of the bytes allocated to its files.
+        """
+        pass
+
+    def on_new_large_file_disk_usage(self, 
+                                     file_path:str, 
+                                     file_size:int,
+                                     file_allocated_size:int)->None:
+        """Defines how to handle the notification, during the directory tree traversal, of
+        both the apparent size and the bytes allocated on disk of a large file (see 
+        DirectoryAnalizer.identify_large_files_disk_usages). By default, it is ignored.
+
+        Args:
+            file_path (str): the path in which the file resides.
+            file_size (int): the apparent size of the file.
+            file_allocated_size (int): the bytes allocated to the file.
+        """
+        pass
+
+    def on_new_large_files_count(self, 
+                                 threshold_in_bytes:int, 
+                                 files_count:int)->None:
+        """Defines how to handle the notification of the number of files larger than a threshold
+        (see DirectoryAnalizer.analize_sizes_statistics). By default, it is ignored.
+
+        Args:
+            threshold_in_bytes (int): the size threshold.
+            files_count (int): the number of files larger than the threshold.
+        """
+        pass
+
+    def on_new_category_sizes_percentiles(self, 
+                                          files_category: file_category.FileCategory, 
+                                          sizes_by_percentiles: Dict[float, int])->None:
+        """Defines how to handle the notification of the percentiles of the sizes of the files of
+        a category (see DirectoryAnalizer.analize_sizes_statistics). By default, it is ignored.
+
+        Args:
+            files_category (file_category.FileCategory): the file category.
+            sizes_by_percentiles (Dict[float, int]): the size at each percentile.
+        """
+        pass
+
+    def on_new_category_sizes_histogram(self, 
+                                        files_category: file_category.FileCategory, 
+                                        files_counts_by_bins: Dict[int, int])->None:
+        """Defines how to handle the notification of the histogram of the sizes of the files of
+        a category (see DirectoryAnalizer.analize_sizes_statistics). By default, it is ignored.
+
+        Args:
+            files_category (file_category.FileCategory): the file category.
+            files_counts_by_bins (Dict[int, int]): the number of files in each bin, by the
+                lower edge of the bin (the last bin being unbounded).
+        """
+        pass
+
+    def on_new_snapshot(self, 
+                        snapshot_path:str, 
+                        files_count:int)->None:
+        """Defines how to handle the notification of the completion of a snapshot of the 
+        directory tree (see DirectoryAnalizer.save_snapshot). By default, it is ignored.
+
+        Args:
+            snapshot_path (str): the path of the snapshot file.
+            files_count (int): the number of files of the snapshot.
+        """
+        pass
+
+    def on_new_snapshot_difference(self, 
+                                   change: "Change", 
+                                   file_path:str, 
+                                   old_size:int, 
+                                   new_size:int)->None:
+        """Defines how to handle the notification of a file which changed between two snapshots
+        (see SnapshotDiffer.diff). By default, it is ignored.
+
+        Args:
+            change (Change): the kind of change (e.g., added).
+            file_path (str): the path of the file, relative to the root of the scanned tree.
+            old_size (int): the size of the file in the old snapshot (0 if added).
+            new_size (int): the size of the file in the new snapshot (0 if removed).
+        """
+        pass
+
+    def on_new_category_size_delta(self, 
+                                   files_category: file_category.FileCategory, 
+                                   old_size:int, 
+                                   new_size:int)->None:
+        """Defines how to handle the notification of a category of files whose total size 
+        changed between two snapshots (see SnapshotDiffer.diff). By default, it is ignored.
+
+        Args:
+            files_category (file_category.FileCategory): the file category.
+            old_size (int): the total size of the category in the old snapshot.
+            new_size (int): the total size of the category in the new snapshot.
+        """
+        pass
+
+    def on_large_file_dropped(self, 
+                              file_path:str, 
+                              file_size:int)->None:
+        """Defines how to handle the notification, during the watch of the directory tree, of a 
+        file formerly notified as large which is not anymore, since it shrank or was removed
+        (see DirectoryAnalizer.watch). By default, it is ignored.
+
+        Args:
+            file_path (str): the path in which the file resides.
+            file_size (int): the current size of the file (0 if removed).
+        """
+        pass
+
+    def on_updates_completed(self)->None:
+        """Defines how to handle the notification, during the watch of the directory tree, that
+        all the updates due to a batch of changes were notified (see DirectoryAnalizer.watch),
+        e.g. to flush them. By default, it is ignored.
+        """
+        pass
+
     def on_file_not_found(self)->None:
         """Defines how to handle the notification, during the directory tree traversal, 
         of a file not found.
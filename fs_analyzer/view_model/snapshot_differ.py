@@ -0,0 +1,53 @@
+from fs_analyzer.view_model.directory_observer import DirectoryObserver
+from fs_analyzer.model.scan_snapshot import ScanSnapshotReader, yield_snapshots_differences
+
+
+class SnapshotDiffer():
+    """Represents the comparison of two snapshots of a directory tree (see
+    DirectoryAnalizer.save_snapshot), e.g. taken on different days, reporting what changed
+    between them: the files added, removed, grown or shrunk, and the categories whose total
+    size changed.
+
+    It is modeled as an observable (through the "Observer" design pattern) to
+    be compatible with many observers.
+
+    Note that:
+        - Snapshots are read side by side, in O(n) time and constant memory, since both
+            are sorted by path.
+        - Files are notified sorted by path, categories once the comparison is completed.
+        - Invalid snapshots are notified through on_invalid_input.
+    """
+
+    def __init__(self,
+                 old_snapshot_path:str,
+                 new_snapshot_path:str,
+                 observer: DirectoryObserver) -> None:
+        """Configures the differ.
+
+        Args:
+            old_snapshot_path (str): the path of the old snapshot file.
+            new_snapshot_path (str): the path of the new snapshot file.
+            observer (DirectoryObserver): the observer to be notified of the differences.
+        """
+        self._old_snapshot_path = old_snapshot_path
+        self._new_snapshot_path = new_snapshot_path
+        self._observer = observer
+
+    def diff(self)->None:
+        """Compares the snapshots, notifying the files which changed (through
+        on_new_snapshot_difference) and then the categories whose size changed (through
+        on_new_category_size_delta).
+        """
+        sizes_by_categories = {}
+        try:
+            with ScanSnapshotReader(self._old_snapshot_path) as old_snapshot, \
+                    ScanSnapshotReader(self._new_snapshot_path) as new_snapshot:
+                for difference in yield_snapshots_differences(old_snapshot, new_snapshot, sizes_by_categories):
+                    self._observer.on_new_snapshot_difference(difference.change, difference.path,
+                                                              difference.old_size, difference.new_size)
+        except (OSError, ValueError) as e:
+            self._observer.on_invalid_input("invalid snapshot: " + str(e))
+            return
+        for (category, (old_size, new_size)) in sizes_by_categories.items():
+            if old_size != new_size:
+                self._observer.on_new_category_size_delta(category, old_size, new_size)